@@ -3,13 +3,21 @@ from sqlalchemy.orm import selectinload
 from models.candidato_model import CandidatoInfosBasicas, CandidatoInformacoesPessoais, CandidatoInformacoesProfissionais, CandidatoFormacaoEIdiomas, CandidatoCurriculos
 from models.vagas_model import VagaInfosBasicas, VagaPerfil, VagaBeneficios
 from models.prospect_model import Prospect
+from models.sync_model import HashCandidato, HashVaga, HashProspectsVaga
+from api.utils.functions.bulk_loader import CarregadorEmLote
+from api.utils.functions.json_stream import itera_objeto_json
+from api.utils.functions.table_swap import recarga_atomica
+from api.utils.functions.delta_sync import MODO_COMPLETO, MODO_DELTA, hash_registro, possui_hashes, sincroniza_delta
 from sqlalchemy import func
 from datetime import datetime
 
-import json
 import os
 
 
+class VagaNaoEncontrada(ValueError):
+    """A vaga consultada não existe no banco (distinta de outros erros de valor no processamento)."""
+
+
 def salvar_candidato(data: dict, db: Session):
     """
     Insere um candidato no banco de dados individualmente.
@@ -56,74 +64,71 @@ def salvar_candidato(data: dict, db: Session):
     
     return infos_basicas.codigo_profissional
     
-def atualizar_tabelas_candidatos(json_file_path: str, db: Session):
+def _adiciona_candidato(carregador: CarregadorEmLote, codigo_profissional: int, candidato: dict):
+    """Acumula no carregador as linhas de um candidato do JSON."""
+    # Inserir dados em CandidatoInfosBasicas (força inclusão do código)
+    carregador.adiciona(CandidatoInfosBasicas, candidato["infos_basicas"], codigo_profissional=codigo_profissional)
+
+    # Inserir dados em CandidatoInformacoesPessoais
+    if "informacoes_pessoais" in candidato:
+        carregador.adiciona(CandidatoInformacoesPessoais, candidato["informacoes_pessoais"], codigo_profissional=codigo_profissional)
+
+    # Inserir dados em CandidatoInformacoesProfissionais
+    if "informacoes_profissionais" in candidato:
+        carregador.adiciona(CandidatoInformacoesProfissionais, candidato["informacoes_profissionais"], codigo_profissional=codigo_profissional)
+
+    # Inserir dados em CandidatoFormacaoEIdiomas
+    if "formacao_e_idiomas" in candidato:
+        carregador.adiciona(CandidatoFormacaoEIdiomas, candidato["formacao_e_idiomas"], codigo_profissional=codigo_profissional)
+
+    # Inserir currículos, se existir
+    if "cv_pt" in candidato:
+        carregador.adiciona(CandidatoCurriculos, {"cv_pt": candidato.get("cv_pt")}, codigo_profissional=codigo_profissional)
+
+def atualizar_tabelas_candidatos(json_file_path: str, db: Session, modo: str = MODO_COMPLETO):
     """
     Atualiza as tabelas de candidatos no banco de dados com base em um arquivo JSON.
-    Apaga todos os dados existentes e insere os novos dados.
+    
+    - modo "completo": os dados são inseridos em lotes (executemany) em tabelas de staging, com um
+      commit por lote, que substituem as tabelas em uso em uma única transação ao final da carga;
+    - modo "delta": apenas candidatos novos ou alterados (pelo hash do conteúdo) são regravados e os
+      que não existem mais no JSON são removidos. Sem hashes salvos, é feita a carga completa.
     
     O JSON deve ser um dicionário onde cada chave é o código do candidato.
     Será feita a conversão da chave para inteiro para o campo codigo_profissional.
     
     :param json_file_path: Caminho para o arquivo JSON.
     :param db: Sessão do banco de dados.
+    :param modo: "completo" ou "delta".
+    :return: Estatísticas da carga por tabela (linhas e linhas/s).
     """
-    # Apagar todos os dados existentes nas tabelas de candidatos
-    db.exec(delete(CandidatoCurriculos))
-    db.exec(delete(CandidatoFormacaoEIdiomas))
-    db.exec(delete(CandidatoInformacoesProfissionais))
-    db.exec(delete(CandidatoInformacoesPessoais))
-    db.exec(delete(CandidatoInfosBasicas))
-    db.commit()
-
-    # Ler o arquivo JSON
-    with open(json_file_path, "r", encoding="utf-8") as file:
-        candidatos_data = json.load(file)
-
-    # Inserir os novos dados nas tabelas
-    for codigo_profissional_str, candidato in candidatos_data.items():
-        # Converter a chave para inteiro
-        codigo_profissional = int(codigo_profissional_str)
-
-        # Inserir dados em CandidatoInfosBasicas (força inclusão do código, se necessário)
-        candidato["infos_basicas"]["codigo_profissional"] = codigo_profissional
-        infos_basicas = CandidatoInfosBasicas(**candidato["infos_basicas"])
-        db.add(infos_basicas)
-        db.commit()
-        db.refresh(infos_basicas)  # agora infos_basicas.codigo_profissional contém o valor gerado pelo DB
-
-        # Inserir dados em CandidatoInformacoesPessoais
-        if "informacoes_pessoais" in candidato:
-            informacoes_pessoais = CandidatoInformacoesPessoais(
-                codigo_profissional=codigo_profissional,
-                **candidato["informacoes_pessoais"]
-            )
-            db.add(informacoes_pessoais)
-
-        # Inserir dados em CandidatoInformacoesProfissionais
-        if "informacoes_profissionais" in candidato:
-            informacoes_profissionais = CandidatoInformacoesProfissionais(
-                codigo_profissional=codigo_profissional,
-                **candidato["informacoes_profissionais"]
-            )
-            db.add(informacoes_profissionais)
-
-        # Inserir dados em CandidatoFormacaoEIdiomas
-        if "formacao_e_idiomas" in candidato:
-            formacao_e_idiomas = CandidatoFormacaoEIdiomas(
-                codigo_profissional=codigo_profissional,
-                **candidato["formacao_e_idiomas"]
-            )
-            db.add(formacao_e_idiomas)
-
-        # Inserir currículos, se existir
-        if "cv_pt" in candidato:
-            curriculos = CandidatoCurriculos(
-                codigo_profissional=codigo_profissional,
-                cv_pt=candidato.get("cv_pt")
-            )
-            db.add(curriculos)
-
-    db.commit()
+    modelos = [
+        CandidatoInfosBasicas,
+        CandidatoInformacoesPessoais,
+        CandidatoInformacoesProfissionais,
+        CandidatoFormacaoEIdiomas,
+        CandidatoCurriculos
+    ]
+    # O JSON é lido incrementalmente, um candidato por vez
+    registros = ((int(codigo), candidato) for codigo, candidato in itera_objeto_json(json_file_path))
+
+    if modo == MODO_DELTA:
+        if possui_hashes(db, HashCandidato):
+            return sincroniza_delta(db, registros, modelos, HashCandidato, "codigo_profissional", _adiciona_candidato)
+        print("Nenhum hash de candidatos salvo. Executando a carga completa.")
+
+    # Carga em lotes nas tabelas de staging (tabela principal antes das tabelas filhas), trocadas
+    # pelas tabelas em uso ao final: os leitores nunca veem a base parcialmente carregada.
+    # Os hashes de cada candidato são recalculados para a próxima sincronização delta
+    modelos.append(HashCandidato)
+    with recarga_atomica(db, modelos) as destinos:
+        carregador = CarregadorEmLote(db, modelos, destinos=destinos)
+        for codigo_profissional, candidato in registros:
+            _adiciona_candidato(carregador, codigo_profissional, candidato)
+            carregador.adiciona(HashCandidato, {"codigo_profissional": codigo_profissional, "content_hash": hash_registro(candidato)})
+
+        estatisticas = carregador.finaliza()
+    return estatisticas
 
 def listar_candidatos(db: Session, offset: int = 0, limit: int = None):
     stmt = select(CandidatoInfosBasicas).offset(offset)
@@ -223,61 +228,56 @@ def salvar_vaga(data: dict, db: Session):
     return infos_basicas.codigo_vaga   
 
 # Função para atualizar todas as vagas a partir de um JSON (remoção total e inserção dos novos dados)
-def atualizar_tabelas_vagas(json_file_path: str, db: Session):
+def _adiciona_vaga(carregador: CarregadorEmLote, codigo_vaga: int, vagas: dict):
+    """Acumula no carregador as linhas de uma vaga do JSON."""
+    #Inserir dados em VagasInformaçõesBasicas
+    carregador.adiciona(VagaInfosBasicas, vagas["informacoes_basicas"], codigo_vaga=codigo_vaga)
+
+    # Inserir dados em VagaPerfil, se existir
+    if "perfil_vaga" in vagas:
+        carregador.adiciona(VagaPerfil, vagas["perfil_vaga"], codigo_vaga=codigo_vaga)
+
+    # Inserir dados em VagaBeneficios, se existir
+    if "beneficios" in vagas:
+        carregador.adiciona(VagaBeneficios, vagas["beneficios"], codigo_vaga=codigo_vaga)
+
+def atualizar_tabelas_vagas(json_file_path: str, db: Session, modo: str = MODO_COMPLETO):
     """
     Atualiza as tabelas de vagas no banco de dados com base em um arquivo JSON.
-    Apaga todos os dados existentes e insere os novos dados.
     
-    O JSON deve ser uma lista com 3 dicionários:
-      - O primeiro dicionário contém as informações de "informacoes_basicas";
-      - O segundo dicionário contém os dados de "perfil_vaga";
-      - O terceiro dicionário contém os dados de "beneficios".
+    - modo "completo": os dados são inseridos em lotes (executemany) em tabelas de staging, com um
+      commit por lote, que substituem as tabelas em uso em uma única transação ao final da carga;
+    - modo "delta": apenas vagas novas ou alteradas (pelo hash do conteúdo) são regravadas e as
+      que não existem mais no JSON são removidas. Sem hashes salvos, é feita a carga completa.
     
-    Cada dicionário utiliza o código da vaga (como chave) que deverá ser convertido para inteiro.
+    O JSON deve ser um dicionário onde cada chave é o código da vaga (convertido para inteiro)
+    e o valor contém "informacoes_basicas", "perfil_vaga" e "beneficios".
     
     :param json_file_path: Caminho para o arquivo JSON.
     :param db: Sessão do banco de dados.
+    :param modo: "completo" ou "delta".
+    :return: Estatísticas da carga por tabela (linhas e linhas/s).
     """
-    # Remover os registros existentes
-    db.exec(delete(VagaBeneficios))
-    db.exec(delete(VagaPerfil))
-    db.exec(delete(VagaInfosBasicas))
-    db.commit()
-
-    # Ler o arquivo JSON
-    with open(json_file_path, "r", encoding="utf-8") as file:
-        vagas_data = json.load(file)
-
-    # Iterar sobre cada código presente nas informações básicas
-    for codigo_vaga_str, vagas in vagas_data.items():
-        # Converter o código da vaga para inteiro e incluir nos dados
-        codigo_vaga = int(codigo_vaga_str)
-        
-        
-        #Inserir dados em VagasInformaçõesBasicas
-        vagas["informacoes_basicas"]["codigo_vaga"] = codigo_vaga
-        infos_basicas = VagaInfosBasicas(**vagas["informacoes_basicas"])
-        db.add(infos_basicas)
-        db.commit()
-        db.refresh(infos_basicas)
-        
-        # Inserir dados em VagaPerfil, se existir
-        if "perfil_vaga" in vagas:
-            perfil = VagaPerfil(
-                codigo_vaga=infos_basicas.codigo_vaga,
-                **vagas["perfil_vaga"]
-            )
-            db.add(perfil)
-            
-        # Inserir dados em VagaBeneficios, se existir
-        if "beneficios" in vagas:
-            beneficios = VagaBeneficios(
-                codigo_vaga=infos_basicas.codigo_vaga,
-                **vagas["beneficios"]
-            )
-            db.add(beneficios)
-        
-    db.commit()
+    modelos = [VagaInfosBasicas, VagaPerfil, VagaBeneficios]
+    # O JSON é lido incrementalmente, uma vaga por vez
+    registros = ((int(codigo), vagas) for codigo, vagas in itera_objeto_json(json_file_path))
+
+    if modo == MODO_DELTA:
+        if possui_hashes(db, HashVaga):
+            return sincroniza_delta(db, registros, modelos, HashVaga, "codigo_vaga", _adiciona_vaga)
+        print("Nenhum hash de vagas salvo. Executando a carga completa.")
+
+    # Carga em lotes nas tabelas de staging (informações básicas antes de perfil e benefícios),
+    # trocadas pelas tabelas em uso ao final: os leitores nunca veem a base parcialmente carregada
+    modelos.append(HashVaga)
+    with recarga_atomica(db, modelos) as destinos:
+        carregador = CarregadorEmLote(db, modelos, destinos=destinos)
+        for codigo_vaga, vagas in registros:
+            _adiciona_vaga(carregador, codigo_vaga, vagas)
+            carregador.adiciona(HashVaga, {"codigo_vaga": codigo_vaga, "content_hash": hash_registro(vagas)})
+
+        estatisticas = carregador.finaliza()
+    return estatisticas
 
 # Função para listar vagas com paginação (ex.: 100 por página)
 def listar_vagas(db: Session, offset: int = 0, limit: int = None):
@@ -332,46 +332,180 @@ def listar_detalhes_vaga_por_codigo(codigo_vaga: str, db: Session):
     
     return vaga_detalhes
 
-def atualizar_tabelas_prospects(json_file_path: str, db: Session):
+def listar_features_match_por_vaga(codigo_vaga: int, db: Session):
+    """
+    Monta, no servidor, as linhas de features do modelo de matching para todos os candidatos
+    associados a uma vaga (via Prospect), com uma consulta para a vaga e outra para os candidatos.
+    
+    :param codigo_vaga: Código da vaga.
+    :param db: Sessão do banco de dados.
+    :return: Tupla (infos básicas da vaga, lista de dicionários com os dados do prospect e as features).
+    """
+    stmt_vaga = (
+        select(VagaInfosBasicas, VagaPerfil)
+        .outerjoin(VagaPerfil, VagaPerfil.codigo_vaga == VagaInfosBasicas.codigo_vaga)
+        .where(VagaInfosBasicas.codigo_vaga == codigo_vaga)
+    )
+    resultado_vaga = db.exec(stmt_vaga).first()
+    if not resultado_vaga:
+        raise VagaNaoEncontrada(f"Vaga com código {codigo_vaga} não encontrada.")
+    vaga, perfil = resultado_vaga
+    perfil = perfil or VagaPerfil(codigo_vaga=codigo_vaga)
+    
+    # Todos os candidatos da vaga com os dados das tabelas de candidato em uma única consulta
+    stmt_candidatos = (
+        select(
+            Prospect,
+            CandidatoInfosBasicas,
+            CandidatoInformacoesPessoais,
+            CandidatoInformacoesProfissionais,
+            CandidatoFormacaoEIdiomas,
+            CandidatoCurriculos
+        )
+        .outerjoin(CandidatoInfosBasicas, CandidatoInfosBasicas.codigo_profissional == Prospect.codigo_candidato)
+        .outerjoin(CandidatoInformacoesPessoais, CandidatoInformacoesPessoais.codigo_profissional == Prospect.codigo_candidato)
+        .outerjoin(CandidatoInformacoesProfissionais, CandidatoInformacoesProfissionais.codigo_profissional == Prospect.codigo_candidato)
+        .outerjoin(CandidatoFormacaoEIdiomas, CandidatoFormacaoEIdiomas.codigo_profissional == Prospect.codigo_candidato)
+        .outerjoin(CandidatoCurriculos, CandidatoCurriculos.codigo_profissional == Prospect.codigo_candidato)
+        .where(Prospect.codigo_vaga == codigo_vaga)
+    )
+    
+    candidatos = []
+    prospects_vistos = set()
+    for prospect, infos, pessoais, profissionais, formacao, curriculos in db.exec(stmt_candidatos).all():
+        # Ignora linhas repetidas caso alguma tabela filha tenha mais de um registro por candidato
+        if prospect.id in prospects_vistos:
+            continue
+        prospects_vistos.add(prospect.id)
+        
+        features = {
+            "sexo": pessoais.sexo if pessoais else None,
+            "estado_civil": pessoais.estado_civil if pessoais else None,
+            "pcd": pessoais.pcd if pessoais else None,
+            "vaga_especifica_para_pcd": perfil.vaga_especifica_para_pcd,
+            "pais_vaga": perfil.pais,
+            "nivel_academico": formacao.nivel_academico if formacao else None,
+            "nivel_academico_vaga": perfil.nivel_academico,
+            "tipo_contratacao": vaga.tipo_contratacao,
+            "cidade": infos.local if infos else None,
+            "cidade_vaga": perfil.cidade,
+            "nivel_profissional": profissionais.nivel_profissional if profissionais else None,
+            "nivel_profissional_vaga": perfil.nivel_profissional,
+            "ingles": formacao.nivel_ingles if formacao else None,
+            "nivel_ingles_vaga": perfil.nivel_ingles,
+            "espanhol": formacao.nivel_espanhol if formacao else None,
+            "nivel_espanhol_vaga": perfil.nivel_espanhol,
+            "outros_idiomas": formacao.outro_idioma if formacao else None,
+            "titulo_profissional": profissionais.titulo_profissional if profissionais else None,
+            "titulo_vaga": vaga.titulo_vaga,
+            "conhecimentos_tecnicos": profissionais.conhecimentos_tecnicos if profissionais else None,
+            "certificacoes": profissionais.certificacoes if profissionais else None,
+            "outras_certificacoes": profissionais.outras_certificacoes if profissionais else None,
+            "area_atuacao": profissionais.area_atuacao if profissionais else None,
+            "areas_atuacao_vaga": perfil.areas_atuacao,
+            "competencia_tecnicas_e_comportamentais": perfil.competencia_tecnicas_e_comportamentais,
+            "cv_candidato": curriculos.cv_pt if curriculos else None,
+            "principais_atividades": perfil.principais_atividades,
+        }
+        candidatos.append({
+            "codigo_candidato": prospect.codigo_candidato,
+            "nome": prospect.nome,
+            "situacao_candidato": prospect.situacao_candidato,
+            # Campos ausentes viram string vazia, como no payload de /matchModel/predict
+            "features": {chave: valor or "" for chave, valor in features.items()},
+        })
+    
+    return vaga, candidatos
+
+def buscar_registro_recomendacao_vaga(codigo_vaga: int, db: Session) -> dict:
+    """
+    Retorna os campos da vaga usados na recomendação, no mesmo formato do recommendation_pairs.parquet
+    (código, título, competências técnicas e comportamentais e áreas de atuação).
+    
+    :param codigo_vaga: Código da vaga.
+    :param db: Sessão do banco de dados.
+    :return: Dicionário com os campos da vaga.
+    """
+    stmt = (
+        select(VagaInfosBasicas, VagaPerfil)
+        .outerjoin(VagaPerfil, VagaPerfil.codigo_vaga == VagaInfosBasicas.codigo_vaga)
+        .where(VagaInfosBasicas.codigo_vaga == codigo_vaga)
+    )
+    resultado = db.exec(stmt).first()
+    if not resultado:
+        raise VagaNaoEncontrada(f"Vaga com código {codigo_vaga} não encontrada.")
+    vaga, perfil = resultado
+    return {
+        "codigo_vaga": vaga.codigo_vaga,
+        "titulo_vaga": vaga.titulo_vaga,
+        "competencia_tecnicas_e_comportamentais": perfil.competencia_tecnicas_e_comportamentais if perfil else None,
+        "areas_atuacao_vaga": perfil.areas_atuacao if perfil else None,
+    }
+
+def listar_nomes_candidatos(codigos: list, db: Session) -> dict:
+    """
+    Retorna um dicionário codigo_profissional -> nome para os candidatos informados, com uma única consulta.
+    """
+    if not codigos:
+        return {}
+    stmt = select(CandidatoInfosBasicas.codigo_profissional, CandidatoInfosBasicas.nome).where(
+        CandidatoInfosBasicas.codigo_profissional.in_(codigos)
+    )
+    return {codigo: nome for codigo, nome in db.exec(stmt).all()}
+
+def _adiciona_prospects_da_vaga(carregador: CarregadorEmLote, codigo_vaga: int, vaga_data: dict):
+    """Acumula no carregador os prospects de uma vaga do JSON."""
+    for prospect_data in vaga_data.get("prospects", []):
+        carregador.adiciona(Prospect, {
+            "codigo_vaga": codigo_vaga,
+            "titulo_vaga": vaga_data["titulo"],
+            "nome": prospect_data["nome"],
+            "codigo_candidato": int(prospect_data["codigo"]),
+            "situacao_candidato": prospect_data["situacao_candidado"],
+            "data_candidatura": prospect_data["data_candidatura"],
+            "ultima_atualizacao": prospect_data["ultima_atualizacao"],
+            "comentario": prospect_data.get("comentario", None),
+            "recrutador": prospect_data["recrutador"]
+        })
+
+def atualizar_tabelas_prospects(json_file_path: str, db: Session, modo: str = MODO_COMPLETO):
     """
     Atualiza as tabelas de prospects no banco de dados com base em um arquivo JSON.
-    Apaga todos os dados existentes e insere os novos dados.
+
+    - modo "completo": os dados são inseridos em lotes (executemany) em uma tabela de staging, com um
+      commit por lote, que substitui a tabela em uso em uma única transação ao final da carga;
+    - modo "delta": apenas os prospects das vagas novas ou alteradas (pelo hash da vaga com sua lista
+      de prospects) são regravados e os das vagas que não existem mais no JSON são removidos.
+      Sem hashes salvos, é feita a carga completa.
 
     O JSON deve ser um dicionário onde cada chave é o código da vaga, e o valor contém
     as informações da vaga e uma lista de prospects associados.
 
     :param json_file_path: Caminho para o arquivo JSON.
     :param db: Sessão do banco de dados.
+    :param modo: "completo" ou "delta".
+    :return: Estatísticas da carga (linhas e linhas/s).
     """
-    # Remover os registros existentes
-    db.exec(delete(Prospect))
-    db.commit()
-
-    # Ler o arquivo JSON
-    with open(json_file_path, "r", encoding="utf-8") as file:
-        prospects_data = json.load(file)
-
-    # Processar cada vaga e seus prospects
-    for codigo_vaga_str, vaga_data in prospects_data.items():
-        codigo_vaga = int(codigo_vaga_str)
-
-        # Processar cada prospect associado à vaga
-        for prospect_data in vaga_data.get("prospects", []):
-            # Criar o objeto Prospect
-            prospect = Prospect(
-                codigo_vaga=codigo_vaga,
-                titulo_vaga=vaga_data["titulo"],
-                nome=prospect_data["nome"],
-                codigo_candidato=int(prospect_data["codigo"]),
-                situacao_candidato=prospect_data["situacao_candidado"],
-                data_candidatura=prospect_data["data_candidatura"],
-                ultima_atualizacao=prospect_data["ultima_atualizacao"],
-                comentario=prospect_data.get("comentario", None),
-                recrutador=prospect_data["recrutador"]
-            )
-            db.add(prospect)
-
-    db.commit()
+    modelos = [Prospect]
+    # O JSON é lido incrementalmente, uma vaga (com seus prospects) por vez
+    registros = ((int(codigo), vaga_data) for codigo, vaga_data in itera_objeto_json(json_file_path))
+
+    if modo == MODO_DELTA:
+        if possui_hashes(db, HashProspectsVaga):
+            return sincroniza_delta(db, registros, modelos, HashProspectsVaga, "codigo_vaga", _adiciona_prospects_da_vaga)
+        print("Nenhum hash de prospects salvo. Executando a carga completa.")
+
+    # Carga em lotes na tabela de staging, trocada pela tabela em uso ao final:
+    # os leitores nunca veem a base parcialmente carregada
+    modelos.append(HashProspectsVaga)
+    with recarga_atomica(db, modelos) as destinos:
+        carregador = CarregadorEmLote(db, modelos, destinos=destinos)
+        for codigo_vaga, vaga_data in registros:
+            _adiciona_prospects_da_vaga(carregador, codigo_vaga, vaga_data)
+            carregador.adiciona(HashProspectsVaga, {"codigo_vaga": codigo_vaga, "content_hash": hash_registro(vaga_data)})
+
+        estatisticas = carregador.finaliza()
+    return estatisticas
         
 def listar_prospects(db: Session, offset: int = 0, limit: int = None):
     """
@@ -0,0 +1,96 @@
+import time
+from typing import Dict, List, Optional, Type
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel
+
+
+# Quantidade de linhas da tabela principal por lote (commit)
+TAMANHO_LOTE = 5000
+
+
+class CarregadorEmLote:
+    """
+    Carga em lote das tabelas do banco do sistema via SQLAlchemy Core.
+
+    As linhas são acumuladas como dicionários (apenas as colunas da tabela) e inseridas com
+    executemany, sem instanciar objetos do ORM nem fazer refresh registro a registro.
+    Ao atingir o tamanho do lote, todas as tabelas são descarregadas na ordem informada
+    (tabelas pai antes das filhas, respeitando as chaves estrangeiras) e é feito um único commit.
+
+    :param db: Sessão do banco de dados.
+    :param modelos: Modelos SQLModel na ordem de inserção (pais antes dos filhos).
+    :param tamanho_lote: Quantidade de linhas acumuladas em qualquer tabela que dispara a descarga.
+    :param destinos: Tabela de destino por modelo (ex.: tabelas de staging); por padrão, a tabela do modelo.
+    """
+
+    def __init__(self, db: Session, modelos: List[Type[SQLModel]], tamanho_lote: int = TAMANHO_LOTE,
+                 destinos: Optional[dict] = None):
+        self._db = db
+        self._modelos = modelos
+        self._destinos = {modelo: (destinos or {}).get(modelo, modelo.__table__) for modelo in modelos}
+        self._tamanho_lote = tamanho_lote
+        self._colunas = {modelo: [coluna.name for coluna in modelo.__table__.columns] for modelo in modelos}
+        self._pendentes: Dict[Type[SQLModel], List[dict]] = {modelo: [] for modelo in modelos}
+        self._linhas = {modelo: 0 for modelo in modelos}
+        self._segundos = {modelo: 0.0 for modelo in modelos}
+        self._inicio = time.perf_counter()
+
+    def adiciona(self, modelo: Type[SQLModel], dados: dict, **valores):
+        """
+        Acumula uma linha para o modelo. Chaves que não são colunas da tabela são ignoradas
+        (como no construtor do modelo) e colunas ausentes recebem None. Chaves primárias
+        autoincrementais só são enviadas quando informadas.
+        """
+        dados = dict(dados, **valores)
+        linha = {
+            coluna: dados.get(coluna)
+            for coluna in self._colunas[modelo]
+            if coluna in dados or not modelo.__table__.columns[coluna].primary_key
+        }
+        pendentes = self._pendentes[modelo]
+        pendentes.append(linha)
+        if len(pendentes) >= self._tamanho_lote:
+            self.descarrega()
+
+    def _insere(self, modelo: Type[SQLModel], linhas: List[dict]):
+        # executemany exige o mesmo conjunto de colunas em todas as linhas do comando
+        grupos: Dict[tuple, List[dict]] = {}
+        for linha in linhas:
+            grupos.setdefault(tuple(linha), []).append(linha)
+        conexao = self._db.connection()
+        for grupo in grupos.values():
+            conexao.execute(insert(self._destinos[modelo]), grupo)
+
+    def descarrega(self):
+        """Insere as linhas acumuladas de todas as tabelas (pais antes dos filhos) e faz o commit."""
+        for modelo in self._modelos:
+            linhas = self._pendentes[modelo]
+            if not linhas:
+                continue
+            inicio = time.perf_counter()
+            self._insere(modelo, linhas)
+            self._segundos[modelo] += time.perf_counter() - inicio
+            self._linhas[modelo] += len(linhas)
+            self._pendentes[modelo] = []
+        self._db.commit()
+
+    def finaliza(self) -> dict:
+        """
+        Descarrega as linhas restantes e retorna (e imprime) as estatísticas da carga por tabela:
+        linhas inseridas, tempo de inserção e linhas por segundo.
+        """
+        self.descarrega()
+        estatisticas = {}
+        for modelo in self._modelos:
+            linhas, segundos = self._linhas[modelo], self._segundos[modelo]
+            estatisticas[modelo.__tablename__] = {
+                "linhas": linhas,
+                "segundos": round(segundos, 3),
+                "linhas_por_segundo": round(linhas / segundos, 1) if segundos > 0 else None,
+            }
+            print(
+                f"Carga em lote de {modelo.__tablename__}: {linhas} linhas em {segundos:.2f}s "
+                f"({estatisticas[modelo.__tablename__]['linhas_por_segundo']} linhas/s)"
+            )
+        print(f"Carga em lote concluída em {time.perf_counter() - self._inicio:.2f}s.")
+        return estatisticas
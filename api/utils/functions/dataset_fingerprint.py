@@ -0,0 +1,67 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional
+from sqlmodel import Session
+from models.sync_model import DatasetFingerprint, VERSAO_ESQUEMA_DATASETS
+
+
+# Nomes dos datasets carregados pelo /update-tables (chave do fingerprint)
+DATASET_CANDIDATOS = "candidatos"
+DATASET_VAGAS = "vagas"
+DATASET_PROSPECTS = "prospects"
+
+# Tamanho dos blocos lidos no cálculo do hash do arquivo
+TAMANHO_BLOCO = 1024 * 1024
+
+
+def hash_arquivo(caminho: str) -> str:
+    """SHA-256 do conteúdo do arquivo, lido em blocos."""
+    digest = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO), b""):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+def verifica_dataset(db: Session, dataset: str, etag: Optional[str], caminho: str) -> tuple:
+    """
+    Compara o arquivo com o fingerprint da última carga do dataset.
+
+    O ETag é comparado primeiro (sem ler o arquivo); se ele for diferente, o hash do conteúdo
+    decide (ex.: o mesmo conteúdo publicado em outra chave ou reenviado ao S3).
+    Um fingerprint de outra versão de esquema nunca é considerado inalterado.
+
+    :return: Tupla (inalterado, content_hash). O hash é None quando não precisou ser calculado.
+    """
+    fingerprint = db.get(DatasetFingerprint, dataset)
+    if fingerprint is None or fingerprint.schema_version != VERSAO_ESQUEMA_DATASETS:
+        return False, None
+    if etag is not None and fingerprint.etag == etag:
+        return True, None
+    content_hash = hash_arquivo(caminho)
+    if fingerprint.content_hash != content_hash:
+        return False, content_hash
+    # Mesmo conteúdo com outro ETag: guarda o novo ETag para evitar o hash na próxima verificação
+    fingerprint.etag = etag
+    db.add(fingerprint)
+    db.commit()
+    return True, content_hash
+
+
+def invalida_fingerprint(db: Session, dataset: str):
+    """Remove o fingerprint antes de uma carga: se ela for interrompida, a próxima não é ignorada."""
+    fingerprint = db.get(DatasetFingerprint, dataset)
+    if fingerprint is not None:
+        db.delete(fingerprint)
+        db.commit()
+
+
+def registra_fingerprint(db: Session, dataset: str, etag: Optional[str], caminho: str, content_hash: str = None):
+    """Registra o arquivo carregado com sucesso no dataset."""
+    fingerprint = db.get(DatasetFingerprint, dataset) or DatasetFingerprint(dataset=dataset)
+    fingerprint.etag = etag
+    fingerprint.content_hash = content_hash or hash_arquivo(caminho)
+    fingerprint.schema_version = VERSAO_ESQUEMA_DATASETS
+    fingerprint.carregado_em = datetime.now(timezone.utc)
+    db.add(fingerprint)
+    db.commit()
@@ -0,0 +1,52 @@
+import fcntl
+import os
+from contextlib import contextmanager
+
+
+# Locks por dataset em arquivo (flock), válidos entre todos os workers da aplicação
+DIRETORIO_LOCKS = os.path.join(".", "cache", "locks")
+
+# Tempo sugerido (segundos) para o cliente repetir uma escrita rejeitada durante a recarga
+RETRY_AFTER_RECARGA = 30
+
+
+class RecargaEmAndamento(Exception):
+    """Escrita rejeitada porque as tabelas do dataset estão sendo recarregadas."""
+
+
+def _arquivo_lock(dataset: str, diretorio: str):
+    os.makedirs(diretorio, exist_ok=True)
+    return open(os.path.join(diretorio, f"{dataset}.lock"), "a")
+
+
+@contextmanager
+def recarga_dataset(dataset: str, diretorio: str = DIRETORIO_LOCKS):
+    """
+    Lock exclusivo da recarga de um dataset: recargas simultâneas do mesmo dataset são
+    executadas uma após a outra e a recarga aguarda as escritas da API em andamento.
+    """
+    with _arquivo_lock(dataset, diretorio) as arquivo:
+        fcntl.flock(arquivo, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+
+@contextmanager
+def escrita_dataset(dataset: str, diretorio: str = DIRETORIO_LOCKS):
+    """
+    Lock compartilhado das escritas da API em um dataset. Durante uma recarga, a escrita seria
+    descartada na troca das tabelas, por isso é rejeitada com RecargaEmAndamento.
+    """
+    with _arquivo_lock(dataset, diretorio) as arquivo:
+        try:
+            fcntl.flock(arquivo, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RecargaEmAndamento(
+                f"As tabelas de {dataset} estão sendo recarregadas. Tente novamente em instantes."
+            )
+        try:
+            yield
+        finally:
+            fcntl.flock(arquivo, fcntl.LOCK_UN)
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import sys
+import time
+from typing import Any, Callable, Iterable, List, Tuple, Type
+from sqlmodel import Session, SQLModel, select, delete
+from api.utils.functions.bulk_loader import CarregadorEmLote, TAMANHO_LOTE
+
+
+# Modos de sincronização do /update-tables
+MODO_COMPLETO = "completo"
+MODO_DELTA = "delta"
+MODOS_SYNC = (MODO_COMPLETO, MODO_DELTA)
+
+# Quantidade máxima de códigos por cláusula IN (limite de variáveis do SQLite)
+TAMANHO_IN = 500
+
+
+def hash_registro(registro: Any) -> str:
+    """Hash do conteúdo de um registro do JSON, independente da ordem das chaves."""
+    conteudo = json.dumps(registro, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+
+def possui_hashes(db: Session, modelo_hash: Type[SQLModel]) -> bool:
+    return db.exec(select(modelo_hash).limit(1)).first() is not None
+
+
+def remove_codigos(db: Session, modelos: List[Type[SQLModel]], coluna_codigo: str, codigos: List[int]):
+    """Remove as linhas dos códigos informados em todas as tabelas (filhas antes dos pais)."""
+    for modelo in reversed(modelos):
+        coluna = getattr(modelo, coluna_codigo)
+        for inicio in range(0, len(codigos), TAMANHO_IN):
+            db.exec(delete(modelo).where(coluna.in_(codigos[inicio:inicio + TAMANHO_IN])))
+
+
+def sincroniza_delta(
+    db: Session,
+    registros: Iterable[Tuple[int, Any]],
+    modelos: List[Type[SQLModel]],
+    modelo_hash: Type[SQLModel],
+    coluna_codigo: str,
+    adiciona: Callable[[CarregadorEmLote, int, Any], None],
+    tamanho_lote: int = TAMANHO_LOTE
+) -> dict:
+    """
+    Sincronização incremental de um dataset: compara o hash de cada registro com o hash salvo
+    na última carga e aplica apenas as diferenças.
+
+    - Registros novos ou alterados: as linhas do código são removidas e reinseridas (upsert),
+      na mesma transação, em lotes de `tamanho_lote` códigos;
+    - Registros inalterados: ignorados;
+    - Registros que não existem mais no JSON: removidos.
+
+    :param registros: Pares (código, registro) do JSON.
+    :param modelos: Modelos do dataset na ordem de inserção (pais antes dos filhos).
+    :param modelo_hash: Modelo com o hash de cada código (coluna `content_hash`).
+    :param coluna_codigo: Nome da coluna do código em todos os modelos.
+    :param adiciona: Função que acumula no carregador as linhas de um registro.
+    :return: Resumo da sincronização e estatísticas da carga por tabela.
+    """
+    inicio = time.perf_counter()
+    coluna_hash = getattr(modelo_hash, coluna_codigo)
+    hashes = dict(db.exec(select(coluna_hash, modelo_hash.content_hash)).all())
+    tabelas = modelos + [modelo_hash]
+    # O carregador só é descarregado junto com as remoções do mesmo lote
+    carregador = CarregadorEmLote(db, tabelas, tamanho_lote=sys.maxsize)
+
+    vistos = set()
+    pendentes: List[int] = []
+    contagem = {"novos": 0, "alterados": 0, "inalterados": 0, "removidos": 0}
+
+    def aplica_lote():
+        remove_codigos(db, tabelas, coluna_codigo, pendentes)
+        carregador.descarrega()
+        pendentes.clear()
+
+    for codigo, registro in registros:
+        vistos.add(codigo)
+        hash_atual = hash_registro(registro)
+        hash_anterior = hashes.get(codigo)
+        if hash_anterior == hash_atual:
+            contagem["inalterados"] += 1
+            continue
+        contagem["novos" if hash_anterior is None else "alterados"] += 1
+        pendentes.append(codigo)
+        adiciona(carregador, codigo, registro)
+        carregador.adiciona(modelo_hash, {coluna_codigo: codigo, "content_hash": hash_atual})
+        if len(pendentes) >= tamanho_lote:
+            aplica_lote()
+    aplica_lote()
+
+    removidos = [codigo for codigo in hashes if codigo not in vistos]
+    remove_codigos(db, tabelas, coluna_codigo, removidos)
+    db.commit()
+    contagem["removidos"] = len(removidos)
+
+    estatisticas = carregador.finaliza()
+    print(
+        f"Sincronização delta de {modelos[0].__tablename__} em {time.perf_counter() - inicio:.2f}s: "
+        f"{contagem['novos']} novos, {contagem['alterados']} alterados, "
+        f"{contagem['inalterados']} inalterados, {contagem['removidos']} removidos."
+    )
+    return {"modo": MODO_DELTA, **contagem, "tabelas": estatisticas}
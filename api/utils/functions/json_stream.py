@@ -0,0 +1,87 @@
+import json
+from typing import Any, Iterator, Tuple
+
+
+# Tamanho (em caracteres) de cada leitura do arquivo
+TAMANHO_BLOCO = 1024 * 1024
+
+_decoder = json.JSONDecoder()
+_ESPACOS = " \t\n\r"
+
+
+def itera_objeto_json(caminho: str, tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[Tuple[str, Any]]:
+    """
+    Percorre incrementalmente um arquivo JSON cujo topo é um objeto ({"codigo": registro, ...}),
+    retornando um par (chave, valor) de cada vez, sem carregar o arquivo inteiro em memória.
+
+    O arquivo é lido em blocos e cada valor é decodificado com JSONDecoder.raw_decode assim que
+    está completo no buffer. A memória usada é limitada pelo tamanho do bloco e do maior registro.
+
+    :param caminho: Caminho do arquivo JSON (UTF-8).
+    :param tamanho_bloco: Quantidade de caracteres lidos por vez.
+    :raises ValueError: Se o arquivo não for um objeto JSON válido.
+    """
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        buffer = ""
+        pos = 0
+        fim_arquivo = False
+
+        def le_bloco() -> bool:
+            nonlocal buffer, pos, fim_arquivo
+            bloco = arquivo.read(tamanho_bloco)
+            if not bloco:
+                fim_arquivo = True
+                return False
+            # Descarta a parte já consumida antes de acrescentar o novo bloco
+            buffer = buffer[pos:] + bloco
+            pos = 0
+            return True
+
+        def proximo_caractere() -> str:
+            # Avança sobre espaços em branco e retorna o próximo caractere ("" no fim do arquivo)
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _ESPACOS:
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not le_bloco():
+                    return ""
+
+        def decodifica():
+            # Decodifica o próximo valor, lendo mais blocos enquanto ele estiver incompleto no buffer
+            nonlocal pos
+            proximo_caractere()
+            while True:
+                try:
+                    valor, fim = _decoder.raw_decode(buffer, pos)
+                    # Um número no fim do buffer pode continuar no próximo bloco
+                    if fim < len(buffer) or fim_arquivo or not le_bloco():
+                        break
+                except json.JSONDecodeError:
+                    if not le_bloco():
+                        raise
+            pos = fim
+            return valor
+
+        if proximo_caractere() != "{":
+            raise ValueError(f"{caminho}: o JSON deve ser um objeto no nível superior.")
+        pos += 1
+
+        if proximo_caractere() == "}":
+            return
+        while True:
+            if proximo_caractere() != '"':
+                raise ValueError(f"{caminho}: chave inválida na posição {pos} do buffer.")
+            chave = decodifica()
+            if proximo_caractere() != ":":
+                raise ValueError(f"{caminho}: ':' esperado após a chave {chave!r}.")
+            pos += 1
+            yield chave, decodifica()
+
+            separador = proximo_caractere()
+            pos += 1
+            if separador == "}":
+                return
+            if separador != ",":
+                raise ValueError(f"{caminho}: ',' ou '}}' esperado após a chave {chave!r}.")
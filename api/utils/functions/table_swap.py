@@ -0,0 +1,194 @@
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Type
+from sqlalchemy import column, delete, table
+from sqlmodel import Session, SQLModel
+
+
+SUFIXO_STAGING = "__staging"
+SUFIXO_ANTIGA = "__antiga"
+# Os índices das tabelas recarregadas alternam entre dois sufixos, pois o SQLite não renomeia
+# índices: o índice criado na staging mantém o nome depois da troca
+SUFIXOS_INDICE = ("__a", "__b")
+
+
+def suporta_troca_atomica(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def _ddl_tabela(conexao, nome: str) -> str:
+    return conexao.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (nome,)
+    ).scalar_one()
+
+
+def _indices(conexao, nome: str) -> List[tuple]:
+    # Apenas índices explícitos (os automáticos de chave primária/unique têm sql nulo)
+    return conexao.exec_driver_sql(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (nome,)
+    ).all()
+
+
+def proximo_nome_indice(nome: str) -> str:
+    """Alterna o sufixo do índice (sem sufixo ou __b -> __a; __a -> __b)."""
+    for sufixo in SUFIXOS_INDICE:
+        if nome.endswith(sufixo):
+            base = nome[:-len(sufixo)]
+            return base + (SUFIXOS_INDICE[1] if sufixo == SUFIXOS_INDICE[0] else SUFIXOS_INDICE[0])
+    return nome + SUFIXOS_INDICE[0]
+
+
+def nome_base_indice(nome: str) -> str:
+    for sufixo in SUFIXOS_INDICE:
+        if nome.endswith(sufixo):
+            return nome[:-len(sufixo)]
+    return nome
+
+
+def _ddl_indice_declarado(indice, nome_indice: str, nome_tabela: str) -> str:
+    colunas = ", ".join(f'"{coluna.name}"' for coluna in indice.columns)
+    return f'CREATE {"UNIQUE " if indice.unique else ""}INDEX "{nome_indice}" ON "{nome_tabela}" ({colunas})'
+
+
+def _indices_declarados_ausentes(conexao, modelo: Type[SQLModel]) -> list:
+    """Índices declarados no modelo (ex.: index=True) que ainda não existem na tabela em uso."""
+    existentes = {nome_base_indice(nome) for nome, _ in _indices(conexao, modelo.__tablename__)}
+    return [indice for indice in modelo.__table__.indexes if indice.name not in existentes]
+
+
+def garante_indices(db: Session, modelos: List[Type[SQLModel]]):
+    """
+    Cria nas tabelas em uso os índices declarados nos modelos que ainda não existem
+    (o create_all não altera tabelas já criadas). Executada no startup.
+    """
+    conexao = db.connection()
+    for modelo in modelos:
+        if not suporta_troca_atomica(db):
+            for indice in modelo.__table__.indexes:
+                indice.create(conexao, checkfirst=True)
+            continue
+        for indice in _indices_declarados_ausentes(conexao, modelo):
+            conexao.exec_driver_sql(_ddl_indice_declarado(indice, indice.name, modelo.__tablename__))
+            print(f"Índice {indice.name} criado em {modelo.__tablename__}.")
+    db.commit()
+
+
+def descarta_staging(db: Session, modelos: List[Type[SQLModel]]):
+    conexao = db.connection()
+    for modelo in reversed(modelos):
+        conexao.exec_driver_sql(f'DROP TABLE IF EXISTS "{modelo.__tablename__}{SUFIXO_STAGING}"')
+    db.commit()
+
+
+def prepara_staging(db: Session, modelos: List[Type[SQLModel]]) -> dict:
+    """
+    Cria as tabelas de staging (vazias e sem índices) com a mesma definição das tabelas em uso,
+    inclusive as chaves estrangeiras, que continuam referenciando as tabelas pelo nome definitivo.
+    Retorna o mapeamento modelo -> tabela de staging, usado como destino da carga.
+    """
+    descarta_staging(db, modelos)
+    conexao = db.connection()
+    destinos = {}
+    for modelo in modelos:
+        nome = modelo.__tablename__
+        staging = f"{nome}{SUFIXO_STAGING}"
+        # Tabelas novas (ex.: incluídas no modelo depois da criação do banco) são criadas antes da cópia
+        modelo.__table__.create(conexao, checkfirst=True)
+        ddl = re.sub(
+            rf'^CREATE TABLE\s+("?){re.escape(nome)}\1', f'CREATE TABLE "{staging}"', _ddl_tabela(conexao, nome)
+        )
+        conexao.exec_driver_sql(ddl)
+        destinos[modelo] = table(staging, *[column(coluna.name) for coluna in modelo.__table__.columns])
+    db.commit()
+    return destinos
+
+
+def cria_indices_staging(db: Session, modelos: List[Type[SQLModel]]):
+    """
+    Cria nas tabelas de staging, já carregadas, os mesmos índices das tabelas em uso e os
+    índices declarados nos modelos que ainda não existem nelas.
+    """
+    conexao = db.connection()
+    for modelo in modelos:
+        nome = modelo.__tablename__
+        for nome_indice, ddl in _indices(conexao, nome):
+            novo_ddl = re.sub(
+                rf'^CREATE (UNIQUE )?INDEX\s+("?){re.escape(nome_indice)}\2\s+ON\s+("?){re.escape(nome)}\3',
+                lambda m: f'CREATE {m.group(1) or ""}INDEX "{proximo_nome_indice(nome_indice)}" ON "{nome}{SUFIXO_STAGING}"',
+                ddl
+            )
+            conexao.exec_driver_sql(novo_ddl)
+        # Índices declarados no modelo que a tabela em uso ainda não tem (bancos criados antes deles)
+        for indice in _indices_declarados_ausentes(conexao, modelo):
+            conexao.exec_driver_sql(
+                _ddl_indice_declarado(indice, proximo_nome_indice(indice.name), f"{nome}{SUFIXO_STAGING}")
+            )
+    db.commit()
+
+
+def troca_tabelas(db: Session, modelos: List[Type[SQLModel]]):
+    """
+    Troca as tabelas em uso pelas de staging em uma única transação (renomeações no catálogo,
+    em milissegundos) e remove as tabelas antigas.
+
+    Com legacy_alter_table=ON, o SQLite não reescreve as chaves estrangeiras das outras tabelas
+    ao renomear: elas continuam referenciando o nome definitivo, agora da tabela nova.
+    """
+    inicio = time.perf_counter()
+    with db.get_bind().connect() as conexao:
+        sqlite = conexao.connection.driver_connection
+        isolamento = sqlite.isolation_level
+        # Controle manual da transação: o driver não abre transações implícitas para DDL
+        sqlite.isolation_level = None
+        cursor = sqlite.cursor()
+        try:
+            cursor.execute("PRAGMA legacy_alter_table = ON")
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for modelo in modelos:
+                    nome = modelo.__tablename__
+                    cursor.execute(f'ALTER TABLE "{nome}" RENAME TO "{nome}{SUFIXO_ANTIGA}"')
+                    cursor.execute(f'ALTER TABLE "{nome}{SUFIXO_STAGING}" RENAME TO "{nome}"')
+                for modelo in reversed(modelos):
+                    cursor.execute(f'DROP TABLE "{modelo.__tablename__}{SUFIXO_ANTIGA}"')
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+        finally:
+            cursor.execute("PRAGMA legacy_alter_table = OFF")
+            cursor.close()
+            sqlite.isolation_level = isolamento
+    print(f"Troca atômica de {len(modelos)} tabela(s) concluída em {(time.perf_counter() - inicio) * 1000:.1f}ms.")
+
+
+@contextmanager
+def recarga_atomica(db: Session, modelos: List[Type[SQLModel]]):
+    """
+    Recarga completa de um conjunto de tabelas sem expor dados parciais aos leitores.
+
+    A carga é feita em tabelas de staging (o bloco recebe o mapeamento modelo -> tabela de destino);
+    ao final, os índices são criados na staging e as tabelas são trocadas em uma única transação.
+    Em caso de erro, a staging é descartada e as tabelas em uso permanecem intactas.
+    Em bancos que não são SQLite, as tabelas são esvaziadas e recarregadas diretamente.
+
+    :param modelos: Modelos na ordem de inserção (pais antes dos filhos).
+    """
+    if not suporta_troca_atomica(db):
+        for modelo in reversed(modelos):
+            db.exec(delete(modelo))
+        db.commit()
+        destinos: Dict[Type[SQLModel], object] = {}
+        yield destinos
+        return
+
+    destinos = prepara_staging(db, modelos)
+    try:
+        yield destinos
+        cria_indices_staging(db, modelos)
+        troca_tabelas(db, modelos)
+    except Exception:
+        db.rollback()
+        descarta_staging(db, modelos)
+        raise
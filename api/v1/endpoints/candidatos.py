@@ -7,6 +7,9 @@ from core.database import get_system_session
 from core.config import settings
 from api.utils.functions.CRUD_SystemDB import salvar_candidato, listar_candidatos, listar_detalhes_candidato_por_codigo, listar_candidatos_eager
 from core.services.fetch_S3_files import read_applicants_json_from_s3
+from api.utils.functions.delta_sync import MODO_COMPLETO, MODOS_SYNC
+from api.utils.functions.dataset_fingerprint import DATASET_CANDIDATOS
+from api.utils.functions.dataset_lock import escrita_dataset, RecargaEmAndamento, RETRY_AFTER_RECARGA
 from fastapi import BackgroundTasks
 
 router = APIRouter()
@@ -14,8 +17,12 @@ router = APIRouter()
 @router.post("/create", summary="Criar Candidato")
 def criar_candidato(data: dict, db: Session = Depends(get_system_session)):
     try:
-        codigo = salvar_candidato(data, db)
+        # Rejeitada durante a recarga das tabelas de candidatos, que descartaria a escrita
+        with escrita_dataset(DATASET_CANDIDATOS):
+            codigo = salvar_candidato(data, db)
         return {"message": "Candidato inserido com sucesso!", "codigo_candidato": codigo}
+    except RecargaEmAndamento as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_RECARGA)})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -50,9 +57,17 @@ def atualizar_tabelas(data: dict, background_tasks: BackgroundTasks, db: Session
     file_key = data.get("file_key")
     if not file_key:
         raise HTTPException(status_code=400, detail="O campo 'file_key' é obrigatório.")
+    # "completo" recarrega todas as tabelas; "delta" aplica apenas os registros novos, alterados e removidos
+    modo = data.get("modo", MODO_COMPLETO)
+    if modo not in MODOS_SYNC:
+        raise HTTPException(status_code=400, detail=f"O campo 'modo' deve ser um de: {', '.join(MODOS_SYNC)}.")
+    # Sem "force", a carga é ignorada quando o arquivo é o mesmo da última carga
+    force = data.get("force", False)
+    if not isinstance(force, bool):
+        raise HTTPException(status_code=400, detail="O campo 'force' deve ser booleano.")
     try:
         # Adiciona a tarefa em background para ler o JSON e atualizar o BD
-        background_tasks.add_task(read_applicants_json_from_s3, file_key)
+        background_tasks.add_task(read_applicants_json_from_s3, file_key, modo, force)
         return {"message": "Tarefa de atualização iniciada em background."}
     except HTTPException as exc:
         # Repassa as HTTPExceptions
@@ -1,10 +1,25 @@
 import pandas as pd
 import os
-from sentence_transformers import SentenceTransformer
-from annoy import AnnoyIndex
-from fastapi import APIRouter, HTTPException
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
 from pydantic import BaseModel
-from core.services.fetch_S3_files import busca_modelo_pkl_classificacao, busca_modelo_recomendacao, busca_recommendation_pairs, busca_drift_report
+from typing import List
+from core.services.fetch_S3_files import busca_modelo_recomendacao, busca_recommendation_pairs, busca_drift_report
+from core.config import settings
+from core.database import get_system_session
+from api.utils.functions.CRUD_SystemDB import (
+    VagaNaoEncontrada, listar_features_match_por_vaga, buscar_registro_recomendacao_vaga, listar_nomes_candidatos
+)
+from core.services.model_registry import match_model_registry
+from core.services.micro_batcher import MicroBatcher
+from core.services.inference_executor import match_executor, recommendation_executor
+from core.services.encoder import encode_textos
+from core.services.embedding_cache import embedding_cache, embedding_cache_vagas
+from core.services.recommendation_store import recommendation_store
+from core.services.vector_search import BACKENDS
+from core.services.delta_index import delta_vagas, encode_vagas, texto_recomendacao_vaga
+from core.services.prediction_cache import PredictionCache, match_prediction_cache, recommendation_prediction_cache
 
 router = APIRouter()
 
@@ -49,92 +64,434 @@ class InputDataRecomendacaoModel(BaseModel):
     pcd: str
     cv_candidato: str
     
+# Lista de colunas esperadas (mesmo nome usado no treinamento)
+EXPECTED_COLUMNS = [
+    "sexo", "estado_civil", "pcd", "vaga_especifica_para_pcd", "pais_vaga",
+    "nivel_academico","nivel_academico_vaga", "tipo_contratacao", "cidade", "cidade_vaga",
+    "nivel_profissional", "nivel_profissional_vaga", "ingles", "espanhol",
+    "outros_idiomas", "nivel_ingles_vaga", "nivel_espanhol_vaga",
+    "titulo_profissional", "titulo_vaga", "conhecimentos_tecnicos", 
+    "principais_atividades", "certificacoes", "outras_certificacoes", 
+    "area_atuacao", "areas_atuacao_vaga", "competencia_tecnicas_e_comportamentais", 
+    "cv_candidato", "combined_keywords"
+]
+
+def monta_dataframe_match(registros: List[dict]) -> pd.DataFrame:
+    """
+    Monta um único DataFrame no layout de EXPECTED_COLUMNS a partir de uma lista de registros.
+    """
+    input_data = pd.DataFrame(registros)
+    input_data = input_data.reindex(columns=EXPECTED_COLUMNS, fill_value="")
+    
+    # Cria a feature combinada, conforme feito no treinamento
+    input_data["combined_keywords"] = (
+        input_data["conhecimentos_tecnicos"].fillna("") + " " + input_data["principais_atividades"].fillna("")
+    ).str.strip()
+    return input_data
+
+def formata_probabilidade(probabilidade: float) -> float:
+    # Retorna a probabilidade da classe positiva em porcentagem
+    return round(float(probabilidade), 3) * 100
+
+def prediz_probabilidades_match(registros: List[dict], model=None):
+    """
+    Executa uma única predição vetorizada para todos os registros e retorna
+    a probabilidade da classe positiva de cada um, na mesma ordem.
+    """
+    # Usa o modelo residente em memória (carregado no startup e atualizado em background)
+    if model is None:
+        model = match_model_registry.get_model()
+    input_data = monta_dataframe_match(registros)
+    prediction = model.predict_proba(input_data)
+    return prediction[:, 1]
+
+def prediz_match_com_versao(registros: List[dict]) -> List[tuple]:
+    """
+    Predição com o modelo e a versão de um mesmo snapshot do registro: retorna, para cada
+    registro, o par (versão do modelo usado, probabilidade), usado como chave do cache.
+    """
+    versao, model = match_model_registry.get()
+    return [(versao, probabilidade) for probabilidade in prediz_probabilidades_match(registros, model)]
+
+# Esvazia o cache de predições sempre que uma nova versão do modelo for carregada
+match_model_registry.on_version_change(match_prediction_cache.sync_version)
+
+# Micro-batcher opcional (MICRO_BATCH_ENABLED) para agrupar requisições concorrentes de uma linha
+match_micro_batcher = MicroBatcher(
+    prediz_match_com_versao,
+    max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+    janela_ms=settings.MICRO_BATCH_WINDOW_MS,
+    executor=match_executor
+)
+
 @router.post("/matchModel/predict")
 async def inferir(payload: InputDataMatchModel):
     try:
-        # Carrega o modelo (usa a função que busca o arquivo .pkl no S3 ou cache)
-        model = busca_modelo_pkl_classificacao()
+        registro = payload.model_dump()
         
-        # Converte o payload para DataFrame
-        data = payload.model_dump()
+        # Pares já avaliados com a mesma versão do modelo são respondidos pelo cache
+        versao = match_model_registry.versao
+        if versao is not None:
+            match_prediction_cache.sync_version(versao)
+            encontrado, probabilidade = match_prediction_cache.get(PredictionCache.chave(registro, versao))
+            if encontrado:
+                return {"match_probability": formata_probabilidade(probabilidade)}
         
-        # Cria a feature combinada, se necessário, conforme feito no treinamento
-        data['combined_keywords'] = (data.get('conhecimentos_tecnicos', '') + " " + data.get('principais_atividades', '')).strip()
+        if settings.MICRO_BATCH_ENABLED:
+            # A predição é feita junto com as demais requisições que chegarem na mesma janela
+            versao_modelo, probabilidade = await match_micro_batcher.submit(registro)
+        else:
+            # A predição roda no pool de inferência, fora do event loop
+            versao_modelo, probabilidade = (await match_executor.run(prediz_match_com_versao, [registro]))[0]
         
-        # Lista de colunas esperadas (mesmo nome usado no treinamento)
-        expected_columns = [
-            "sexo", "estado_civil", "pcd", "vaga_especifica_para_pcd", "pais_vaga",
-            "nivel_academico","nivel_academico_vaga", "tipo_contratacao", "cidade", "cidade_vaga",
-            "nivel_profissional", "nivel_profissional_vaga", "ingles", "espanhol",
-            "outros_idiomas", "nivel_ingles_vaga", "nivel_espanhol_vaga",
-            "titulo_profissional", "titulo_vaga", "conhecimentos_tecnicos", 
-            "principais_atividades", "certificacoes", "outras_certificacoes", 
-            "area_atuacao", "areas_atuacao_vaga", "competencia_tecnicas_e_comportamentais", 
-            "cv_candidato", "combined_keywords"
-        ]
-        
-        # Converte para DataFrame e reordena colunas, preenchendo com string vazia se faltar algum campo
-        input_data = pd.DataFrame([data])
-        input_data = input_data.reindex(columns=expected_columns, fill_value="")
-        
-        # Realiza a predição de probabilidade
-        prediction = model.predict_proba(input_data)
+        # O resultado é gravado com a versão do modelo que o calculou (o modelo pode ter sido
+        # trocado durante a requisição)
+        match_prediction_cache.set(PredictionCache.chave(registro, versao_modelo), float(probabilidade))
         
         # Retorna somente a probabilidade da classe positiva
-        match_probability = round(float(prediction[0][1]), 3) * 100
+        match_probability = formata_probabilidade(probabilidade)
         
         return {"match_probability": match_probability}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
 
-@router.post("/recommendationModel/predict")
-async def inferir_recomendacao(payload: InputDataRecomendacaoModel):
+
+@router.post("/matchModel/predict-batch")
+async def inferir_lote(payloads: List[InputDataMatchModel]):
+    """
+    Calcula a probabilidade de match para vários pares candidato/vaga com uma única
+    chamada ao modelo. A ordem da resposta segue a ordem dos payloads recebidos.
+    """
+    if not payloads:
+        raise HTTPException(status_code=400, detail="A lista de payloads não pode ser vazia.")
+    if len(payloads) > settings.MATCH_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"O lote deve ter no máximo {settings.MATCH_BATCH_MAX_SIZE} payloads."
+        )
     try:
-        # Carrega o modelo (usa a função que busca o arquivo .pkl no S3 ou cache)
-        recommendation_files = busca_modelo_recomendacao()
-        annoy_index_path = recommendation_files["annoy_index_path"]
-        recommendation_pairs_path = busca_recommendation_pairs()
-        input_data = pd.DataFrame([payload.model_dump()])
-        candidate_text = " ".join([
-            payload.titulo_profissional,
-            payload.conhecimentos_tecnicos,
-            payload.certificacoes,
-            payload.outras_certificacoes,
-            payload.cidade,
-            payload.ingles,
-            payload.espanhol,
-            payload.outros_idiomas,
-            payload.pcd,
-            payload.cv_candidato
-        ])
-        
-        # Carrega modelos
-        transformer_model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")        
-        candidate_embedding = transformer_model.encode([candidate_text])[0]
-        dim = len(candidate_embedding)
-        
-        # Carrega o índice Annoy (que foi criado com base nos embeddings de vagas)
-        annoy_index = AnnoyIndex(384, "angular")
-        annoy_index.load(annoy_index_path)
-        
-        # Busca os 5 índices mais próximos
-        indices = annoy_index.get_nns_by_vector(candidate_embedding, 5, include_distances=False)
+        # Um único DataFrame e uma única predição vetorizada para todo o lote
+        probabilidades = await match_executor.run(
+            prediz_probabilidades_match, [payload.model_dump() for payload in payloads]
+        )
         
-        # Carrega os pares de recomendação (arquivo parquet) 
-        df = pd.read_parquet(recommendation_pairs_path)
-        # É esperado que o dataframe contenha as colunas utilizadas para criar os embeddings de vaga: 
-        # "titulo_vaga", "competencia_tecnicas_e_comportamentais" e "area_atuacao_vaga"
-        recommendations = df.iloc[indices][["codigo_vaga","titulo_vaga", "competencia_tecnicas_e_comportamentais", "areas_atuacao_vaga"]]
-        # dropar duplicados
-        recommendations = recommendations.drop_duplicates(subset=["codigo_vaga"])
+        return {
+            "total": len(payloads),
+            "data": [{"match_probability": formata_probabilidade(p)} for p in probabilidades]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+
+def ranqueia_candidatos_vaga(codigo_vaga: int, db: Session) -> dict:
+    """
+    Carrega a vaga e todos os candidatos associados a ela, monta as features no servidor
+    e as avalia com uma única predição vetorizada.
+    """
+    vaga, candidatos = listar_features_match_por_vaga(codigo_vaga, db)
+    ranking = []
+    if candidatos:
+        probabilidades = prediz_probabilidades_match([candidato["features"] for candidato in candidatos])
+        for candidato, probabilidade in zip(candidatos, probabilidades):
+            ranking.append({
+                "codigo_candidato": candidato["codigo_candidato"],
+                "nome": candidato["nome"],
+                "situacao_candidato": candidato["situacao_candidato"],
+                "match_probability": formata_probabilidade(probabilidade)
+            })
+        ranking.sort(key=lambda item: item["match_probability"], reverse=True)
+    
+    return {"codigo_vaga": vaga.codigo_vaga, "titulo_vaga": vaga.titulo_vaga, "ranking": ranking}
+
+
+@router.get("/matchModel/rank/{codigo_vaga}")
+async def ranquear_candidatos_vaga(
+    codigo_vaga: int, limit: int = Query(None, ge=1), db: Session = Depends(get_system_session)
+):
+    """
+    Retorna os candidatos associados à vaga ordenados pela probabilidade de match.
+    """
+    try:
+        resultado = await match_executor.run(ranqueia_candidatos_vaga, codigo_vaga, db)
+        ranking = resultado["ranking"][:limit] if limit is not None else resultado["ranking"]
+        return {
+            "codigo_vaga": resultado["codigo_vaga"],
+            "titulo_vaga": resultado["titulo_vaga"],
+            "total": len(resultado["ranking"]),
+            "data": ranking
+        }
+    except HTTPException:
+        raise
+    except VagaNaoEncontrada as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+
+@router.get("/metrics")
+async def inferir_metricas():
+    """Retorna as métricas internas do serviço de inferência."""
+    return {
+        "micro_batching": {
+            "habilitado": settings.MICRO_BATCH_ENABLED,
+            **match_micro_batcher.metrics()
+        },
+        "executores": {
+            "match": match_executor.metrics(),
+            "recomendacao": recommendation_executor.metrics()
+        },
+        "cache": {
+            "match": match_prediction_cache.metrics(),
+            "recomendacao": recommendation_prediction_cache.metrics()
+        },
+        "embeddings": embedding_cache.metrics(),
+        "embeddings_vagas": embedding_cache_vagas.metrics(),
+        "delta_vagas": delta_vagas.metrics()
+    }
+
+
+def texto_candidato(payload: InputDataRecomendacaoModel) -> str:
+    # Mesmo texto usado para gerar os embeddings de candidatos no treinamento
+    return " ".join([
+        payload.titulo_profissional,
+        payload.conhecimentos_tecnicos,
+        payload.certificacoes,
+        payload.outras_certificacoes,
+        payload.cidade,
+        payload.ingles,
+        payload.espanhol,
+        payload.outros_idiomas,
+        payload.pcd,
+        payload.cv_candidato
+    ])
+
+def busca_vagas_similares(indice_vagas, tabela_vagas, candidate_embedding, k: int = 5, search_k: int = -1) -> List[dict]:
+    """
+    Retorna as k vagas distintas mais próximas do embedding, com a distância angular de cada uma.
+    Como várias linhas do índice podem pertencer à mesma vaga, a busca pede mais vizinhos
+    (dobrando a quantidade) até obter k valores distintos de codigo_vaga ou esgotar o índice.
+    search_k controla o número de nós inspecionados pelo Annoy (-1 usa o padrão do índice;
+    ignorado na busca exata).
+    """
+    total_itens = indice_vagas.get_n_items()
+    quantidade = min(k, total_itens)
+    while True:
+        indices, distancias = indice_vagas.get_nns_by_vector(
+            candidate_embedding, quantidade, search_k=search_k, include_distances=True
+        )
         
+        # Mantém a ordem de proximidade, descartando vagas duplicadas
+        recomendacoes = []
+        vistos = set()
+        for registro, distancia in zip(tabela_vagas.registros(indices), distancias):
+            if registro["codigo_vaga"] not in vistos:
+                vistos.add(registro["codigo_vaga"])
+                registro["distancia"] = round(float(distancia), 6)
+                recomendacoes.append(registro)
         
+        # Para quando há vagas suficientes, quando o índice foi esgotado ou quando o search_k
+        # informado não permite encontrar mais vizinhos
+        if len(recomendacoes) >= k or quantidade >= total_itens or len(indices) < quantidade:
+            return recomendacoes[:k]
+        quantidade = min(quantidade * 2, total_itens)
 
-        return {"data": recommendations.to_dict(orient="records")}
-        
+def busca_vagas_com_delta(indice_vagas, tabela_vagas, candidate_embedding, k: int = 5, search_k: int = -1) -> List[dict]:
+    """
+    Busca no índice base e no índice delta (vagas criadas após a última versão do índice)
+    e combina os resultados pela distância.
+    """
+    # Pede vagas extras ao índice base, pois as que estão no delta substituem as do base. O excedente
+    # é limitado a k: as vagas do base descartadas além disso são compensadas pelas k vagas do delta
+    recomendacoes_base = busca_vagas_similares(
+        indice_vagas, tabela_vagas, candidate_embedding, k + min(delta_vagas.total, k), search_k
+    )
+    return delta_vagas.combina(recomendacoes_base, candidate_embedding, k)
+
+# Threads para as buscas no índice de vagas de um lote (a busca no Annoy e o produto matriz-vetor liberam o GIL)
+recommendation_search_pool = ThreadPoolExecutor(
+    max_workers=settings.RECOMMENDATION_SEARCH_THREADS, thread_name_prefix="recommendation-search"
+)
+
+def recomenda_vagas_lote(
+    payloads: List[InputDataRecomendacaoModel], k: int = 5, search_k: int = -1, backend: str = None
+) -> List[List[dict]]:
+    """
+    Gera as recomendações de vagas para vários candidatos (encode, busca no índice e leitura dos pares).
+    Os textos inéditos são codificados em uma única chamada ao encoder e as buscas no índice
+    rodam em paralelo. Função síncrona e CPU-bound: deve ser executada no pool de recomendação.
+    """
+    backend = backend or settings.RECOMMENDATION_SEARCH_BACKEND
+    # Vagas incluídas no índice delta por outros workers desde a última requisição
+    delta_vagas.sincroniza()
+    resultados = [None] * len(payloads)
+    pendentes = list(range(len(payloads)))
+    
+    def consulta_cache(versao: str) -> List[str]:
+        # Recomendações já calculadas para o mesmo payload, versão e estado do índice delta
+        chaves = [
+            PredictionCache.chave(
+                payload.model_dump(), versao, k=k, search_k=search_k, backend=backend, delta=delta_vagas.geracao
+            )
+            for payload in payloads
+        ]
+        for posicao in list(pendentes):
+            encontrado, recomendacoes = recommendation_prediction_cache.get(chaves[posicao])
+            if encontrado:
+                resultados[posicao] = recomendacoes
+                pendentes.remove(posicao)
+        return chaves
+    
+    # O cache é consultado antes dos artefatos: a versão confirmada há menos de
+    # S3_CACHE_FRESHNESS_SECONDS (mesma janela de frescor do cache do S3) continua válida
+    versao_recente = recommendation_prediction_cache.versao_recente(settings.S3_CACHE_FRESHNESS_SECONDS)
+    if versao_recente is not None:
+        chaves = consulta_cache(versao_recente)
+        if not pendentes:
+            return resultados
+    
+    # Carrega os artefatos de recomendação (S3 ou cache)
+    recommendation_files = busca_modelo_recomendacao()
+    recommendation_pairs_path = busca_recommendation_pairs()
+    
+    # A versão ativa combina o latest.txt do índice com o arquivo de pares em cache.
+    # O índice delta é descartado quando o latest.txt aponta para uma nova versão base
+    delta_vagas.sync_base(recommendation_files["versao"])
+    versao = recommendation_store.versao(recommendation_files, recommendation_pairs_path)
+    recommendation_prediction_cache.sync_version(versao)
+    if versao != versao_recente:
+        chaves = consulta_cache(versao)
+        if not pendentes:
+            return resultados
+    
+    # Usa o encoder único do processo; textos já vistos vêm do cache de embeddings
+    embeddings = encode_textos([texto_candidato(payloads[posicao]) for posicao in pendentes])
+    
+    # Índice de vagas (Annoy ou exato) e tabela de vagas residentes, recarregados só quando os arquivos mudam
+    indice_vagas = recommendation_store.get_indice_vagas(recommendation_files, backend)
+    tabela_vagas = recommendation_store.get_tabela_vagas(recommendation_pairs_path)
+    
+    if len(pendentes) == 1:
+        encontrados = [busca_vagas_com_delta(indice_vagas, tabela_vagas, embeddings[0], k, search_k)]
+    else:
+        encontrados = recommendation_search_pool.map(
+            lambda embedding: busca_vagas_com_delta(indice_vagas, tabela_vagas, embedding, k, search_k), embeddings
+        )
+    
+    for posicao, recomendacoes in zip(pendentes, encontrados):
+        recommendation_prediction_cache.set(chaves[posicao], recomendacoes)
+        resultados[posicao] = recomendacoes
+    return resultados
+
+def recomenda_vagas(payload: InputDataRecomendacaoModel, k: int = 5, search_k: int = -1, backend: str = None) -> List[dict]:
+    return recomenda_vagas_lote([payload], k, search_k, backend)[0]
+
+def valida_parametros_busca(k: int, search_k: int, backend: str = None):
+    if k < 1:
+        raise HTTPException(status_code=400, detail="O parâmetro k deve ser maior ou igual a 1.")
+    if search_k < -1 or search_k == 0:
+        raise HTTPException(status_code=400, detail="O parâmetro search_k deve ser -1 (padrão do índice) ou positivo.")
+    if backend is not None and backend not in BACKENDS:
+        raise HTTPException(status_code=400, detail=f"O parâmetro backend deve ser um de: {', '.join(BACKENDS)}.")
+
+
+@router.post("/recommendationModel/predict")
+async def inferir_recomendacao(payload: InputDataRecomendacaoModel, k: int = 5, search_k: int = -1, backend: str = None):
+    valida_parametros_busca(k, search_k, backend)
+    try:
+        # Encode, busca no índice e leitura dos pares rodam no pool de recomendação, fora do event loop
+        recomendacoes = await recommendation_executor.run(recomenda_vagas, payload, k, search_k, backend)
+        return {"data": recomendacoes}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/recommendationModel/predict-batch")
+async def inferir_recomendacao_lote(
+    payloads: List[InputDataRecomendacaoModel], k: int = 5, search_k: int = -1, backend: str = None
+):
+    """
+    Gera as recomendações de vagas para vários candidatos em uma única requisição.
+    A ordem da resposta segue a ordem dos payloads recebidos.
+    """
+    if not payloads:
+        raise HTTPException(status_code=400, detail="A lista de payloads não pode ser vazia.")
+    if len(payloads) > settings.RECOMMENDATION_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"O lote deve ter no máximo {settings.RECOMMENDATION_BATCH_MAX_SIZE} payloads."
+        )
+    valida_parametros_busca(k, search_k, backend)
+    try:
+        resultados = await recommendation_executor.run(recomenda_vagas_lote, payloads, k, search_k, backend)
+        return {
+            "total": len(payloads),
+            "data": [{"recomendacoes": recomendacoes} for recomendacoes in resultados]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+def recomenda_candidatos(codigo_vaga: int, k: int, db: Session) -> dict:
+    """
+    Busca os k candidatos mais próximos de uma vaga nos embeddings de candidatos.
+    O embedding da vaga vem do índice delta (vagas criadas/alteradas após o treinamento) ou de
+    job_embeddings quando a vaga está no índice; caso contrário, o texto da vaga é lido do banco e codificado.
+    """
+    recommendation_files = busca_modelo_recomendacao()
+    recommendation_pairs_path = busca_recommendation_pairs()
+    tabela_vagas = recommendation_store.get_tabela_vagas(recommendation_pairs_path)
+    delta_vagas.sync_base(recommendation_files["versao"])
+    
+    linha = tabela_vagas.linha_da_vaga(codigo_vaga)
+    vaga_embedding = delta_vagas.vetor(codigo_vaga)
+    if vaga_embedding is not None:
+        origem_embedding = "delta"
+    elif linha is not None:
+        vaga_embedding = recommendation_store.get_job_embeddings(recommendation_files)[linha]
+        origem_embedding = "indice"
+    else:
+        registro = buscar_registro_recomendacao_vaga(codigo_vaga, db)
+        vaga_embedding = encode_vagas([texto_recomendacao_vaga(registro)])[0]
+        origem_embedding = "banco"
+    
+    indice_candidatos = recommendation_store.get_indice_candidatos(recommendation_files, recommendation_pairs_path)
+    encontrados = indice_candidatos.busca(vaga_embedding, k)
+    
+    # Nomes dos candidatos em uma única consulta
+    nomes = listar_nomes_candidatos([codigo for codigo, _ in encontrados], db)
+    return {
+        "codigo_vaga": codigo_vaga,
+        "origem_embedding": origem_embedding,
+        "data": [
+            {"codigo_candidato": codigo, "nome": nomes.get(codigo), "distancia": round(distancia, 6)}
+            for codigo, distancia in encontrados
+        ]
+    }
+
+
+@router.get("/recommendationModel/candidates/{codigo_vaga}")
+async def inferir_candidatos_vaga(codigo_vaga: int, k: int = 10, db: Session = Depends(get_system_session)):
+    """
+    Retorna os k candidatos mais próximos da vaga, ordenados pela distância angular entre os embeddings.
+    """
+    if k < 1:
+        raise HTTPException(status_code=400, detail="O parâmetro k deve ser maior ou igual a 1.")
+    try:
+        return await recommendation_executor.run(recomenda_candidatos, codigo_vaga, k, db)
+    except HTTPException:
+        raise
+    except VagaNaoEncontrada as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
     
 @router.get("/driftReport")
 async def inferir_drift_report():
@@ -8,6 +8,9 @@ from core.database import get_system_session
 from core.config import settings
 from api.utils.functions.CRUD_SystemDB import listar_prospects, add_candidate_to_prospect, update_candidate_in_prospect, listar_prospects_group, listar_prospects_group_eager, busca_prospect_por_codigo_vaga
 from core.services.fetch_S3_files import read_prospects_json_from_s3
+from api.utils.functions.delta_sync import MODO_COMPLETO, MODOS_SYNC
+from api.utils.functions.dataset_fingerprint import DATASET_PROSPECTS
+from api.utils.functions.dataset_lock import escrita_dataset, RecargaEmAndamento, RETRY_AFTER_RECARGA
 from pydantic import BaseModel
 from fastapi import BackgroundTasks
 
@@ -33,16 +36,23 @@ class ProspectUpdatePayload(BaseModel):
 @router.post("/add-candidate", summary="Adicionar candidato à vaga (prospect)")
 async def add_candidate(payload: ProspectAddPayload, db: Session = Depends(get_system_session)):
     try:
-        prospect = add_candidate_to_prospect(payload.model_dump(), db)
+        # Rejeitada durante a recarga das tabelas de prospects, que descartaria a escrita
+        with escrita_dataset(DATASET_PROSPECTS):
+            prospect = add_candidate_to_prospect(payload.model_dump(), db)
         return {"message": "Prospect criado com sucesso.", "data": prospect.model_dump()}
+    except RecargaEmAndamento as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_RECARGA)})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/update-candidate", summary="Atualizar informações do candidato no prospect")
 async def update_candidate(payload: ProspectUpdatePayload, db: Session = Depends(get_system_session)):
     try:
-        prospect = update_candidate_in_prospect(payload.model_dump(), db)
+        with escrita_dataset(DATASET_PROSPECTS):
+            prospect = update_candidate_in_prospect(payload.model_dump(), db)
         return {"message": "Prospect atualizado com sucesso.", "data": prospect.model_dump()}
+    except RecargaEmAndamento as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_RECARGA)})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     
@@ -97,9 +107,17 @@ async def atualizar_tabelas(data: dict, background_tasks: BackgroundTasks, db: S
     file_key = data.get("file_key")
     if not file_key:
             raise HTTPException(status_code=400, detail="O campo 'file_key' é obrigatório.")
+    # "completo" recarrega todas as tabelas; "delta" aplica apenas os registros novos, alterados e removidos
+    modo = data.get("modo", MODO_COMPLETO)
+    if modo not in MODOS_SYNC:
+        raise HTTPException(status_code=400, detail=f"O campo 'modo' deve ser um de: {', '.join(MODOS_SYNC)}.")
+    # Sem "force", a carga é ignorada quando o arquivo é o mesmo da última carga
+    force = data.get("force", False)
+    if not isinstance(force, bool):
+        raise HTTPException(status_code=400, detail="O campo 'force' deve ser booleano.")
     try:
         # Adiciona a tarefa em background para ler o JSON e atualizar o BD
-        background_tasks.add_task(read_prospects_json_from_s3, file_key)
+        background_tasks.add_task(read_prospects_json_from_s3, file_key, modo, force)
 
         return {"message": "Tarefa de atualização iniciada em background."}
     except HTTPException as exc:
@@ -12,15 +12,36 @@ from api.utils.functions.CRUD_SystemDB import (
     listar_vagas_eager
 )
 from core.services.fetch_S3_files import read_vagas_json_from_s3
+from api.utils.functions.delta_sync import MODO_COMPLETO, MODOS_SYNC
+from api.utils.functions.dataset_fingerprint import DATASET_VAGAS
+from api.utils.functions.dataset_lock import escrita_dataset, RecargaEmAndamento, RETRY_AFTER_RECARGA
+from core.services.delta_index import indexa_vaga
 from fastapi import BackgroundTasks 
 
 router = APIRouter()
 
+def registro_recomendacao_vaga(codigo_vaga: int, data: dict) -> dict:
+    # Campos da vaga usados pelo modelo de recomendação (mesmo formato do recommendation_pairs.parquet)
+    infos_basicas = data.get("infos_basicas") or {}
+    perfil = data.get("perfil_vaga") or {}
+    return {
+        "codigo_vaga": codigo_vaga,
+        "titulo_vaga": infos_basicas.get("titulo_vaga"),
+        "competencia_tecnicas_e_comportamentais": perfil.get("competencia_tecnicas_e_comportamentais"),
+        "areas_atuacao_vaga": perfil.get("areas_atuacao"),
+    }
+
 @router.post("/create", summary="Criar Vaga")
-def criar_vaga(data: dict, db: Session = Depends(get_system_session)):
+def criar_vaga(data: dict, background_tasks: BackgroundTasks, db: Session = Depends(get_system_session)):
     try:
-        codigo = salvar_vaga(data, db)
+        # Rejeitada durante a recarga das tabelas de vagas, que descartaria a escrita
+        with escrita_dataset(DATASET_VAGAS):
+            codigo = salvar_vaga(data, db)
+        # Torna a vaga recomendável imediatamente, sem esperar a reconstrução do índice
+        background_tasks.add_task(indexa_vaga, registro_recomendacao_vaga(codigo, data))
         return {"message": "Vaga criada com sucesso!", "codigo_vaga": codigo}
+    except RecargaEmAndamento as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_RECARGA)})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -53,9 +74,17 @@ def atualizar_tabelas_vagas_endpoint(data: dict, background_tasks: BackgroundTas
     file_key = data.get("file_key")
     if not file_key:
         raise HTTPException(status_code=400, detail="O campo 'file_key' é obrigatório.")
+    # "completo" recarrega todas as tabelas; "delta" aplica apenas os registros novos, alterados e removidos
+    modo = data.get("modo", MODO_COMPLETO)
+    if modo not in MODOS_SYNC:
+        raise HTTPException(status_code=400, detail=f"O campo 'modo' deve ser um de: {', '.join(MODOS_SYNC)}.")
+    # Sem "force", a carga é ignorada quando o arquivo é o mesmo da última carga
+    force = data.get("force", False)
+    if not isinstance(force, bool):
+        raise HTTPException(status_code=400, detail="O campo 'force' deve ser booleano.")
     try:
         # Adiciona a tarefa em background para ler o JSON e atualizar o BD
-        background_tasks.add_task(read_vagas_json_from_s3, file_key)
+        background_tasks.add_task(read_vagas_json_from_s3, file_key, modo, force)
         return {"message": "Tarefa de atualização iniciada em background."}
     except HTTPException as exc:
         raise exc
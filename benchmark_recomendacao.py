@@ -0,0 +1,176 @@
+"""
+Benchmark do índice Annoy de recomendação contra a busca exata (ground truth).
+
+Para cada valor de search_k, mede o recall@k do Annoy em relação à busca exata por cosseno
+sobre job_embeddings.npy e a latência por consulta dos dois backends. As consultas são linhas
+amostradas de candidate_embeddings.npy (o mesmo tipo de vetor usado na recomendação).
+Também mede a perda de precisão da busca exata sobre matrizes quantizadas (float16/int8),
+junto com a memória ocupada por cada representação, nos dois índices afetados por
+EMBEDDINGS_QUANTIZATION: o de vagas (consultas = embeddings de candidatos) e o de candidatos
+usado por /recommendationModel/candidates (consultas = embeddings de vagas, uma linha por candidato).
+
+Com --encoder, compara o SentenceTransformer float com a versão de quantização dinâmica int8:
+speedup do encode e drift dos embeddings (cosseno entre os dois modelos).
+
+Uso (com os artefatos já baixados em ./cache):
+    python benchmark_recomendacao.py --k 10 --search-k -1 100 1000 10000 --quantizacoes float16 int8
+    python benchmark_recomendacao.py --encoder ./models_cache/paraphrase-multilingual-MiniLM-L12-v2
+"""
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from annoy import AnnoyIndex
+from core.services.vector_search import IndiceExato, QUANTIZACOES, QUANTIZACAO_NENHUMA
+
+
+def percentil(latencias_ms: list, p: float) -> float:
+    return round(float(np.percentile(latencias_ms, p)), 3)
+
+
+def mede(busca, consultas: np.ndarray):
+    """Executa a busca para cada consulta e retorna (resultados, latências em ms)."""
+    resultados, latencias = [], []
+    for consulta in consultas:
+        inicio = time.perf_counter()
+        resultados.append(busca(consulta))
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return resultados, latencias
+
+
+def linha_resultado(nome: str, latencias: list, recall: float = None) -> str:
+    recall_txt = f"{recall:.4f}" if recall is not None else "1.0000"
+    return (
+        f"{nome:<26} recall={recall_txt}  media={np.mean(latencias):.3f}ms  "
+        f"p50={percentil(latencias, 50)}ms  p95={percentil(latencias, 95)}ms"
+    )
+
+
+def recall_medio(aproximados: list, exatos: list) -> float:
+    return float(np.mean([
+        len(set(aproximado) & set(exato)) / max(len(exato), 1)
+        for aproximado, exato in zip(aproximados, exatos)
+    ]))
+
+
+def benchmark_quantizacao(nome: str, vetores: np.ndarray, consultas: np.ndarray, k: int, quantizacoes: list,
+                          fator_reranqueamento: int, linhas: np.ndarray = None) -> list:
+    """
+    Mede a busca exata float32 (ground truth) e a perda de precisão das matrizes quantizadas
+    (recall@k e diferença da distância ao k-ésimo vizinho), com a memória de cada representação.
+    Retorna os resultados exatos de cada consulta.
+    """
+    indice_exato = IndiceExato(vetores, linhas=linhas)
+    exatos, latencias_exato = mede(lambda c: indice_exato.get_nns_by_vector(c, k, include_distances=True), consultas)
+    print(linha_resultado(f"{nome} exato", latencias_exato) + f"  memoria={indice_exato.bytes_memoria / 1024 ** 2:.1f}MB")
+
+    # Busca exata sobre matrizes quantizadas, com reordenação float32 da lista curta
+    for quantizacao in quantizacoes:
+        indice = IndiceExato(vetores, linhas=linhas, quantizacao=quantizacao, fator_reranqueamento=fator_reranqueamento)
+        resultados, latencias = mede(lambda c: indice.get_nns_by_vector(c, k, include_distances=True), consultas)
+        recall = recall_medio([indices for indices, _ in resultados], [indices for indices, _ in exatos])
+        erro = max(abs(d[-1] - r[-1]) for (_, d), (_, r) in zip(resultados, exatos))
+        print(
+            linha_resultado(f"{nome} exato {quantizacao}", latencias, recall)
+            + f"  memoria={indice.bytes_memoria / 1024 ** 2:.1f}MB"
+            + f" ({indice_exato.bytes_memoria / indice.bytes_memoria:.1f}x menor)"
+            + f"  erro_max_distancia_k={erro:.6f}"
+        )
+    return [indices for indices, _ in exatos]
+
+
+def amostra_consultas(vetores: np.ndarray, amostras: int, rng: np.random.Generator) -> np.ndarray:
+    linhas = rng.choice(vetores.shape[0], size=min(amostras, vetores.shape[0]), replace=False)
+    return np.asarray(vetores[np.sort(linhas)], dtype=np.float32)
+
+
+def benchmark_encoder(diretorio: str, repeticoes: int):
+    """Compara o encoder float com o int8 (quantização dinâmica) em latência e drift dos embeddings."""
+    from sentence_transformers import SentenceTransformer
+    from core.services.encoder_quantization import TEXTOS_AMOSTRA, compara_encoders, quantiza_encoder
+
+    modelo_float = SentenceTransformer(diretorio, device="cpu", local_files_only=True)
+    modelo_int8 = quantiza_encoder(modelo_float)
+
+    tempos = {}
+    for nome, modelo in (("float", modelo_float), ("int8", modelo_int8)):
+        modelo.encode(TEXTOS_AMOSTRA)  # aquecimento
+        _, latencias = mede(lambda textos: modelo.encode(list(textos)), [TEXTOS_AMOSTRA] * repeticoes)
+        tempos[nome] = latencias
+        print(
+            f"encoder {nome:<6} lote={len(TEXTOS_AMOSTRA)}  media={np.mean(latencias):.2f}ms  "
+            f"p50={percentil(latencias, 50)}ms  p95={percentil(latencias, 95)}ms"
+        )
+
+    comparacao = compara_encoders(modelo_float, modelo_int8)
+    print(
+        f"speedup int8={np.mean(tempos['float']) / np.mean(tempos['int8']):.2f}x  "
+        f"drift: cosseno_min={comparacao['cosseno_min']}  cosseno_medio={comparacao['cosseno_medio']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de recall e latência do índice Annoy de recomendação.")
+    parser.add_argument("--cache-dir", default="./cache", help="Diretório com os artefatos baixados do S3.")
+    parser.add_argument("--k", type=int, default=10, help="Quantidade de vizinhos avaliados (recall@k).")
+    parser.add_argument("--search-k", type=int, nargs="+", default=[-1, 100, 1000, 10000],
+                        help="Valores de search_k avaliados no Annoy.")
+    parser.add_argument("--quantizacoes", nargs="*", default=["float16", "int8"],
+                        choices=[q for q in QUANTIZACOES if q != QUANTIZACAO_NENHUMA],
+                        help="Representações quantizadas avaliadas na busca exata.")
+    parser.add_argument("--fator-reranqueamento", type=int, default=4,
+                        help="Tamanho da lista reordenada em float32 (múltiplos de k).")
+    parser.add_argument("--amostras", type=int, default=500, help="Quantidade de consultas amostradas.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--encoder", default=None,
+                        help="Diretório do SentenceTransformer: compara o encoder float com o int8 e encerra.")
+    parser.add_argument("--repeticoes", type=int, default=20, help="Repetições do encode no benchmark do encoder.")
+    args = parser.parse_args()
+
+    if args.encoder:
+        benchmark_encoder(args.encoder, args.repeticoes)
+        return
+
+    job_embeddings = np.load(os.path.join(args.cache_dir, "job_embeddings.npy"), mmap_mode="r")
+    candidate_embeddings = np.load(os.path.join(args.cache_dir, "candidate_embeddings.npy"), mmap_mode="r")
+
+    annoy_index = AnnoyIndex(job_embeddings.shape[1], "angular")
+    annoy_index.load(os.path.join(args.cache_dir, "annoy_index.ann"))
+
+    rng = np.random.default_rng(args.seed)
+    consultas = amostra_consultas(candidate_embeddings, args.amostras, rng)
+
+    print(f"Itens no índice: {annoy_index.get_n_items()} | dimensão: {job_embeddings.shape[1]} | "
+          f"consultas: {len(consultas)} | k: {args.k}")
+
+    # Índice de vagas. Ground truth: busca exata float32
+    exatos = benchmark_quantizacao(
+        "vagas", job_embeddings, consultas, args.k, args.quantizacoes, args.fator_reranqueamento
+    )
+
+    # Índice de candidatos: como no IndiceCandidatos, uma linha por candidato (a primeira de cada um)
+    pairs_path = os.path.join(args.cache_dir, "recommendation_pairs.parquet")
+    colunas = pq.read_schema(pairs_path).names
+    coluna = next((nome for nome in ("codigo_candidato", "codigo_profissional") if nome in colunas), None)
+    if coluna is None:
+        print("recommendation_pairs.parquet sem coluna de candidato: índice de candidatos não avaliado.")
+    else:
+        codigos = pd.read_parquet(pairs_path, columns=[coluna])[coluna].to_numpy()
+        _, primeiras = np.unique(codigos, return_index=True)
+        benchmark_quantizacao(
+            "candidatos", candidate_embeddings, amostra_consultas(job_embeddings, args.amostras, rng),
+            args.k, args.quantizacoes, args.fator_reranqueamento, linhas=np.sort(primeiras)
+        )
+
+    for search_k in args.search_k:
+        aproximados, latencias = mede(
+            lambda c: annoy_index.get_nns_by_vector(c, args.k, search_k=search_k), consultas
+        )
+        recall = recall_medio(aproximados, exatos)
+        print(linha_resultado(f"annoy search_k={search_k}", latencias, recall))
+
+
+if __name__ == "__main__":
+    main()
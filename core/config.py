@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 from pydantic_settings import BaseSettings
 from core.services.parameterServiceAws import get_ssm_parameter
 
@@ -13,6 +14,49 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "info"
     BUCKET_NAME: str
     ENV: str = "development"
+    MODEL_POLL_INTERVAL_SECONDS: int = 60  # intervalo de verificação do latest.txt do modelo de matching
+    MICRO_BATCH_ENABLED: bool = False  # agrupa predições concorrentes de /matchModel/predict em lotes
+    MICRO_BATCH_MAX_SIZE: int = 32
+    MICRO_BATCH_WINDOW_MS: int = 5
+    # Número máximo de payloads por requisição de /matchModel/predict-batch (acima dele, 413)
+    MATCH_BATCH_MAX_SIZE: int = 256
+    # Pools dedicados para inferência (fora do event loop) e limite de tarefas aguardando em fila
+    INFERENCE_MATCH_WORKERS: int = 2
+    INFERENCE_MATCH_QUEUE_LIMIT: int = 32
+    INFERENCE_RECOMMENDATION_WORKERS: int = 2
+    INFERENCE_RECOMMENDATION_QUEUE_LIMIT: int = 16
+    # Cache de resultados de inferência (LRU + TTL), invalidado quando o modelo/índice muda
+    PREDICTION_CACHE_MAX_ITEMS: int = 10000
+    PREDICTION_CACHE_TTL_SECONDS: int = 3600
+    # Encoder de recomendação, carregado uma vez por processo a partir de um diretório local (sem rede)
+    SENTENCE_MODEL_NAME: str = "paraphrase-multilingual-MiniLM-L12-v2"
+    SENTENCE_MODEL_DIR: str = "./models_cache/paraphrase-multilingual-MiniLM-L12-v2"
+    # Quantização dinâmica int8 das camadas Linear do encoder ("none" ou "int8"), validada na carga
+    # contra o modelo float: abaixo do cosseno mínimo, o encoder float é mantido.
+    # Valores desconhecidos são rejeitados na inicialização, assim como nos demais modos abaixo
+    ENCODER_QUANTIZATION: Literal["none", "int8"] = "none"
+    ENCODER_QUANTIZATION_MIN_COSINE: float = 0.98
+    # Cache de embeddings dos textos de candidatos (LRU em memória + arquivo memory-mapped em cache/)
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 5000
+    EMBEDDING_CACHE_DISK_ENABLED: bool = True
+    # Recomendação em lote: tamanho do lote no encode e threads para as buscas no índice Annoy
+    ENCODER_BATCH_SIZE: int = 64
+    RECOMMENDATION_SEARCH_THREADS: int = 4
+    # Número máximo de payloads por requisição de /recommendationModel/predict-batch (acima dele, 413)
+    RECOMMENDATION_BATCH_MAX_SIZE: int = 256
+    # Backend padrão da busca de vagas: "annoy" (aproximado) ou "exato" (produto matriz-vetor em NumPy)
+    RECOMMENDATION_SEARCH_BACKEND: Literal["annoy", "exato"] = "annoy"
+    # Representação em memória das matrizes de embeddings da busca exata ("none", "float16" ou "int8")
+    # e tamanho da lista reordenada em float32 (múltiplos de k) quando quantizadas
+    EMBEDDINGS_QUANTIZATION: Literal["none", "float16", "int8"] = "none"
+    EMBEDDINGS_RERANK_FACTOR: int = 4
+    # Downloads do S3: arquivos acima do limite são baixados em partes paralelas (GETs por intervalo)
+    S3_MULTIPART_THRESHOLD_MB: int = 16
+    S3_PART_SIZE_MB: int = 8
+    S3_FETCH_WORKERS: int = 8
+    # Janela de frescor do cache local (stale-while-revalidate): artefatos validados há menos tempo
+    # são servidos sem chamar o S3; depois dela, a cópia em cache é servida e revalidada em background
+    S3_CACHE_FRESHNESS_SECONDS: int = 300
 
     class Config:
         env_file = ".env"
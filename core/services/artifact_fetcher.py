@@ -0,0 +1,238 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Optional, Tuple
+from botocore.exceptions import ClientError
+
+
+# Tamanho dos blocos lidos do corpo das respostas do S3 e gravados em disco
+TAMANHO_LEITURA = 1024 * 1024
+
+
+def codigo_erro(erro: ClientError) -> str:
+    return str(erro.response.get("Error", {}).get("Code", ""))
+
+
+def status_http(erro: ClientError) -> int:
+    return erro.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+
+
+def nao_modificado(erro: ClientError) -> bool:
+    return status_http(erro) == 304 or codigo_erro(erro) in ("304", "NotModified")
+
+
+def precondicao_falhou(erro: ClientError) -> bool:
+    return status_http(erro) == 412 or codigo_erro(erro) in ("412", "PreconditionFailed")
+
+
+def range_invalido(erro: ClientError) -> bool:
+    # Objetos vazios não aceitam requisições com Range
+    return status_http(erro) == 416 or codigo_erro(erro) in ("416", "InvalidRange")
+
+
+def le_metadados(metadata_path: str) -> dict:
+    """
+    Lê os metadados do arquivo em cache ({"key", "etag", "last_modified", "tamanho", "validado_em"}).
+    Metadados no formato antigo (somente a data de modificação) são ignorados, forçando um novo download.
+    """
+    try:
+        with open(metadata_path, "r") as meta_file:
+            metadados = json.load(meta_file)
+        return metadados if isinstance(metadados, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def grava_metadados(metadata_path: str, metadados: dict):
+    # Gravação atômica: leitores sem lock nunca encontram um JSON parcial
+    tmp_path = f"{metadata_path}.tmp"
+    with open(tmp_path, "w") as meta_file:
+        json.dump(metadados, meta_file)
+    os.replace(tmp_path, metadata_path)
+
+
+class ArtifactFetcher:
+    """
+    Baixa artefatos do S3 para o cache local com requisições condicionais por ETag.
+
+    - Cache válido: um único GET condicional (If-None-Match) respondido com 304, sem corpo;
+    - Arquivo novo ou alterado: o mesmo GET já traz a primeira parte do arquivo (Range). Arquivos
+      maiores que o limite de multipart têm as partes restantes baixadas em paralelo com GETs
+      por intervalo, condicionados ao mesmo ETag (If-Match) para não misturar versões;
+    - O download é gravado em um arquivo temporário e substitui o anterior atomicamente (os.replace).
+
+    Vários artefatos independentes podem ser baixados simultaneamente com fetch_many.
+
+    Com frescor_segundos > 0 (stale-while-revalidate), um arquivo validado há menos tempo que a
+    janela de frescor é servido sem nenhuma chamada ao S3. Depois dela, a cópia em cache continua
+    sendo servida e a revalidação é feita em background (uma por arquivo de cada vez). Apenas
+    arquivos ausentes ou de outra chave são baixados de forma síncrona.
+    """
+
+    def __init__(self, client, bucket: str, tamanho_parte: int = 8 * 1024 * 1024,
+                 limite_multipart: int = 16 * 1024 * 1024, max_workers: int = 8, frescor_segundos: int = 0):
+        self._client = client
+        self._bucket = bucket
+        self._tamanho_parte = tamanho_parte
+        self._limite_multipart = max(limite_multipart, tamanho_parte)
+        self._frescor_segundos = frescor_segundos
+        # Pools separados para arquivos e partes, evitando que um arquivo espere por threads
+        # ocupadas pelos próprios arquivos
+        self._pool_arquivos = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-arquivos")
+        self._pool_partes = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-partes")
+        # Um download por arquivo local de cada vez
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        # Revalidações em background em andamento, por arquivo local
+        self._revalidacoes = {}
+
+    def _lock_do_arquivo(self, local_path: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(os.path.abspath(local_path), threading.Lock())
+
+    def _get(self, key: str, **condicoes):
+        return self._client.get_object(Bucket=self._bucket, Key=key, **condicoes)
+
+    @staticmethod
+    def _grava_corpo(corpo, arquivo, posicao: int):
+        arquivo.seek(posicao)
+        while True:
+            bloco = corpo.read(TAMANHO_LEITURA)
+            if not bloco:
+                break
+            arquivo.write(bloco)
+
+    def _baixa_parte(self, key: str, etag: str, tmp_path: str, inicio: int, fim: int):
+        resposta = self._get(key, Range=f"bytes={inicio}-{fim}", IfMatch=etag)
+        with open(tmp_path, "r+b") as arquivo:
+            self._grava_corpo(resposta["Body"], arquivo, inicio)
+
+    def _baixa(self, key: str, local_path: str, etag_cache: Optional[str]) -> Optional[dict]:
+        """
+        Executa o GET condicional e, se necessário, o download completo.
+        Retorna os metadados do novo arquivo ou None se o cache ainda é válido.
+        """
+        condicoes = {"IfNoneMatch": etag_cache} if etag_cache else {}
+        try:
+            resposta = self._get(key, Range=f"bytes=0-{self._limite_multipart - 1}", **condicoes)
+        except ClientError as e:
+            if nao_modificado(e):
+                return None
+            if not range_invalido(e):
+                raise
+            resposta = self._get(key, **condicoes)
+
+        etag = resposta["ETag"]
+        content_range = resposta.get("ContentRange")
+        tamanho = int(content_range.rsplit("/", 1)[1]) if content_range else int(resposta["ContentLength"])
+
+        tmp_path = f"{local_path}.tmp"
+        with open(tmp_path, "wb") as arquivo:
+            arquivo.truncate(tamanho)
+            self._grava_corpo(resposta["Body"], arquivo, 0)
+
+        # Partes restantes em paralelo, todas presas ao ETag da primeira resposta
+        inicio = self._limite_multipart
+        partes = []
+        while inicio < tamanho:
+            fim = min(inicio + self._tamanho_parte, tamanho) - 1
+            partes.append(self._pool_partes.submit(self._baixa_parte, key, etag, tmp_path, inicio, fim))
+            inicio = fim + 1
+        try:
+            for parte in partes:
+                parte.result()
+        except Exception:
+            for parte in partes:
+                parte.cancel()
+            os.remove(tmp_path)
+            raise
+
+        os.replace(tmp_path, local_path)
+        last_modified = resposta.get("LastModified")
+        return {
+            "key": key,
+            "etag": etag,
+            "last_modified": last_modified.isoformat() if last_modified else None,
+            "tamanho": tamanho,
+        }
+
+    def _valida(self, key: str, local_path: str, metadata_path: str, tentativas: int) -> bool:
+        """Valida o arquivo em cache no S3, baixando-o se necessário. Retorna True se foi baixado."""
+        with self._lock_do_arquivo(local_path):
+            metadados = le_metadados(metadata_path)
+            etag_cache = None
+            if os.path.exists(local_path) and metadados.get("key") == key:
+                etag_cache = metadados.get("etag")
+
+            for tentativa in range(1, tentativas + 1):
+                try:
+                    novos_metadados = self._baixa(key, local_path, etag_cache)
+                    break
+                except ClientError as e:
+                    # O objeto mudou durante o download das partes: recomeça com a nova versão
+                    if precondicao_falhou(e) and tentativa < tentativas:
+                        print(f"{key} foi alterado durante o download. Reiniciando ({tentativa}/{tentativas}).")
+                        continue
+                    raise
+
+            if novos_metadados is None:
+                grava_metadados(metadata_path, dict(metadados, validado_em=time.time()))
+                print(f"Cache HIT para {os.path.basename(local_path)} (ETag inalterado).")
+                return False
+
+            grava_metadados(metadata_path, dict(novos_metadados, validado_em=time.time()))
+            print(f"Download de {os.path.basename(local_path)} concluído ({novos_metadados['tamanho']} bytes).")
+            return True
+
+    def _revalida_em_background(self, key: str, local_path: str, metadata_path: str, tentativas: int):
+        caminho = os.path.abspath(local_path)
+        with self._locks_lock:
+            if caminho in self._revalidacoes:
+                return
+
+            def revalida():
+                try:
+                    self._valida(key, local_path, metadata_path, tentativas)
+                except Exception as e:
+                    # A cópia em cache continua sendo servida; a próxima leitura tenta novamente
+                    print(f"Erro ao revalidar {key} em background: {e}")
+                finally:
+                    with self._locks_lock:
+                        self._revalidacoes.pop(caminho, None)
+
+            self._revalidacoes[caminho] = self._pool_arquivos.submit(revalida)
+
+    def aguarda_revalidacoes(self, timeout: float = None):
+        """Aguarda as revalidações em background em andamento."""
+        with self._locks_lock:
+            futuros = list(self._revalidacoes.values())
+        wait(futuros, timeout=timeout)
+
+    def fetch(self, key: str, local_path: str, metadata_path: str, frescor_segundos: int = None,
+              tentativas: int = 3) -> bool:
+        """
+        Garante que local_path contém uma versão válida de key. Retorna True se o arquivo foi baixado
+        nesta chamada (revalidações em background retornam False).
+
+        :param frescor_segundos: Janela de frescor desta chamada (None usa a do fetcher; 0 sempre valida no S3).
+        """
+        frescor = self._frescor_segundos if frescor_segundos is None else frescor_segundos
+        if frescor > 0 and os.path.exists(local_path):
+            metadados = le_metadados(metadata_path)
+            if metadados.get("key") == key:
+                if time.time() - metadados.get("validado_em", 0) >= frescor:
+                    self._revalida_em_background(key, local_path, metadata_path, tentativas)
+                return False
+        return self._valida(key, local_path, metadata_path, tentativas)
+
+    def fetch_many(self, itens: List[Tuple[str, str, str]]) -> List[bool]:
+        """
+        Baixa vários artefatos independentes simultaneamente.
+
+        :param itens: Lista de tuplas (key, local_path, metadata_path), opcionalmente com frescor_segundos.
+        :return: Para cada item, True se o arquivo foi baixado.
+        """
+        futuros = [self._pool_arquivos.submit(self.fetch, *item) for item in itens]
+        return [futuro.result() for futuro in futuros]
@@ -0,0 +1,186 @@
+import fcntl
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from core.services.encoder import encode_textos
+from core.services.embedding_cache import embedding_cache_vagas
+from core.services.fetch_S3_files import cache_dir
+from core.services.vector_search import IndiceExato
+
+
+def texto_recomendacao_vaga(registro: dict) -> str:
+    # Mesmo texto usado para gerar os embeddings de vagas no treinamento
+    partes = [
+        registro.get("titulo_vaga"),
+        registro.get("competencia_tecnicas_e_comportamentais"),
+        registro.get("areas_atuacao_vaga"),
+    ]
+    return " ".join(parte or "" for parte in partes)
+
+
+def encode_vagas(textos: List[str]) -> np.ndarray:
+    # Embeddings de vagas ficam em um namespace próprio do cache de embeddings
+    return encode_textos(textos, cache=embedding_cache_vagas)
+
+
+class IndiceDeltaVagas:
+    """
+    Índice das vagas criadas ou alteradas depois da última versão do índice base
+    (Annoy + recommendation_pairs.parquet), para que fiquem recomendáveis sem esperar o
+    pipeline offline.
+
+    As vagas são gravadas em um log em disco (cache/delta_vagas/vagas.jsonl), com lock de arquivo
+    (flock): o log sobrevive a reinícios e é compartilhado pelos workers, e cada processo lê
+    incrementalmente as vagas gravadas pelos demais. Os embeddings vêm do cache de embeddings de
+    vagas (em disco), então apenas o worker que gravou a vaga passa o texto pelo encoder.
+
+    Cada vaga é indexada uma única vez por código (a última gravação prevalece) e a busca é exata.
+    Quando o latest.txt do modelo de recomendação passa a apontar para uma nova versão base,
+    o log é esvaziado, pois as vagas já fazem parte do novo índice.
+    """
+
+    def __init__(self, diretorio: str, encode: Callable[[List[str]], np.ndarray] = encode_vagas):
+        self._encode = encode
+        self._dir = os.path.join(diretorio, "delta_vagas")
+        self._log_path = os.path.join(self._dir, "vagas.jsonl")
+        self._meta_path = os.path.join(self._dir, "meta.json")
+        self._lock_path = os.path.join(self._dir, "vagas.lock")
+        self._lock = threading.Lock()
+        self._versao_base: Optional[str] = None
+        # Posição do log já lida por este processo e versão base do log nesse momento
+        self._posicao_log = 0
+        self._versao_log: Optional[str] = None
+        self._itens: Dict[int, Tuple[dict, np.ndarray]] = {}
+        # Snapshot imutável (códigos, registros, índice) usado pelas buscas, trocado a cada alteração
+        self._snapshot: Tuple[list, list, Optional[IndiceExato]] = ([], [], None)
+        # Incrementada a cada alteração; compõe a chave do cache de recomendações
+        self.geracao = 0
+        os.makedirs(self._dir, exist_ok=True)
+
+    def _publica(self):
+        codigos = list(self._itens)
+        registros = [self._itens[codigo][0] for codigo in codigos]
+        indice = IndiceExato(np.stack([self._itens[codigo][1] for codigo in codigos])) if codigos else None
+        self._snapshot = (codigos, registros, indice)
+        self.geracao += 1
+
+    def _le_versao_log(self) -> Optional[str]:
+        if not os.path.exists(self._meta_path):
+            return None
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("versao_base")
+
+    def _grava_com_lock(self, operacao: Callable[[], None]):
+        with open(self._lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                operacao()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def sincroniza(self):
+        """Aplica as vagas gravadas no log desde a última leitura (inclusive por outros workers)."""
+        with self._lock:
+            versao_log = self._le_versao_log()
+            tamanho = os.path.getsize(self._log_path) if os.path.exists(self._log_path) else 0
+            if versao_log != self._versao_log or tamanho < self._posicao_log:
+                # O log foi esvaziado por uma nova versão base
+                if self._itens:
+                    self._itens.clear()
+                    self._publica()
+                self._versao_log = versao_log
+                self._posicao_log = 0
+            if tamanho <= self._posicao_log:
+                return
+
+            with open(self._log_path, "rb") as f:
+                f.seek(self._posicao_log)
+                conteudo = f.read(tamanho - self._posicao_log)
+            # Uma linha incompleta no fim (gravação em andamento) é lida na próxima sincronização
+            completo = conteudo[:conteudo.rfind(b"\n") + 1]
+            registros = [json.loads(linha) for linha in completo.splitlines() if linha.strip()]
+            if registros:
+                # Se o encode falhar, a posição não avança e as vagas são lidas de novo na próxima sincronização
+                vetores = self._encode([texto_recomendacao_vaga(registro) for registro in registros])
+                for registro, vetor in zip(registros, vetores):
+                    self._itens[int(registro["codigo_vaga"])] = (registro, np.asarray(vetor, dtype=np.float32))
+                self._publica()
+            self._posicao_log += len(completo)
+
+    def sync_base(self, versao_base: str):
+        """Registra a versão do índice base em uso, esvaziando o log se ela mudou."""
+        if versao_base != self._versao_base:
+            def rotaciona():
+                versao_log = self._le_versao_log()
+                if versao_log == versao_base:
+                    # Outro worker já registrou a nova versão
+                    return
+                if versao_log is not None and os.path.exists(self._log_path):
+                    print("Nova versão do índice de recomendação. Descartando as vagas do índice delta.")
+                    open(self._log_path, "wb").close()
+                tmp_path = f"{self._meta_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"versao_base": versao_base}, f)
+                os.replace(tmp_path, self._meta_path)
+
+            self._grava_com_lock(rotaciona)
+            self._versao_base = versao_base
+        self.sincroniza()
+
+    def upsert(self, registro: dict):
+        """Grava a vaga no log e a inclui no índice deste processo."""
+        registro = dict(registro, codigo_vaga=int(registro["codigo_vaga"]))
+        linha = (json.dumps(registro, ensure_ascii=False) + "\n").encode("utf-8")
+
+        def anexa():
+            with open(self._log_path, "ab") as f:
+                f.write(linha)
+
+        self._grava_com_lock(anexa)
+        self.sincroniza()
+
+    @property
+    def total(self) -> int:
+        return len(self._snapshot[0])
+
+    def vetor(self, codigo_vaga) -> Optional[np.ndarray]:
+        item = self._itens.get(int(codigo_vaga))
+        return item[1] if item else None
+
+    def combina(self, recomendacoes_base: List[dict], vetor: np.ndarray, k: int) -> List[dict]:
+        """
+        Combina as recomendações do índice base com as do delta, ordenadas pela distância.
+        Vagas presentes no delta substituem as versões do índice base.
+        """
+        codigos, registros, indice = self._snapshot
+        if indice is None:
+            return recomendacoes_base[:k]
+
+        indices, distancias = indice.get_nns_by_vector(vetor, k, include_distances=True)
+        recomendacoes = [
+            dict(registros[i], distancia=round(float(distancia), 6)) for i, distancia in zip(indices, distancias)
+        ]
+        no_delta = set(codigos)
+        recomendacoes += [registro for registro in recomendacoes_base if int(registro["codigo_vaga"]) not in no_delta]
+        recomendacoes.sort(key=lambda registro: registro["distancia"])
+        return recomendacoes[:k]
+
+    def metrics(self) -> dict:
+        return {"versao_base": self._versao_base, "vagas": self.total, "geracao": self.geracao}
+
+
+delta_vagas = IndiceDeltaVagas(cache_dir)
+
+
+def indexa_vaga(registro: dict):
+    """
+    Grava uma vaga criada/alterada no índice delta (o embedding é gerado na inclusão).
+    Executada em background após a gravação da vaga; falhas não afetam o cadastro.
+    """
+    try:
+        delta_vagas.upsert(registro)
+        print(f"Vaga {registro['codigo_vaga']} incluída no índice delta de recomendação.")
+    except Exception as e:
+        print(f"Erro ao indexar a vaga {registro.get('codigo_vaga')} no índice delta: {e}")
@@ -0,0 +1,215 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from core.config import settings
+from core.services.fetch_S3_files import cache_dir
+
+
+class EmbeddingCache:
+    """
+    Cache de embeddings em dois níveis, indexado pelo hash do texto + nome do encoder.
+
+    1. LRU em memória, para os textos mais recentes;
+    2. Arquivo em disco (cache/embeddings/<encoder>/vetores.bin) com registros de tamanho fixo
+       (hash sha256 de 32 bytes + vetor float32), lido via memory-map. O arquivo sobrevive a
+       reinícios e é compartilhado pelos workers: cada registro é gravado com lock de arquivo
+       (flock) e cada processo lê incrementalmente os registros adicionados pelos demais.
+
+    O encoder (namespace) pode ser informado depois da criação, com define_encoder, quando o
+    modelo efetivamente carregado é conhecido; até lá o cache não pode ser usado.
+    """
+
+    def __init__(self, nome_encoder: Optional[str], diretorio: str, max_memoria: int,
+                 disco_habilitado: bool = True, sufixo: str = ""):
+        self.nome_encoder: Optional[str] = None
+        self._diretorio = diretorio
+        self._sufixo = sufixo
+        self._max_memoria = max(1, max_memoria)
+        self._disco_habilitado = disco_habilitado
+        self._lock = threading.Lock()
+        # Vazios até a definição do encoder, para que metrics() responda desde a inicialização
+        self._memoria: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._indice: Dict[bytes, int] = {}
+
+        self._hits_memoria = 0
+        self._hits_disco = 0
+        self._misses = 0
+
+        if nome_encoder is not None:
+            self._configura(f"{nome_encoder}{sufixo}")
+
+    def define_encoder(self, nome_encoder: str):
+        """Define o encoder do cache; itens de outro encoder (outro namespace) não são reaproveitados."""
+        with self._lock:
+            if f"{nome_encoder}{self._sufixo}" != self.nome_encoder:
+                self._configura(f"{nome_encoder}{self._sufixo}")
+
+    def _configura(self, nome_encoder: str):
+        self.nome_encoder = nome_encoder
+        self._memoria = OrderedDict()
+
+        nome_pasta = re.sub(r"[^A-Za-z0-9._-]+", "_", nome_encoder)
+        self._dir = os.path.join(self._diretorio, "embeddings", nome_pasta)
+        self._vetores_path = os.path.join(self._dir, "vetores.bin")
+        self._lock_path = os.path.join(self._dir, "vetores.lock")
+        self._meta_path = os.path.join(self._dir, "meta.json")
+
+        # Índice do arquivo em disco: hash -> posição do registro
+        self._indice = {}
+        self._registros_indexados = 0
+        self._dtype: Optional[np.dtype] = None
+        self._mmap: Optional[np.memmap] = None
+
+        if self._disco_habilitado:
+            os.makedirs(self._dir, exist_ok=True)
+            self._carrega_meta()
+
+    def chave(self, texto: str) -> str:
+        if self.nome_encoder is None:
+            raise RuntimeError("O encoder do cache de embeddings ainda não foi definido.")
+        return hashlib.sha256(f"{self.nome_encoder}\n{texto}".encode("utf-8")).hexdigest()
+
+    def _carrega_meta(self):
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                self._define_dimensao(json.load(f)["dim"])
+
+    def _define_dimensao(self, dim: int):
+        # A chave é gravada como bytes crus: um campo "S32" descartaria os bytes nulos no fim do hash
+        self._dtype = np.dtype([("chave", "u1", (32,)), ("vetor", "<f4", (dim,))])
+
+    # ---- memória ----
+    def _get_memoria(self, chave: str) -> Optional[np.ndarray]:
+        vetor = self._memoria.get(chave)
+        if vetor is not None:
+            self._memoria.move_to_end(chave)
+        return vetor
+
+    def _put_memoria(self, chave: str, vetor: np.ndarray):
+        self._memoria[chave] = vetor
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self._max_memoria:
+            self._memoria.popitem(last=False)
+
+    # ---- disco ----
+    def _registros_completos(self) -> int:
+        if not os.path.exists(self._vetores_path):
+            return 0
+        # Um registro incompleto no fim do arquivo (gravação interrompida) é ignorado
+        return os.path.getsize(self._vetores_path) // self._dtype.itemsize
+
+    def _sincroniza_indice(self):
+        """Indexa os registros gravados desde a última leitura (inclusive por outros workers)."""
+        total = self._registros_completos()
+        if total <= self._registros_indexados:
+            return
+        self._mmap = np.memmap(self._vetores_path, dtype=self._dtype, mode="r", shape=(total,))
+        chaves = self._mmap["chave"]
+        for posicao in range(self._registros_indexados, total):
+            self._indice[chaves[posicao].tobytes()] = posicao
+        self._registros_indexados = total
+
+    def _grava_disco(self, itens: Dict[str, np.ndarray]):
+        if self._dtype is None:
+            dim = int(next(iter(itens.values())).shape[0])
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": dim, "encoder": self.nome_encoder}, f)
+            self._define_dimensao(dim)
+
+        registros = np.empty(len(itens), dtype=self._dtype)
+        registros["chave"] = np.frombuffer(b"".join(bytes.fromhex(chave) for chave in itens), dtype=np.uint8).reshape(-1, 32)
+        registros["vetor"] = np.stack(list(itens.values())).astype(np.float32)
+
+        with open(self._lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with open(self._vetores_path, "ab") as f:
+                    # Descarta um registro incompleto deixado por uma gravação interrompida
+                    f.truncate(self._registros_completos() * self._dtype.itemsize)
+                    f.write(registros.tobytes())
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ---- API ----
+    def get_many(self, chaves: List[str]) -> Dict[str, np.ndarray]:
+        encontrados = {}
+        with self._lock:
+            faltantes = []
+            for chave in chaves:
+                vetor = self._get_memoria(chave)
+                if vetor is not None:
+                    self._hits_memoria += 1
+                    encontrados[chave] = vetor
+                else:
+                    faltantes.append(chave)
+
+            if faltantes and self._disco_habilitado and self._dtype is None:
+                # Outro worker pode ter criado o arquivo depois da inicialização deste processo
+                self._carrega_meta()
+            if faltantes and self._disco_habilitado and self._dtype is not None:
+                self._sincroniza_indice()
+                for chave in faltantes:
+                    posicao = self._indice.get(bytes.fromhex(chave))
+                    if posicao is not None:
+                        vetor = np.array(self._mmap[posicao]["vetor"])
+                        self._put_memoria(chave, vetor)
+                        self._hits_disco += 1
+                        encontrados[chave] = vetor
+
+            self._misses += len(set(chaves) - set(encontrados))
+        return encontrados
+
+    def put_many(self, itens: Dict[str, np.ndarray]):
+        if not itens:
+            return
+        with self._lock:
+            for chave, vetor in itens.items():
+                self._put_memoria(chave, vetor)
+            if self._disco_habilitado:
+                try:
+                    self._grava_disco(itens)
+                except Exception as e:
+                    # O cache em disco é apenas uma otimização; falhas não devem afetar a requisição
+                    print(f"Erro ao gravar embeddings no cache em disco: {e}")
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "encoder": self.nome_encoder,
+                "itens_memoria": len(self._memoria),
+                "itens_disco": len(self._indice),
+                "hits_memoria": self._hits_memoria,
+                "hits_disco": self._hits_disco,
+                "misses": self._misses,
+            }
+
+
+def nome_encoder_cache(modo: str) -> str:
+    # O modo do encoder carregado faz parte da chave: embeddings float e int8 não se misturam
+    return settings.SENTENCE_MODEL_NAME if modo == "none" else f"{settings.SENTENCE_MODEL_NAME}-{modo}"
+
+
+# Os namespaces são definidos pelo encoder na carga (get_encoder), a partir do modo efetivamente usado
+
+# Textos de candidatos
+embedding_cache = EmbeddingCache(
+    None,
+    diretorio=cache_dir,
+    max_memoria=settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+    disco_habilitado=settings.EMBEDDING_CACHE_DISK_ENABLED
+)
+
+# Textos de vagas (índice delta e vagas fora do índice), em um namespace próprio
+embedding_cache_vagas = EmbeddingCache(
+    None,
+    diretorio=cache_dir,
+    max_memoria=settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+    disco_habilitado=settings.EMBEDDING_CACHE_DISK_ENABLED,
+    sufixo="-vagas"
+)
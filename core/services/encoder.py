@@ -0,0 +1,97 @@
+import os
+import threading
+from typing import List, Tuple
+import numpy as np
+from sentence_transformers import SentenceTransformer
+from core.config import settings
+from core.services.embedding_cache import EmbeddingCache, embedding_cache, embedding_cache_vagas, nome_encoder_cache
+from core.services.encoder_quantization import ENCODER_INT8, ENCODER_FLOAT, compara_encoders, quantiza_encoder
+
+
+_encoder = None
+_lock = threading.Lock()
+
+
+def carrega_encoder_float(device: str = None) -> SentenceTransformer:
+    """
+    Carrega o SentenceTransformer a partir do diretório local configurado, sem acesso à rede.
+    Se o diretório não existir, usa apenas o cache local do Hugging Face.
+    """
+    if os.path.isdir(settings.SENTENCE_MODEL_DIR):
+        print(f"Carregando encoder de {settings.SENTENCE_MODEL_DIR}")
+        return SentenceTransformer(settings.SENTENCE_MODEL_DIR, device=device, local_files_only=True)
+
+    print(f"Diretório {settings.SENTENCE_MODEL_DIR} não encontrado. Usando o cache local de {settings.SENTENCE_MODEL_NAME}")
+    return SentenceTransformer(settings.SENTENCE_MODEL_NAME, device=device, local_files_only=True)
+
+
+def carrega_encoder() -> Tuple[SentenceTransformer, str]:
+    """
+    Carrega o encoder no modo configurado em ENCODER_QUANTIZATION e retorna (modelo, modo efetivo).
+    No modo int8, o modelo quantizado só é usado se os embeddings de amostra ficarem próximos dos
+    do modelo float (cosseno mínimo >= ENCODER_QUANTIZATION_MIN_COSINE); caso contrário, o float
+    é mantido e o modo efetivo passa a ser "none".
+    """
+    if settings.ENCODER_QUANTIZATION != ENCODER_INT8:
+        return carrega_encoder_float(), ENCODER_FLOAT
+
+    # A quantização dinâmica do PyTorch só é suportada em CPU
+    modelo = carrega_encoder_float(device="cpu")
+    quantizado = quantiza_encoder(modelo)
+    comparacao = compara_encoders(modelo, quantizado)
+    if comparacao["cosseno_min"] < settings.ENCODER_QUANTIZATION_MIN_COSINE:
+        print(f"Encoder int8 rejeitado ({comparacao}); mantendo o encoder float.")
+        return modelo, ENCODER_FLOAT
+    print(f"Encoder int8 carregado ({comparacao}).")
+    return quantizado, ENCODER_INT8
+
+
+def get_encoder() -> SentenceTransformer:
+    """
+    Retorna a instância única do encoder no processo, carregando-a na primeira chamada.
+    Os caches de embeddings usam o namespace do modo efetivamente carregado.
+    """
+    global _encoder
+    if _encoder is None:
+        with _lock:
+            if _encoder is None:
+                modelo, modo = carrega_encoder()
+                embedding_cache.define_encoder(nome_encoder_cache(modo))
+                embedding_cache_vagas.define_encoder(nome_encoder_cache(modo))
+                _encoder = modelo
+    return _encoder
+
+
+def warmup_encoder():
+    """Carrega o encoder e executa um encode de aquecimento (inicializa tokenizer e kernels)."""
+    get_encoder().encode(["aquecimento do encoder"])
+
+
+def encode_textos(textos: List[str], batch_size: int = None, cache: EmbeddingCache = None) -> np.ndarray:
+    """
+    Gera os embeddings dos textos reaproveitando o cache de embeddings (memória e disco).
+    Apenas os textos inéditos passam pelo transformer, em uma única chamada de encode
+    (em lotes de batch_size textos; por padrão, ENCODER_BATCH_SIZE).
+    Por padrão usa o cache de textos de candidatos; os textos de vagas têm um cache próprio.
+    """
+    cache = cache or embedding_cache
+    # O encoder define o namespace do cache: precisa estar carregado antes de calcular as chaves
+    encoder = get_encoder()
+    chaves = [cache.chave(texto) for texto in textos]
+    encontrados = cache.get_many(chaves)
+
+    # Textos ainda não vistos (sem repetição)
+    faltantes = {}
+    for chave, texto in zip(chaves, textos):
+        if chave not in encontrados and chave not in faltantes:
+            faltantes[chave] = texto
+
+    if faltantes:
+        vetores = encoder.encode(
+            list(faltantes.values()), batch_size=batch_size or settings.ENCODER_BATCH_SIZE
+        )
+        novos = dict(zip(faltantes.keys(), np.asarray(vetores, dtype=np.float32)))
+        cache.put_many(novos)
+        encontrados.update(novos)
+
+    return np.stack([encontrados[chave] for chave in chaves])
@@ -0,0 +1,42 @@
+import copy
+from typing import List
+import numpy as np
+import torch
+
+
+# Modos do encoder de recomendação
+ENCODER_FLOAT = "none"
+ENCODER_INT8 = "int8"
+MODOS_ENCODER = (ENCODER_FLOAT, ENCODER_INT8)
+
+# Textos de amostra (no formato dos textos de candidatos e vagas) usados para validar o encoder quantizado
+TEXTOS_AMOSTRA = [
+    "Analista de Dados Python, SQL, Power BI Certificação AWS São Paulo Avançado Básico",
+    "Desenvolvedor Java Sênior Spring Boot, microsserviços, Kafka, Docker e Kubernetes",
+    "Consultor SAP FI/CO com experiência em implantação e inglês fluente",
+    "Analista de Suporte Técnico N2 Windows Server, Active Directory, ITIL",
+    "Gerente de Projetos PMP metodologias ágeis, Scrum e gestão de stakeholders",
+    "Engenheiro de Dados pipelines ETL, Spark, Airflow e data lake na AWS",
+    "Desenvolvedor Front-end React, TypeScript, HTML e CSS responsivo",
+    "Analista de Testes automação com Selenium, Cypress e testes de API",
+]
+
+
+def quantiza_encoder(modelo: torch.nn.Module) -> torch.nn.Module:
+    """
+    Aplica a quantização dinâmica int8 do PyTorch às camadas Linear do modelo (CPU).
+    Os pesos passam a ser int8 e as ativações são quantizadas em tempo de execução.
+    O modelo original não é alterado.
+    """
+    return torch.ao.quantization.quantize_dynamic(copy.deepcopy(modelo), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def compara_encoders(referencia, candidato, textos: List[str] = TEXTOS_AMOSTRA) -> dict:
+    """
+    Compara os embeddings de dois encoders para os mesmos textos pela similaridade de cosseno.
+    Retorna o cosseno mínimo e médio entre os pares de embeddings.
+    """
+    a = np.asarray(referencia.encode(textos), dtype=np.float32)
+    b = np.asarray(candidato.encode(textos), dtype=np.float32)
+    cossenos = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return {"cosseno_min": round(float(cossenos.min()), 6), "cosseno_medio": round(float(cossenos.mean()), 6)}
@@ -9,12 +9,31 @@ from datetime import datetime
 from sqlmodel import Session
 from core.database import system_engine
 from api.utils.functions.CRUD_SystemDB import atualizar_tabelas_candidatos, atualizar_tabelas_vagas, atualizar_tabelas_prospects
+from api.utils.functions.delta_sync import MODO_COMPLETO
+from api.utils.functions.dataset_lock import DIRETORIO_LOCKS, recarga_dataset
+from api.utils.functions.dataset_fingerprint import (
+    DATASET_CANDIDATOS, DATASET_VAGAS, DATASET_PROSPECTS,
+    verifica_dataset, invalida_fingerprint, registra_fingerprint
+)
+from core.services.model_artifacts import (
+    MANIFEST_NAME, is_manifest_key, le_manifest, arquivos_do_manifest, carrega_pipeline_nativo,
+    usa_versao, remove_versoes_antigas
+)
+from core.services.artifact_fetcher import ArtifactFetcher, le_metadados
 import pickle
 
 
 s3_client = boto3.client('s3')
 bucket_name = settings.BUCKET_NAME  # Substitua pelo nome do seu bucket
 cache_dir = "./cache"  # Diretório local para armazenar os arquivos em cache
+artifact_fetcher = ArtifactFetcher(
+    s3_client,
+    bucket_name,
+    tamanho_parte=settings.S3_PART_SIZE_MB * 1024 * 1024,
+    limite_multipart=settings.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+    max_workers=settings.S3_FETCH_WORKERS,
+    frescor_segundos=settings.S3_CACHE_FRESHNESS_SECONDS
+)
 
 class DataResponse(BaseModel):
     columns: List[str]
@@ -31,171 +50,127 @@ def get_s3_file_last_modified(key: str) -> datetime:
     response = s3_client.head_object(Bucket=bucket_name, Key= key)
     return response['LastModified']
 
-def get_latest_model_key(model: str) -> str:
+def le_latest_txt(model_key_prefix: str, frescor_segundos: int = None) -> str:
+    """
+    Lê o latest.txt de um diretório de modelos a partir do cache local, que segue a mesma
+    janela de frescor dos demais artefatos (S3_CACHE_FRESHNESS_SECONDS).
+    """
+    latest_dir = os.path.join(cache_dir, "latest")
+    os.makedirs(latest_dir, exist_ok=True)
+    nome = model_key_prefix.strip("/").replace("/", "_")
+    local_path = os.path.join(latest_dir, f"{nome}_latest.txt")
+    atualiza_arquivo_cache(
+        f"{model_key_prefix}latest.txt",
+        local_path,
+        os.path.join(latest_dir, f"{nome}_latest_metadata.txt"),
+        frescor_segundos=frescor_segundos
+    )
+    with open(local_path, "r", encoding="utf-8") as latest_file:
+        return latest_file.read().strip()
+
+def get_latest_model_key(model: str, frescor_segundos: int = None) -> str:
     """
     Busca a chave do último modelo de matching conforme informado no arquivo latest.txt
     contido no bucket dentro do diretório models/Modelo_Matching_Classificacao/.
     
     Exemplo: se o conteúdo de latest.txt for "v10/model_matching.pkl", a função retorna:
            "models/Modelo_Matching_Classificacao/v10/model_matching.pkl"
+    
+    :param frescor_segundos: Janela de frescor do latest.txt em cache (0 sempre consulta o S3).
     """
     try:
-        response = s3_client.get_object(Bucket=bucket_name, Key=f"{model}latest.txt")
-        latest_content = response["Body"].read().decode("utf-8").strip()
+        latest_content = le_latest_txt(model, frescor_segundos=frescor_segundos)
         return f"models/Modelo_Matching_Classificacao/{latest_content}"
     except Exception as e:
         raise Exception(f"Erro ao obter a chave do modelo: {str(e)}")
 
 
-def read_applicants_json_from_s3(file_key: str) -> DataResponse:
-    try:
+def atualiza_arquivo_cache(file_key: str, local_path: str, metadata_path: str, frescor_segundos: int = None) -> bool:
+    """
+    Baixa o arquivo do S3 para o cache local caso ele não exista ou esteja desatualizado.
+    A validação é um único GET condicional pelo ETag em cache; o download é atômico
+    (arquivo temporário + os.replace), então índices memory-mapped em uso continuam lendo
+    o arquivo antigo até serem recarregados.
+    Dentro da janela de frescor o arquivo em cache é usado sem consultar o S3; depois dela,
+    ele é revalidado em background (frescor_segundos=0 força a validação síncrona).
+    Retorna True se o arquivo foi baixado.
+    """
+    return artifact_fetcher.fetch(file_key, local_path, metadata_path, frescor_segundos=frescor_segundos)
+
+
+def _sincroniza_dataset(file_key: str, dataset: str, atualizar_tabelas, modo: str, force: bool) -> dict:
+    """
+    Baixa o JSON do dataset (se o ETag mudou) e recarrega as tabelas, a menos que o arquivo seja o
+    mesmo da última carga (fingerprint: ETag, hash do conteúdo e versão do esquema).
+    Com force=True a carga é feita mesmo sem mudança no arquivo.
+    """
+    # Recargas do mesmo dataset são serializadas (inclusive entre workers) e as escritas da API
+    # no dataset são rejeitadas enquanto a recarga estiver em andamento
+    with recarga_dataset(dataset):
         # Caminho do arquivo em cache
         local_file_path = os.path.join(cache_dir, f"{file_key}.json")
         cache_metadata_path = os.path.join(cache_dir, f"{file_key}_metadata.txt")
 
-        # Verificar se o arquivo está em cache e se está atualizado
-        if os.path.exists(local_file_path) and os.path.exists(cache_metadata_path):
-            with open(cache_metadata_path, "r") as meta_file:
-                cached_last_modified = datetime.fromisoformat(meta_file.read().strip())
-            
-            s3_last_modified = get_s3_file_last_modified(key=f"raw/{file_key}.json")
-            
-            # Se o arquivo em cache estiver atualizado, não há necessidade de atualizar o banco
-            if cached_last_modified >= s3_last_modified:
-                with Session(system_engine) as db:
-                    atualizar_tabelas_candidatos(local_file_path, db)
-                return {"message": "Arquivo em cache está atualizado. recarregando banco."}
-
-        # Caso contrário, baixe o arquivo do S3 e atualize o cache
-        response = s3_client.get_object(Bucket=bucket_name, Key=f"raw/{file_key}.json")
-        file_content = response["Body"].read().decode("utf-8")
-
-        # Salvar o arquivo localmente
-        with open(local_file_path, "w") as local_file:
-            local_file.write(file_content)
+        # Baixa o arquivo apenas se o ETag mudou (um único GET condicional quando o cache está atualizado).
+        # A atualização das tabelas é um pedido explícito: sempre valida no S3, ignorando a janela de frescor
+        baixado = atualiza_arquivo_cache(f"raw/{file_key}.json", local_file_path, cache_metadata_path, frescor_segundos=0)
+        etag = le_metadados(cache_metadata_path).get("etag")
 
-        # Atualizar metadados do cache
-        s3_last_modified = get_s3_file_last_modified(key=f"raw/{file_key}.json")
-        with open(cache_metadata_path, "w") as meta_file:
-            meta_file.write(s3_last_modified.isoformat())
-
-        # Atualizar as tabelas de candidatos no banco de dados criando uma nova sessão
         with Session(system_engine) as db:
-            atualizar_tabelas_candidatos(local_file_path, db)
-
+            content_hash = None
+            if not force:
+                inalterado, content_hash = verifica_dataset(db, dataset, etag, local_file_path)
+                if inalterado:
+                    print(f"Dataset {dataset} inalterado desde a última carga; recarga ignorada.")
+                    return {"message": "Dataset inalterado desde a última carga. Nenhuma alteração aplicada."}
+
+            invalida_fingerprint(db, dataset)
+            atualizar_tabelas(local_file_path, db, modo=modo)
+            registra_fingerprint(db, dataset, etag, local_file_path, content_hash=content_hash)
+
+        if not baixado:
+            return {"message": "Arquivo em cache está atualizado. Recarregando banco."}
         return {"message": "Arquivo atualizado e base de dados sincronizada com sucesso."}
 
+
+def read_applicants_json_from_s3(file_key: str, modo: str = MODO_COMPLETO, force: bool = False) -> DataResponse:
+    try:
+        return _sincroniza_dataset(file_key, DATASET_CANDIDATOS, atualizar_tabelas_candidatos, modo, force)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 
-def read_vagas_json_from_s3(file_key: str) -> dict:
+def read_vagas_json_from_s3(file_key: str, modo: str = MODO_COMPLETO, force: bool = False) -> dict:
     try:
-        # Caminho do arquivo em cache
-        local_file_path = os.path.join(cache_dir, f"{file_key}.json")
-        cache_metadata_path = os.path.join(cache_dir, f"{file_key}_metadata.txt")
-
-        # Verificar se o arquivo está em cache e se está atualizado
-        if os.path.exists(local_file_path) and os.path.exists(cache_metadata_path):
-            with open(cache_metadata_path, "r") as meta_file:
-                cached_last_modified = datetime.fromisoformat(meta_file.read().strip())
-            s3_last_modified = get_s3_file_last_modified(key=f"raw/{file_key}.json")
-            # Se o arquivo em cache estiver atualizado, atualizar as tabelas e retornar
-            if cached_last_modified >= s3_last_modified:
-                with Session(system_engine) as db:
-                    atualizar_tabelas_vagas(local_file_path, db)
-                return {"message": "Arquivo em cache está atualizado. Recarregando banco."}
-
-        # Caso contrário, baixe o arquivo do S3 sem conversão (preservando o formato original)
-        response = s3_client.get_object(Bucket=bucket_name, Key=f"raw/{file_key}.json")
-        file_content = response["Body"].read().decode("utf-8")
-
-        # Salvar o conteúdo diretamente no arquivo local
-        with open(local_file_path, "w", encoding="utf-8") as f:
-            f.write(file_content)
-        
-        # Atualizar metadados do cache
-        s3_last_modified = get_s3_file_last_modified(key=f"raw/{file_key}.json")
-        with open(cache_metadata_path, "w") as meta_file:
-            meta_file.write(s3_last_modified.isoformat())
-
-        # Atualizar as tabelas de vagas no banco de dados
-        with Session(system_engine) as db:
-            atualizar_tabelas_vagas(local_file_path, db)
-
-        return {"message": "Arquivo atualizado e base de dados sincronizada com sucesso."}
-
+        return _sincroniza_dataset(file_key, DATASET_VAGAS, atualizar_tabelas_vagas, modo, force)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 
-def read_prospects_json_from_s3(file_key: str) -> dict:
+def read_prospects_json_from_s3(file_key: str, modo: str = MODO_COMPLETO, force: bool = False) -> dict:
     try:
-        # Caminho do arquivo em cache
-        local_file_path = os.path.join(cache_dir, f"{file_key}.json")
-        cache_metadata_path = os.path.join(cache_dir, f"{file_key}_metadata.txt")
-
-        # Verificar se o arquivo está em cache e se está atualizado
-        if os.path.exists(local_file_path) and os.path.exists(cache_metadata_path):
-            with open(cache_metadata_path, "r") as meta_file:
-                cached_last_modified = datetime.fromisoformat(meta_file.read().strip())
-            s3_last_modified = get_s3_file_last_modified(key=f"raw/{file_key}.json")
-            # Se o arquivo em cache estiver atualizado, atualizar as tabelas e retornar
-            if cached_last_modified >= s3_last_modified:
-                with Session(system_engine) as db:
-                    atualizar_tabelas_prospects(local_file_path, db)
-                return {"message": "Arquivo em cache está atualizado. Recarregando banco."}
-
-        # Caso contrário, baixe o arquivo do S3 sem conversão (preservando o formato original)
-        response = s3_client.get_object(Bucket=bucket_name, Key=f"raw/{file_key}.json")
-        file_content = response["Body"].read().decode("utf-8")
-
-        # Salvar o conteúdo diretamente no arquivo local
-        with open(local_file_path, "w", encoding="utf-8") as f:
-            f.write(file_content)
-        
-        # Atualizar metadados do cache
-        s3_last_modified = get_s3_file_last_modified(key=f"raw/{file_key}.json")
-        with open(cache_metadata_path, "w") as meta_file:
-            meta_file.write(s3_last_modified.isoformat())
-
-        # Atualizar as tabelas de prospects no banco de dados
-        with Session(system_engine) as db:
-            atualizar_tabelas_prospects(local_file_path, db)
-
-        return {"message": "Arquivo atualizado e base de dados sincronizada com sucesso."}
-
+        return _sincroniza_dataset(file_key, DATASET_PROSPECTS, atualizar_tabelas_prospects, modo, force)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
     
-def busca_modelo_pkl_classificacao():
+def busca_modelo_pkl_classificacao(latest_model: str = None):
+    """
+    Baixa (ou usa a versão em cache) do pipeline de classificação e o carrega em memória.
+    
+    :param latest_model: Chave completa do modelo no S3. Se não informada, é lida do latest.txt.
+    """
     try:
         # Caminho do arquivo em cache e metadados atualizados
         local_file_path = os.path.join(cache_dir, "model_matching.pkl")
         cached_metadata_path = os.path.join(cache_dir, "model_matching_metadata.txt")
         model_key_prefix = "models/Modelo_Matching_Classificacao/"
-        latest_model = get_latest_model_key(model=model_key_prefix)  # Ex: "models/Modelo_Matching_Classificacao/v10/model_matching.pkl"
-        
-        # Verificar se o arquivo em cache está atualizado
-        if os.path.exists(local_file_path) and os.path.exists(cached_metadata_path):
-            with open(cached_metadata_path, "r") as meta_file:
-                cached_last_modified = datetime.fromisoformat(meta_file.read().strip())
-            s3_last_modified = get_s3_file_last_modified(key=latest_model)
-            
-            # Se estiver atualizado, carrega o modelo do cache.
-            if cached_last_modified >= s3_last_modified:
-                with open(local_file_path, "rb") as file:
-                    model_data = pickle.load(file)
-                return model_data
+        if latest_model is None:
+            latest_model = get_latest_model_key(model=model_key_prefix)  # Ex: "models/Modelo_Matching_Classificacao/v10/model_matching.pkl"
         
-        # Caso contrário, baixa o arquivo do S3 usando a chave correta
-        s3_client.download_file(Bucket=bucket_name, Key=latest_model, Filename=local_file_path)
-        
-        # Atualizar o metadado do arquivo baixado
-        s3_last_modified = get_s3_file_last_modified(key=latest_model)
-        with open(cached_metadata_path, "w") as meta_file:
-            meta_file.write(s3_last_modified.isoformat())
+        # Os metadados guardam a chave e o ETag do arquivo em cache: uma chave diferente
+        # (inclusive um rollback para uma versão anterior) força o download
+        atualiza_arquivo_cache(latest_model, local_file_path, cached_metadata_path)
         
         # Carregar o modelo a partir do arquivo local
         with open(local_file_path, "rb") as file:
@@ -203,9 +178,68 @@ def busca_modelo_pkl_classificacao():
         
         return model_data
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def busca_modelo_nativo_classificacao(latest_model: str):
+    """
+    Baixa (ou usa a versão em cache) do pipeline de classificação no layout nativo
+    (manifest.json + booster do XGBoost + pré-processamento em joblib) e o carrega.
+    
+    Cada versão fica em um diretório próprio dentro do cache, para que os arquivos
+    memory-mapped de uma versão em uso nunca sejam sobrescritos pela versão seguinte.
+    """
+    try:
+        model_key_prefix = "models/Modelo_Matching_Classificacao/"
+        remote_dir = latest_model.rstrip("/").rsplit("/", 1)[0]
+        version_name = remote_dir[len(model_key_prefix):].replace("/", "_") or "default"
+        native_cache_dir = os.path.join(cache_dir, "model_matching_nativo")
+        local_dir = os.path.join(native_cache_dir, version_name)
+        
+        # Outros workers não removem a versão enquanto ela é baixada e carregada por este
+        with usa_versao(DIRETORIO_LOCKS, version_name):
+            os.makedirs(local_dir, exist_ok=True)
+            atualiza_arquivo_cache(
+                latest_model,
+                os.path.join(local_dir, MANIFEST_NAME),
+                os.path.join(local_dir, "manifest_metadata.txt")
+            )
+            manifest = le_manifest(local_dir)
+            # Os arquivos do manifest são independentes: baixados simultaneamente
+            artifact_fetcher.fetch_many([
+                (
+                    f"{remote_dir}/{file_name}",
+                    os.path.join(local_dir, file_name),
+                    os.path.join(local_dir, f"{file_name}_metadata.txt")
+                )
+                for file_name in arquivos_do_manifest(manifest)
+            ])
+            
+            model_data = carrega_pipeline_nativo(local_dir)
+        
+        # Remove as versões antigas que nenhum worker está baixando ou carregando
+        remove_versoes_antigas(native_cache_dir, version_name, DIRETORIO_LOCKS)
+        
+        return model_data
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def busca_modelo_classificacao(latest_model: str = None):
+    """
+    Carrega o pipeline de classificação no layout indicado pelo latest.txt:
+    um manifest.json seleciona o layout nativo; qualquer outra chave é tratada como .pkl.
+    """
+    if latest_model is None:
+        latest_model = get_latest_model_key(model="models/Modelo_Matching_Classificacao/")
+    if is_manifest_key(latest_model):
+        return busca_modelo_nativo_classificacao(latest_model)
+    return busca_modelo_pkl_classificacao(latest_model=latest_model)
+
 def busca_modelo_recomendacao():
     """
     Baixa os arquivos necessários para recomendação, forçando a atualização se o cache estiver desatualizado.
@@ -214,11 +248,9 @@ def busca_modelo_recomendacao():
     """
     try:
         model_key_prefix = "models/Modelo_Recomendacao_Vagas/"
-        latest_txt_key = f"{model_key_prefix}latest.txt"
         os.makedirs(cache_dir, exist_ok=True)
         
-        response = s3_client.get_object(Bucket=bucket_name, Key=latest_txt_key)
-        latest_content = response["Body"].read().decode("utf-8").strip()
+        latest_content = le_latest_txt(model_key_prefix)
         lines = latest_content.splitlines()
         if len(lines) < 3:
             raise Exception("latest.txt deve conter pelo menos 3 linhas correspondentes aos arquivos necessários.")
@@ -257,36 +289,18 @@ def busca_modelo_recomendacao():
         cache_job_metadata = os.path.join(cache_dir, "job_embeddings_metadata.txt")
         cache_annoy_metadata = os.path.join(cache_dir, "annoy_index_metadata.txt")
         
-        def update_file(file_key: str, local_path: str, metadata_path: str):
-            download_required = True
-            if os.path.exists(local_path) and os.path.exists(metadata_path):
-                try:
-                    with open(metadata_path, "r") as meta_file:
-                        cached_last_modified = datetime.fromisoformat(meta_file.read().strip())
-                    s3_last_modified = get_s3_file_last_modified(file_key)
-                    if cached_last_modified >= s3_last_modified:
-                        print(f"Cache HIT para {os.path.basename(local_path)}. Usando arquivo local.")
-                        download_required = False
-                except Exception as e:
-                    print(f"Erro ao ler metadados de {os.path.basename(local_path)}: {e}. Forçando download.")
-                    download_required = True
-            if download_required:
-                print(f"Cache MISS para {os.path.basename(local_path)}. Baixando de {file_key}...")
-                with open(local_path, "wb") as f:
-                    s3_client.download_fileobj(Bucket=bucket_name, Key=file_key, Fileobj=f)
-                s3_last_modified = get_s3_file_last_modified(file_key)
-                with open(metadata_path, "w") as meta_file:
-                    meta_file.write(s3_last_modified.isoformat())
-                print(f"Download de {os.path.basename(local_path)} concluído.")
-        
-        update_file(annoy_key, local_annoy, cache_annoy_metadata)
-        update_file(candidate_embeddings_key, local_candidate, cache_candidate_metadata)
-        update_file(job_embeddings_key, local_job, cache_job_metadata)
+        # Os três artefatos são independentes: baixados simultaneamente
+        artifact_fetcher.fetch_many([
+            (annoy_key, local_annoy, cache_annoy_metadata),
+            (candidate_embeddings_key, local_candidate, cache_candidate_metadata),
+            (job_embeddings_key, local_job, cache_job_metadata),
+        ])
         
         return {
             "annoy_index_path": local_annoy,
             "candidate_embeddings_path": local_candidate,
-            "job_embeddings_path": local_job
+            "job_embeddings_path": local_job,
+            "versao": latest_content
         }
         
     except Exception as e:
@@ -310,20 +324,11 @@ def busca_recommendation_pairs() -> str:
         local_file_path = os.path.join(cache_dir, "recommendation_pairs.parquet")
         cache_metadata_path = os.path.join(cache_dir, "recommendation_pairs_metadata.txt")
         
-        download_required = True
-        if os.path.exists(local_file_path) and os.path.exists(cache_metadata_path):
-            with open(cache_metadata_path, "r") as meta_file:
-                cached_last_modified = datetime.fromisoformat(meta_file.read().strip())
-            s3_last_modified = get_s3_file_last_modified(key=file_key)
-            if cached_last_modified >= s3_last_modified:
-                download_required = False
+        # Download atômico e condicional pelo ETag: a tabela residente só é relida
+        # quando o arquivo em cache é de fato substituído
+        os.makedirs(cache_dir, exist_ok=True)
+        atualiza_arquivo_cache(file_key, local_file_path, cache_metadata_path)
         
-        if download_required:
-            s3_client.download_file(Bucket=bucket_name, Key=file_key, Filename=local_file_path)
-            s3_last_modified = get_s3_file_last_modified(key=file_key)
-            with open(cache_metadata_path, "w") as meta_file:
-                meta_file.write(s3_last_modified.isoformat())
-                
         return local_file_path
         
     except Exception as e:
@@ -341,21 +346,8 @@ def busca_drift_report() -> str:
         local_file_path = os.path.join(cache_dir, "drift_report.html")
         cache_metadata_path = os.path.join(cache_dir, "drift_report_metadata.txt")
         
-        # Verifica se o arquivo está em cache e se está atualizado
-        if os.path.exists(local_file_path) and os.path.exists(cache_metadata_path):
-            with open(cache_metadata_path, "r") as meta_file:
-                cached_last_modified = datetime.fromisoformat(meta_file.read().strip())
-            s3_last_modified = get_s3_file_last_modified(key=file_key)
-            if cached_last_modified >= s3_last_modified:
-                return local_file_path  # Retorna o caminho do arquivo em cache
-        
-        # Baixa o arquivo do S3
-        s3_client.download_file(Bucket=bucket_name, Key=file_key, Filename=local_file_path)
-        
-        # Atualiza os metadados do cache
-        s3_last_modified = get_s3_file_last_modified(key=file_key)
-        with open(cache_metadata_path, "w") as meta_file:
-            meta_file.write(s3_last_modified.isoformat())
+        # Baixa o arquivo apenas se o ETag mudou
+        atualiza_arquivo_cache(file_key, local_file_path, cache_metadata_path)
         
         # retorna o arquivo html para a api
         return local_file_path
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from core.config import settings
+
+
+class BoundedExecutor:
+    """
+    Pool de threads dedicado para trabalho de inferência (CPU-bound) com limite de fila.
+
+    O trabalho é executado fora do event loop, mantendo a API responsiva para as demais
+    requisições. Quando o número de tarefas pendentes (em execução + em fila) atinge
+    `max_workers + max_fila`, novas tarefas são rejeitadas com 503 e um cabeçalho Retry-After.
+
+    Threads são usadas em vez de processos porque predict_proba, o encode do
+    SentenceTransformer e a busca no Annoy liberam o GIL e o modelo não precisa ser serializado.
+    """
+
+    def __init__(self, nome: str, max_workers: int, max_fila: int):
+        self.nome = nome
+        self._max_workers = max(1, max_workers)
+        self._max_pendentes = self._max_workers + max(0, max_fila)
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix=nome)
+        self._lock = threading.Lock()
+        self._pendentes = 0
+        self._rejeitadas = 0
+        self._concluidas = 0
+
+    def _libera(self, _futuro):
+        with self._lock:
+            self._pendentes -= 1
+            self._concluidas += 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Executa `fn` no pool e aguarda o resultado sem bloquear o event loop."""
+        with self._lock:
+            if self._pendentes >= self._max_pendentes:
+                self._rejeitadas += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Serviço de inferência ({self.nome}) sobrecarregado. Tente novamente em instantes.",
+                    headers={"Retry-After": "1"}
+                )
+            self._pendentes += 1
+
+        # O contador é liberado quando a tarefa termina de fato no pool,
+        # mesmo que o cliente desista da requisição antes disso.
+        futuro = self._executor.submit(fn, *args, **kwargs)
+        futuro.add_done_callback(self._libera)
+        return await asyncio.wrap_future(futuro)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self._max_workers,
+                "limite_pendentes": self._max_pendentes,
+                "pendentes": self._pendentes,
+                "concluidas": self._concluidas,
+                "rejeitadas": self._rejeitadas,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+match_executor = BoundedExecutor(
+    "match-inference",
+    max_workers=settings.INFERENCE_MATCH_WORKERS,
+    max_fila=settings.INFERENCE_MATCH_QUEUE_LIMIT
+)
+
+recommendation_executor = BoundedExecutor(
+    "recommendation-inference",
+    max_workers=settings.INFERENCE_RECOMMENDATION_WORKERS,
+    max_fila=settings.INFERENCE_RECOMMENDATION_QUEUE_LIMIT
+)
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from collections import Counter, deque
+from typing import Any, Callable, List, Sequence
+
+
+class MicroBatcher:
+    """
+    Agrupa requisições concorrentes de uma linha em um único lote de predição.
+
+    Cada chamada a `submit` entra em uma fila; um worker assíncrono aguarda até
+    `janela_ms` milissegundos (ou até `max_batch_size` itens) a partir do primeiro item,
+    executa `predict_fn` uma única vez para o lote e devolve a cada requisição o seu resultado.
+
+    `predict_fn` recebe a lista de registros e deve retornar uma sequência de resultados
+    na mesma ordem. Se um `executor` (BoundedExecutor) for informado, a predição roda nele,
+    fora do event loop, e o worker segue formando o próximo lote enquanto isso.
+    """
+
+    def __init__(self, predict_fn: Callable[[List[dict]], Sequence[Any]], max_batch_size: int, janela_ms: int, executor=None):
+        self._predict_fn = predict_fn
+        self._executor = executor
+        self._lotes_em_execucao = set()
+        self._max_batch_size = max(1, max_batch_size)
+        self._janela = max(0, janela_ms) / 1000
+        self._fila: asyncio.Queue = None
+        self._worker: asyncio.Task = None
+        self._loop = None
+
+        # Métricas
+        self._tamanhos_lote = Counter()
+        self._esperas = deque(maxlen=1000)  # últimas esperas em fila (segundos)
+        self._total_requisicoes = 0
+        self._total_lotes = 0
+        self._soma_espera = 0.0
+        self._max_espera = 0.0
+
+    def _garante_worker(self):
+        # A fila e o worker ficam presos ao event loop em que foram criados
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._fila = asyncio.Queue()
+            self._worker = loop.create_task(self._executa())
+
+    async def submit(self, registro: dict):
+        """Enfileira um registro e aguarda o resultado da predição em lote."""
+        self._garante_worker()
+        futuro = self._loop.create_future()
+        await self._fila.put((registro, futuro, time.perf_counter()))
+        return await futuro
+
+    async def _executa(self):
+        while True:
+            lote = [await self._fila.get()]
+            prazo = self._loop.time() + self._janela
+            while len(lote) < self._max_batch_size:
+                restante = prazo - self._loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._fila.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            tarefa = self._loop.create_task(self._processa(lote))
+            self._lotes_em_execucao.add(tarefa)
+            tarefa.add_done_callback(self._lotes_em_execucao.discard)
+
+    async def _processa(self, lote: list):
+        inicio = time.perf_counter()
+        self._registra_metricas(lote, inicio)
+        try:
+            registros = [registro for registro, _, _ in lote]
+            if self._executor is not None:
+                resultados = await self._executor.run(self._predict_fn, registros)
+            else:
+                resultados = self._predict_fn(registros)
+        except Exception as e:
+            for _, futuro, _ in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+
+        for (_, futuro, _), resultado in zip(lote, resultados):
+            # O cliente pode ter desistido da requisição enquanto aguardava
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+    def _registra_metricas(self, lote: list, inicio: float):
+        self._total_lotes += 1
+        self._total_requisicoes += len(lote)
+        self._tamanhos_lote[len(lote)] += 1
+        for _, _, enfileirado_em in lote:
+            espera = inicio - enfileirado_em
+            self._esperas.append(espera)
+            self._soma_espera += espera
+            self._max_espera = max(self._max_espera, espera)
+
+    def metrics(self) -> dict:
+        esperas = sorted(self._esperas)
+
+        def percentil(p: float) -> float:
+            if not esperas:
+                return 0.0
+            return esperas[min(len(esperas) - 1, int(p * len(esperas)))] * 1000
+
+        return {
+            "total_requisicoes": self._total_requisicoes,
+            "total_lotes": self._total_lotes,
+            "tamanho_medio_lote": self._total_requisicoes / self._total_lotes if self._total_lotes else 0.0,
+            "distribuicao_tamanho_lote": dict(sorted(self._tamanhos_lote.items())),
+            "espera_fila_ms": {
+                "media": (self._soma_espera / self._total_requisicoes * 1000) if self._total_requisicoes else 0.0,
+                "p50": percentil(0.50),
+                "p95": percentil(0.95),
+                "p99": percentil(0.99),
+                "max": self._max_espera * 1000,
+            },
+        }
@@ -0,0 +1,142 @@
+import fcntl
+import json
+import os
+import shutil
+from contextlib import contextmanager
+import joblib
+from sklearn.pipeline import Pipeline
+from xgboost import XGBClassifier
+
+
+# Layout nativo do pipeline de classificação (alternativo ao model_matching.pkl):
+#   manifest.json          -> descreve os arquivos abaixo
+#   preprocessador.joblib  -> etapas de pré-processamento já ajustadas, sem compressão,
+#                             para que os arrays numpy numéricos sejam memory-mapped na carga
+#                             (dicionários e arrays de objetos são sempre desserializados)
+#   booster.ubj            -> booster do XGBoost no formato binário nativo
+MANIFEST_NAME = "manifest.json"
+FORMATO_NATIVO = "nativo"
+VERSAO_FORMATO = 1
+
+
+def is_manifest_key(key: str) -> bool:
+    """Indica se a chave apontada pelo latest.txt corresponde ao layout nativo."""
+    return key.rstrip("/").endswith(MANIFEST_NAME)
+
+
+def le_manifest(diretorio: str) -> dict:
+    with open(os.path.join(diretorio, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("formato") != FORMATO_NATIVO:
+        raise ValueError(f"Formato de artefato não suportado: {manifest.get('formato')}")
+    if manifest.get("versao_formato", 0) > VERSAO_FORMATO:
+        raise ValueError(f"Versão do formato de artefato não suportada: {manifest.get('versao_formato')}")
+    return manifest
+
+
+def arquivos_do_manifest(manifest: dict) -> list:
+    """Lista os arquivos (relativos ao diretório do manifest) que compõem o artefato."""
+    return [nome for nome in (manifest.get("preprocessador"), manifest["booster"]) if nome]
+
+
+def _arquivo_lock_versao(diretorio_locks: str, versao: str):
+    os.makedirs(diretorio_locks, exist_ok=True)
+    return open(os.path.join(diretorio_locks, f"modelo_nativo_{versao}.lock"), "a")
+
+
+@contextmanager
+def usa_versao(diretorio_locks: str, versao: str):
+    """
+    Lock compartilhado (flock) de uma versão durante o download e a carga dos seus arquivos,
+    válido entre os workers: enquanto ele é mantido, a versão não é removida do cache.
+    """
+    with _arquivo_lock_versao(diretorio_locks, versao) as arquivo:
+        fcntl.flock(arquivo, fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+
+def remove_versoes_antigas(diretorio_cache: str, versao_atual: str, diretorio_locks: str) -> list:
+    """
+    Remove do cache os diretórios das versões diferentes da atual. Uma versão sendo baixada
+    ou carregada por outro worker (lock de usa_versao) é mantida e removida em uma carga seguinte.
+    Páginas já mapeadas por modelos carregados continuam válidas após a remoção.
+
+    :return: Versões removidas.
+    """
+    removidas = []
+    for versao in os.listdir(diretorio_cache):
+        if versao == versao_atual:
+            continue
+        with _arquivo_lock_versao(diretorio_locks, versao) as arquivo:
+            try:
+                fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            try:
+                shutil.rmtree(os.path.join(diretorio_cache, versao), ignore_errors=True)
+                removidas.append(versao)
+            finally:
+                fcntl.flock(arquivo, fcntl.LOCK_UN)
+    return removidas
+
+
+def exporta_pipeline_nativo(pipeline, diretorio: str) -> dict:
+    """
+    Exporta um pipeline sklearn treinado (com um XGBClassifier como última etapa)
+    para o layout nativo. Deve ser usado pelo pipeline de treinamento antes do upload para o S3.
+
+    :param pipeline: Pipeline sklearn ou XGBClassifier isolado.
+    :param diretorio: Diretório de saída.
+    :return: Conteúdo do manifest gerado.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    if isinstance(pipeline, Pipeline):
+        nome_etapa, classificador = pipeline.steps[-1]
+        preprocessador = pipeline[:-1] if len(pipeline.steps) > 1 else None
+    else:
+        nome_etapa, classificador, preprocessador = "classifier", pipeline, None
+
+    if not isinstance(classificador, XGBClassifier):
+        raise ValueError("A última etapa do pipeline deve ser um XGBClassifier.")
+
+    manifest = {
+        "formato": FORMATO_NATIVO,
+        "versao_formato": VERSAO_FORMATO,
+        "etapa_classificador": nome_etapa,
+        "booster": "booster.ubj",
+        "preprocessador": "preprocessador.joblib" if preprocessador is not None else None,
+    }
+
+    classificador.save_model(os.path.join(diretorio, manifest["booster"]))
+    if preprocessador is not None:
+        # Sem compressão: é o que permite o memory-map dos arrays na carga
+        joblib.dump(preprocessador, os.path.join(diretorio, manifest["preprocessador"]), compress=0)
+
+    with open(os.path.join(diretorio, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def carrega_pipeline_nativo(diretorio: str):
+    """
+    Carrega o pipeline a partir do layout nativo.
+
+    O booster é lido diretamente pelo XGBoost, sem unpickle. No pré-processamento, apenas os arrays
+    numéricos (ex.: média e escala de um StandardScaler) são memory-mapped e compartilhados entre os
+    workers pelo page cache; vocabulários (dict) e categorias (arrays de objetos) não podem ser
+    mapeados e são carregados na memória de cada worker, como no .pkl.
+    """
+    manifest = le_manifest(diretorio)
+
+    classificador = XGBClassifier()
+    classificador.load_model(os.path.join(diretorio, manifest["booster"]))
+
+    if not manifest.get("preprocessador"):
+        return classificador
+
+    preprocessador = joblib.load(os.path.join(diretorio, manifest["preprocessador"]), mmap_mode="r")
+    etapas = list(preprocessador.steps) if isinstance(preprocessador, Pipeline) else [("preprocessor", preprocessador)]
+    return Pipeline(etapas + [(manifest["etapa_classificador"], classificador)])
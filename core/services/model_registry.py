@@ -0,0 +1,100 @@
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+from core.config import settings
+from core.services.fetch_S3_files import busca_modelo_classificacao, get_latest_model_key
+
+
+MATCH_MODEL_KEY_PREFIX = "models/Modelo_Matching_Classificacao/"
+
+
+class ModelRegistry:
+    """
+    Registro em memória do pipeline de classificação (modelo de matching).
+
+    O modelo é carregado uma única vez por processo (no startup da aplicação) e mantido
+    residente. Uma thread em background verifica periodicamente o latest.txt no S3 e,
+    quando ele aponta para uma nova versão, carrega o novo pipeline e o troca de forma
+    atômica. As requisições apenas leem a referência atual, sem acessar o S3 nem fazer unpickle.
+    """
+
+    def __init__(self, intervalo_polling: int):
+        self._intervalo_polling = intervalo_polling
+        # Tupla (versao, modelo). A troca da referência é atômica, então os leitores
+        # sempre enxergam um par consistente sem precisar de lock.
+        self._atual: Optional[Tuple[str, Any]] = None
+        self._lock_carga = threading.Lock()
+        self._listeners: List[Callable[[str], None]] = []
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def versao(self) -> Optional[str]:
+        atual = self._atual
+        return atual[0] if atual else None
+
+    def get(self) -> Tuple[str, Any]:
+        """Retorna a tupla (versao, modelo) ativa, carregando o modelo caso ainda não exista."""
+        atual = self._atual
+        if atual is None:
+            atual = self.load()
+        return atual
+
+    def get_model(self):
+        return self.get()[1]
+
+    def on_version_change(self, callback: Callable[[str], None]):
+        """Registra uma função chamada com a nova versão sempre que o modelo for trocado."""
+        self._listeners.append(callback)
+
+    def load(self, versao: str = None) -> Tuple[str, Any]:
+        """
+        Carrega a versão informada (ou a indicada no latest.txt) e a torna ativa.
+        Se a versão já estiver carregada, nada é feito.
+        """
+        with self._lock_carga:
+            if versao is None:
+                versao = get_latest_model_key(model=MATCH_MODEL_KEY_PREFIX)
+            atual = self._atual
+            if atual is not None and atual[0] == versao:
+                return atual
+
+            modelo = busca_modelo_classificacao(latest_model=versao)
+            self._atual = (versao, modelo)
+            print(f"Modelo de matching carregado em memória: {versao}")
+
+        for callback in self._listeners:
+            try:
+                callback(versao)
+            except Exception as e:
+                print(f"Erro ao notificar troca de versão do modelo de matching: {e}")
+        return self._atual
+
+    def _poll(self):
+        while not self._parar.wait(self._intervalo_polling):
+            try:
+                # O polling já roda fora das requisições: consulta o S3 a cada ciclo, sem janela de frescor
+                versao = get_latest_model_key(model=MATCH_MODEL_KEY_PREFIX, frescor_segundos=0)
+                if versao != self.versao:
+                    print(f"Nova versão do modelo de matching detectada: {versao}")
+                    self.load(versao)
+            except Exception as e:
+                print(f"Erro ao verificar nova versão do modelo de matching: {e}")
+
+    def start(self):
+        """Carrega o modelo e inicia a verificação periódica do latest.txt."""
+        try:
+            self.load()
+        except Exception as e:
+            # A aplicação sobe mesmo sem o modelo; a primeira requisição tentará carregá-lo novamente
+            print(f"Erro ao carregar o modelo de matching no startup: {e}")
+
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._poll, name="match-model-poller", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._parar.set()
+
+
+match_model_registry = ModelRegistry(intervalo_polling=settings.MODEL_POLL_INTERVAL_SECONDS)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from core.config import settings
+
+
+class PredictionCache:
+    """
+    Cache LRU + TTL em memória para resultados de inferência.
+
+    A chave é o hash do payload normalizado (dump do schema, com os valores padrão
+    preenchidos e as chaves ordenadas) junto com a versão do modelo/índice ativo.
+    Quando a versão ativa muda (novo artefato no latest.txt), o cache é esvaziado.
+    """
+
+    def __init__(self, nome: str, max_itens: int, ttl_segundos: int):
+        self.nome = nome
+        self._max_itens = max(1, max_itens)
+        self._ttl = ttl_segundos
+        self._itens: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._versao: Optional[str] = None
+        self._versao_confirmada_em = 0.0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidacoes = 0
+
+    @staticmethod
+    def chave(payload: dict, versao: str, **parametros) -> str:
+        conteudo = json.dumps(
+            {"payload": payload, "parametros": parametros, "versao": versao},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def sync_version(self, versao: str):
+        """Esvazia o cache se a versão ativa do modelo/índice mudou."""
+        with self._lock:
+            self._versao_confirmada_em = time.monotonic()
+            if versao != self._versao:
+                if self._itens:
+                    self._invalidacoes += 1
+                self._itens.clear()
+                self._versao = versao
+
+    def versao_recente(self, max_idade_segundos: float) -> Optional[str]:
+        """Versão ativa, se ela foi confirmada (sync_version) há no máximo `max_idade_segundos`."""
+        with self._lock:
+            if self._versao is not None and time.monotonic() - self._versao_confirmada_em <= max_idade_segundos:
+                return self._versao
+            return None
+
+    def clear(self):
+        with self._lock:
+            if self._itens:
+                self._invalidacoes += 1
+            self._itens.clear()
+
+    def get(self, chave: str) -> Tuple[bool, Any]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                expira_em, valor = item
+                if expira_em > time.monotonic():
+                    self._itens.move_to_end(chave)
+                    self._hits += 1
+                    return True, valor
+                del self._itens[chave]
+            self._misses += 1
+            return False, None
+
+    def set(self, chave: str, valor: Any):
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self._ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self._max_itens:
+                self._itens.popitem(last=False)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "versao": self._versao,
+                "itens": len(self._itens),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+                "invalidacoes": self._invalidacoes,
+            }
+
+
+match_prediction_cache = PredictionCache(
+    "match",
+    max_itens=settings.PREDICTION_CACHE_MAX_ITEMS,
+    ttl_segundos=settings.PREDICTION_CACHE_TTL_SECONDS
+)
+
+recommendation_prediction_cache = PredictionCache(
+    "recomendacao",
+    max_itens=settings.PREDICTION_CACHE_MAX_ITEMS,
+    ttl_segundos=settings.PREDICTION_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,226 @@
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from annoy import AnnoyIndex
+from core.config import settings
+from core.services.encoder import get_encoder
+from core.services.fetch_S3_files import busca_modelo_recomendacao, busca_recommendation_pairs
+from core.services.vector_search import BACKEND_EXATO, IndiceExato
+
+
+# Colunas de recommendation_pairs.parquet usadas na resposta da recomendação
+COLUNAS_VAGA = ["codigo_vaga", "titulo_vaga", "competencia_tecnicas_e_comportamentais", "areas_atuacao_vaga"]
+# Colunas aceitas como identificador do candidato de cada par (na ordem de preferência)
+COLUNAS_CANDIDATO = ["codigo_candidato", "codigo_profissional"]
+
+
+def assinatura_arquivo(path: str) -> Tuple[int, int, int]:
+    """
+    Identifica a versão de um arquivo em cache. Como os downloads substituem o arquivo
+    atomicamente (os.replace), a assinatura só muda quando um novo artefato é baixado,
+    inclusive quando o download foi feito por outro worker.
+    """
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class TabelaVagas:
+    """
+    Tabela de consulta das vagas recomendáveis, indexada pelo id do item no índice Annoy
+    (a linha i corresponde ao item i). Apenas as colunas da resposta são lidas do parquet,
+    e cada coluna fica em um array NumPy contíguo.
+    """
+
+    def __init__(self, path: str):
+        df = pd.read_parquet(path, columns=COLUNAS_VAGA)
+        # Códigos normalizados para int, o mesmo tipo usado pelo banco e pelo índice delta
+        df["codigo_vaga"] = df["codigo_vaga"].astype("int64")
+        self.colunas = {coluna: df[coluna].to_numpy() for coluna in COLUNAS_VAGA}
+        self.total = len(df)
+        # Primeira linha de cada vaga, para localizar o embedding de uma vaga pelo código
+        self._linhas: Dict[Any, int] = {}
+        for linha, codigo in enumerate(self.colunas["codigo_vaga"].tolist()):
+            self._linhas.setdefault(codigo, linha)
+
+    def registros(self, indices: List[int]) -> List[dict]:
+        # tolist converte os escalares NumPy em tipos Python (serializáveis em JSON)
+        selecionados = {coluna: valores[indices].tolist() for coluna, valores in self.colunas.items()}
+        return [dict(zip(selecionados, linha)) for linha in zip(*selecionados.values())]
+
+    def linha_da_vaga(self, codigo_vaga) -> Optional[int]:
+        return self._linhas.get(codigo_vaga)
+
+
+class IndiceCandidatos:
+    """
+    Busca vetorizada (NumPy) sobre os embeddings de candidatos.
+
+    A linha i de candidate_embeddings.npy corresponde ao candidato da linha i do
+    recommendation_pairs.parquet; como um candidato aparece em vários pares, apenas a primeira
+    linha de cada candidato é mantida, e a busca é exata (IndiceExato), opcionalmente sobre
+    uma matriz quantizada (EMBEDDINGS_QUANTIZATION).
+    """
+
+    def __init__(self, candidate_embeddings_path: str, recommendation_pairs_path: str):
+        colunas = pq.read_schema(recommendation_pairs_path).names
+        coluna = next((nome for nome in COLUNAS_CANDIDATO if nome in colunas), None)
+        if coluna is None:
+            raise RuntimeError(
+                f"recommendation_pairs.parquet não possui coluna de candidato ({', '.join(COLUNAS_CANDIDATO)})."
+            )
+        codigos = pd.read_parquet(recommendation_pairs_path, columns=[coluna])[coluna].to_numpy()
+
+        embeddings = np.load(candidate_embeddings_path, mmap_mode="r")
+        if embeddings.shape[0] != len(codigos):
+            raise RuntimeError(
+                f"Há {embeddings.shape[0]} embeddings de candidatos, mas {len(codigos)} linhas em recommendation_pairs."
+            )
+
+        _, primeiras = np.unique(codigos, return_index=True)
+        primeiras.sort()
+        self.indice = IndiceExato(
+            embeddings,
+            linhas=primeiras,
+            quantizacao=settings.EMBEDDINGS_QUANTIZATION,
+            fator_reranqueamento=settings.EMBEDDINGS_RERANK_FACTOR
+        )
+        self.codigos = codigos[primeiras]
+        self.total = len(self.codigos)
+
+    def busca(self, vetor: np.ndarray, k: int) -> List[Tuple[Any, float]]:
+        """Retorna os k candidatos mais próximos do vetor como pares (codigo, distancia angular)."""
+        indices, distancias = self.indice.get_nns_by_vector(vetor, k, include_distances=True)
+        return list(zip(self.codigos[indices].tolist(), distancias))
+
+
+class RecommendationStore:
+    """
+    Mantém os artefatos do modelo de recomendação residentes no processo.
+
+    O índice Annoy é carregado uma única vez (memory-mapped, então vários workers do uvicorn
+    compartilham as mesmas páginas pelo page cache) e lido por todas as requisições, assim como a
+    tabela de vagas lida do recommendation_pairs.parquet, os embeddings de vagas e o índice de
+    candidatos. Cada artefato só é recarregado quando o arquivo em cache é substituído por um novo
+    download; a troca é feita substituindo a referência, sem afetar as requisições que ainda usam
+    a versão anterior.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # nome do artefato -> (assinatura dos arquivos de origem, objeto carregado)
+        self._artefatos: Dict[str, Tuple[tuple, Any]] = {}
+
+    def _residente(self, nome: str, assinatura: tuple, carregar: Callable[[], Any]) -> Any:
+        atual = self._artefatos.get(nome)
+        if atual is not None and atual[0] == assinatura:
+            return atual[1]
+
+        with self._lock:
+            atual = self._artefatos.get(nome)
+            if atual is None or atual[0] != assinatura:
+                # Troca atômica da referência; a versão anterior é liberada quando não estiver mais em uso
+                self._artefatos[nome] = (assinatura, carregar())
+            return self._artefatos[nome][1]
+
+    def _carrega_annoy(self, annoy_index_path: str, job_embeddings_path: str) -> AnnoyIndex:
+        # A dimensão vem do encoder, e não de um valor fixo
+        dim = get_encoder().get_sentence_embedding_dimension()
+
+        # Os embeddings de vagas foram usados para construir o índice: valida dimensão e quantidade
+        job_embeddings = np.load(job_embeddings_path, mmap_mode="r")
+        if job_embeddings.shape[1] != dim:
+            raise ValueError(
+                f"Dimensão dos embeddings de vagas ({job_embeddings.shape[1]}) difere da dimensão do encoder ({dim})."
+            )
+
+        annoy_index = AnnoyIndex(dim, "angular")
+        annoy_index.load(annoy_index_path)  # mmap do arquivo, somente leitura
+        if annoy_index.get_n_items() != job_embeddings.shape[0]:
+            raise ValueError(
+                f"O índice Annoy possui {annoy_index.get_n_items()} itens, "
+                f"mas há {job_embeddings.shape[0]} embeddings de vagas."
+            )
+        print(f"Índice Annoy carregado: {annoy_index.get_n_items()} itens.")
+        return annoy_index
+
+    def _carrega_tabela_vagas(self, recommendation_pairs_path: str) -> TabelaVagas:
+        tabela = TabelaVagas(recommendation_pairs_path)
+        print(f"Tabela de vagas para recomendação carregada: {tabela.total} linhas.")
+        return tabela
+
+    def _carrega_indice_candidatos(self, candidate_embeddings_path: str, recommendation_pairs_path: str) -> IndiceCandidatos:
+        indice = IndiceCandidatos(candidate_embeddings_path, recommendation_pairs_path)
+        print(
+            f"Índice de candidatos carregado: {indice.total} candidatos "
+            f"({indice.indice.quantizacao}, {indice.indice.bytes_memoria / 1024 ** 2:.1f} MB)."
+        )
+        return indice
+
+    def get_annoy_index(self, recommendation_files: dict) -> AnnoyIndex:
+        """Retorna o índice Annoy residente, recarregando-o apenas se o arquivo em cache mudou."""
+        annoy_index_path = recommendation_files["annoy_index_path"]
+        return self._residente(
+            "annoy",
+            assinatura_arquivo(annoy_index_path),
+            lambda: self._carrega_annoy(annoy_index_path, recommendation_files["job_embeddings_path"])
+        )
+
+    def get_tabela_vagas(self, recommendation_pairs_path: str) -> TabelaVagas:
+        """Retorna a tabela de vagas residente, relendo o parquet apenas se o arquivo em cache mudou."""
+        return self._residente(
+            "tabela_vagas",
+            assinatura_arquivo(recommendation_pairs_path),
+            lambda: self._carrega_tabela_vagas(recommendation_pairs_path)
+        )
+
+    def get_job_embeddings(self, recommendation_files: dict) -> np.ndarray:
+        """Retorna os embeddings de vagas (memory-mapped, somente leitura)."""
+        job_embeddings_path = recommendation_files["job_embeddings_path"]
+        return self._residente(
+            "job_embeddings",
+            assinatura_arquivo(job_embeddings_path),
+            lambda: np.load(job_embeddings_path, mmap_mode="r")
+        )
+
+    def get_indice_vagas_exato(self, recommendation_files: dict) -> IndiceExato:
+        """Retorna o índice exato (produto matriz-vetor) sobre os embeddings de vagas."""
+        job_embeddings_path = recommendation_files["job_embeddings_path"]
+        return self._residente(
+            "indice_vagas_exato",
+            assinatura_arquivo(job_embeddings_path),
+            lambda: IndiceExato(
+                np.load(job_embeddings_path, mmap_mode="r"),
+                quantizacao=settings.EMBEDDINGS_QUANTIZATION,
+                fator_reranqueamento=settings.EMBEDDINGS_RERANK_FACTOR
+            )
+        )
+
+    def get_indice_vagas(self, recommendation_files: dict, backend: str):
+        """Retorna o índice de vagas do backend informado (Annoy ou busca exata), com a mesma interface de consulta."""
+        if backend == BACKEND_EXATO:
+            return self.get_indice_vagas_exato(recommendation_files)
+        return self.get_annoy_index(recommendation_files)
+
+    def get_indice_candidatos(self, recommendation_files: dict, recommendation_pairs_path: str) -> IndiceCandidatos:
+        """Retorna o índice de candidatos residente, recarregando-o se os embeddings ou os pares mudaram."""
+        candidate_embeddings_path = recommendation_files["candidate_embeddings_path"]
+        return self._residente(
+            "indice_candidatos",
+            assinatura_arquivo(candidate_embeddings_path) + assinatura_arquivo(recommendation_pairs_path),
+            lambda: self._carrega_indice_candidatos(candidate_embeddings_path, recommendation_pairs_path)
+        )
+
+    def versao(self, recommendation_files: dict, recommendation_pairs_path: str) -> str:
+        """Versão dos artefatos de recomendação: latest.txt do índice + arquivo de pares em cache."""
+        return f"{recommendation_files['versao']}|{assinatura_arquivo(recommendation_pairs_path)}"
+
+    def load(self):
+        """Baixa (ou valida o cache) dos artefatos e os carrega em memória."""
+        self.get_annoy_index(busca_modelo_recomendacao())
+        self.get_tabela_vagas(busca_recommendation_pairs())
+
+
+recommendation_store = RecommendationStore()
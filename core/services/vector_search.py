@@ -0,0 +1,131 @@
+from typing import List, Tuple, Union
+import numpy as np
+
+
+# Backends de busca de vagas disponíveis na recomendação
+BACKEND_ANNOY = "annoy"
+BACKEND_EXATO = "exato"
+BACKENDS = (BACKEND_ANNOY, BACKEND_EXATO)
+
+# Representações da matriz de embeddings mantida em memória pelo IndiceExato
+QUANTIZACAO_NENHUMA = "none"
+QUANTIZACAO_FLOAT16 = "float16"
+QUANTIZACAO_INT8 = "int8"
+QUANTIZACOES = (QUANTIZACAO_NENHUMA, QUANTIZACAO_FLOAT16, QUANTIZACAO_INT8)
+
+# Linhas convertidas para float32 por vez ao pontuar uma matriz quantizada
+TAMANHO_BLOCO = 8192
+
+
+def distancia_angular(similaridades: np.ndarray) -> np.ndarray:
+    # Mesma métrica do índice Annoy "angular": sqrt(2 * (1 - cos))
+    return np.sqrt(np.maximum(2.0 * (1.0 - similaridades), 0.0))
+
+
+class IndiceExato:
+    """
+    Busca exata por similaridade de cosseno: os vetores ficam normalizados em memória e cada
+    consulta é um único produto matriz-vetor, seguido de um top-k parcial (argpartition).
+
+    Opcionalmente, a matriz em memória é quantizada (float16, ou int8 com uma escala por vetor),
+    reduzindo a memória por worker em 2x ou 4x. Nesse caso a pontuação é feita sobre a matriz
+    quantizada e os fator_reranqueamento * n melhores itens são reordenados com os vetores float32
+    originais, lidos do arquivo memory-mapped.
+
+    Expõe a mesma interface de consulta do AnnoyIndex (get_n_items e get_nns_by_vector, com
+    distâncias angulares), de forma que os dois backends são intercambiáveis na recomendação.
+
+    :param vetores: Matriz de embeddings (normalmente o np.load com mmap_mode="r").
+    :param linhas: Linhas de vetores que compõem o índice (None para todas).
+    :param quantizacao: "none", "float16" ou "int8".
+    :param fator_reranqueamento: Tamanho da lista reordenada em float32, em múltiplos de n.
+    """
+
+    def __init__(self, vetores: np.ndarray, linhas: np.ndarray = None, quantizacao: str = QUANTIZACAO_NENHUMA,
+                 fator_reranqueamento: int = 4):
+        if quantizacao not in QUANTIZACOES:
+            raise ValueError(f"Quantização não suportada: {quantizacao}. Use uma de: {', '.join(QUANTIZACOES)}.")
+        self.quantizacao = quantizacao
+        self._fator_reranqueamento = max(1, fator_reranqueamento)
+        self._vetores = vetores
+        self._linhas = linhas
+        total = vetores.shape[0] if linhas is None else len(linhas)
+
+        dtype = {QUANTIZACAO_NENHUMA: np.float32, QUANTIZACAO_FLOAT16: np.float16, QUANTIZACAO_INT8: np.int8}[quantizacao]
+        self.matriz = np.empty((total, vetores.shape[1]), dtype=dtype)
+        self._escalas = np.ones(total, dtype=np.float32) if quantizacao == QUANTIZACAO_INT8 else None
+        self._normas = np.empty(total, dtype=np.float32)
+
+        # Converte em blocos para não materializar uma cópia float32 completa da matriz
+        for inicio in range(0, total, TAMANHO_BLOCO):
+            fim = min(inicio + TAMANHO_BLOCO, total)
+            bloco = np.asarray(self._originais(np.arange(inicio, fim)), dtype=np.float32)
+            normas = np.linalg.norm(bloco, axis=1)
+            normas[normas == 0] = 1.0
+            self._normas[inicio:fim] = normas
+            bloco = bloco / normas[:, None]
+            if quantizacao == QUANTIZACAO_INT8:
+                escalas = np.abs(bloco).max(axis=1) / 127.0
+                escalas[escalas == 0] = 1.0
+                self._escalas[inicio:fim] = escalas
+                bloco = np.round(bloco / escalas[:, None])
+            self.matriz[inicio:fim] = bloco.astype(dtype)
+
+    def _originais(self, posicoes: np.ndarray) -> np.ndarray:
+        linhas = posicoes if self._linhas is None else self._linhas[posicoes]
+        if isinstance(self._vetores, np.memmap):
+            # Leitura das linhas do arquivo memory-mapped em ordem crescente
+            ordem = np.argsort(linhas)
+            resultado = np.empty((len(linhas), self._vetores.shape[1]), dtype=np.float32)
+            resultado[ordem] = self._vetores[linhas[ordem]]
+            return resultado
+        return self._vetores[linhas]
+
+    @property
+    def bytes_memoria(self) -> int:
+        extras = self._normas.nbytes + (self._escalas.nbytes if self._escalas is not None else 0)
+        return self.matriz.nbytes + extras
+
+    def get_n_items(self) -> int:
+        return self.matriz.shape[0]
+
+    def _similaridades(self, consulta: np.ndarray) -> np.ndarray:
+        if self.quantizacao == QUANTIZACAO_NENHUMA:
+            return self.matriz @ consulta
+        # Matrizes quantizadas são convertidas em blocos para usar o BLAS em float32
+        similaridades = np.empty(self.get_n_items(), dtype=np.float32)
+        for inicio in range(0, self.get_n_items(), TAMANHO_BLOCO):
+            fim = min(inicio + TAMANHO_BLOCO, self.get_n_items())
+            similaridades[inicio:fim] = self.matriz[inicio:fim].astype(np.float32) @ consulta
+        if self._escalas is not None:
+            similaridades *= self._escalas
+        return similaridades
+
+    def get_nns_by_vector(
+        self, vetor: np.ndarray, n: int, search_k: int = -1, include_distances: bool = False
+    ) -> Union[List[int], Tuple[List[int], List[float]]]:
+        # search_k só se aplica ao Annoy; a busca exata sempre avalia todos os itens
+        n = min(n, self.get_n_items())
+        if n <= 0:
+            return ([], []) if include_distances else []
+
+        consulta = np.asarray(vetor, dtype=np.float32)
+        consulta = consulta / (np.linalg.norm(consulta) or 1.0)
+        similaridades = self._similaridades(consulta)
+
+        if self.quantizacao == QUANTIZACAO_NENHUMA:
+            melhores = np.argpartition(-similaridades, n - 1)[:n]
+            melhores = melhores[np.argsort(-similaridades[melhores])]
+            similaridades_melhores = similaridades[melhores]
+        else:
+            # Lista curta pela matriz quantizada, reordenada com os vetores float32 originais
+            tamanho = min(n * self._fator_reranqueamento, self.get_n_items())
+            lista_curta = np.argpartition(-similaridades, tamanho - 1)[:tamanho]
+            exatas = (self._originais(lista_curta) @ consulta) / self._normas[lista_curta]
+            ordem = np.argsort(-exatas)[:n]
+            melhores = lista_curta[ordem]
+            similaridades_melhores = exatas[ordem]
+
+        if not include_distances:
+            return melhores.tolist()
+        return melhores.tolist(), distancia_angular(similaridades_melhores).tolist()
@@ -2,12 +2,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.v1.api import api_router
 from core.config import settings
-from sqlmodel import SQLModel
+from sqlmodel import SQLModel, Session
 from core.database import auth_engine, system_engine
 from models.usuario_model import UsuarioModel  # Modelos do banco de autenticação
 from models.candidato_model import CandidatoInfosBasicas, CandidatoInformacoesPessoais, CandidatoInformacoesProfissionais, CandidatoFormacaoEIdiomas ,CandidatoCurriculos 
 from models.vagas_model import VagaInfosBasicas, VagaPerfil, VagaBeneficios  # Modelos do banco de sistema
 from models.prospect_model import Prospect  # Modelo de prospects
+from models.sync_model import HashCandidato, HashVaga, HashProspectsVaga, DatasetFingerprint  # Hashes da sincronização delta e fingerprints dos datasets
+from api.utils.functions.table_swap import garante_indices
+from core.services.model_registry import match_model_registry
+from core.services.inference_executor import match_executor, recommendation_executor
+from core.services.encoder import warmup_encoder
+from core.services.recommendation_store import recommendation_store
 #from models.vaga_model import VagaModel  # Outros modelos do banco de sistema
 import os
 
@@ -28,7 +34,17 @@ def create_system_db_and_tables():
         VagaInfosBasicas.__table__,
         VagaPerfil.__table__,
         VagaBeneficios.__table__,
+        HashCandidato.__table__,
+        HashVaga.__table__,
+        HashProspectsVaga.__table__,
+        DatasetFingerprint.__table__,
     ])
+    # Índices declarados nos modelos depois da criação das tabelas (ex.: chaves estrangeiras)
+    with Session(system_engine) as db:
+        garante_indices(db, [
+            CandidatoInfosBasicas, CandidatoInformacoesPessoais, CandidatoInformacoesProfissionais,
+            CandidatoFormacaoEIdiomas, CandidatoCurriculos, Prospect, VagaInfosBasicas, VagaPerfil, VagaBeneficios
+        ])
 
 def get_application() -> FastAPI:
     app = FastAPI(title=settings.PROJECT_NAME)
@@ -46,6 +62,24 @@ def get_application() -> FastAPI:
         # Criação de tabelas separadas
         create_auth_db_and_tables()
         create_system_db_and_tables()
+        # Carrega o modelo de matching em memória e inicia a verificação de novas versões
+        match_model_registry.start()
+        # Carrega o encoder de recomendação uma única vez e faz o aquecimento
+        try:
+            warmup_encoder()
+        except Exception as e:
+            print(f"Erro ao carregar o encoder de recomendação no startup: {e}")
+        # Carrega o índice de recomendação uma única vez por processo
+        try:
+            recommendation_store.load()
+        except Exception as e:
+            print(f"Erro ao carregar os artefatos de recomendação no startup: {e}")
+
+    @app.on_event("shutdown")
+    def on_shutdown():
+        match_model_registry.stop()
+        match_executor.shutdown()
+        recommendation_executor.shutdown()
 
     @app.get("/")
     def read_root():
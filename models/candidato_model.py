@@ -27,7 +27,7 @@ class CandidatoInfosBasicas(SQLModel, table=True):
 class CandidatoInformacoesPessoais(SQLModel, table=True):
     __tablename__ = "candidato_informacoes_pessoais"
     id: Optional[int] = Field(default=None, primary_key=True)
-    codigo_profissional: int = Field(foreign_key="candidato_infos_basicas.codigo_profissional")
+    codigo_profissional: int = Field(foreign_key="candidato_infos_basicas.codigo_profissional", index=True)
     nome: Optional[str] = None
     cpf: Optional[str] = None
     telefone_celular: Optional[str] = None
@@ -50,7 +50,7 @@ class CandidatoInformacoesPessoais(SQLModel, table=True):
 class CandidatoInformacoesProfissionais(SQLModel, table=True):
     __tablename__ = "candidato_informacoes_profissionais"
     id: Optional[int] = Field(default=None, primary_key=True)
-    codigo_profissional: int = Field(foreign_key="candidato_infos_basicas.codigo_profissional")
+    codigo_profissional: int = Field(foreign_key="candidato_infos_basicas.codigo_profissional", index=True)
     titulo_profissional: Optional[str] = Field(default=None, sa_column=Column(Text))
     area_atuacao: Optional[str] = Field(default=None, sa_column=Column(Text))
     conhecimentos_tecnicos: Optional[str] = Field(default=None, sa_column=Column(Text))
@@ -65,7 +65,7 @@ class CandidatoInformacoesProfissionais(SQLModel, table=True):
 class CandidatoFormacaoEIdiomas(SQLModel, table=True):
     __tablename__ = "candidato_formacao_e_idiomas"
     id: Optional[int] = Field(default=None, primary_key=True)
-    codigo_profissional: int = Field(foreign_key="candidato_infos_basicas.codigo_profissional")
+    codigo_profissional: int = Field(foreign_key="candidato_infos_basicas.codigo_profissional", index=True)
     nivel_academico: Optional[str] = None
     nivel_ingles: Optional[str] = None
     nivel_espanhol: Optional[str] = None
@@ -77,7 +77,7 @@ class CandidatoFormacaoEIdiomas(SQLModel, table=True):
 class CandidatoCurriculos(SQLModel, table=True):
     __tablename__ = "candidato_curriculos"
     id: Optional[int] = Field(default=None, primary_key=True)
-    codigo_profissional: int = Field(foreign_key="candidato_infos_basicas.codigo_profissional")
+    codigo_profissional: int = Field(foreign_key="candidato_infos_basicas.codigo_profissional", index=True)
     cv_pt: Optional[str] = Field(default=None, sa_column=Column(Text))
 
     infos_basicas: Optional[CandidatoInfosBasicas] = Relationship(back_populates="curriculos")
\ No newline at end of file
@@ -0,0 +1,39 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+# Hash do conteúdo de cada registro do último JSON carregado no banco, usado pela
+# sincronização incremental (modo "delta") do /update-tables
+
+class HashCandidato(SQLModel, table=True):
+    __tablename__ = "sync_hash_candidatos"
+    codigo_profissional: int = Field(primary_key=True)
+    content_hash: str
+
+
+class HashVaga(SQLModel, table=True):
+    __tablename__ = "sync_hash_vagas"
+    codigo_vaga: int = Field(primary_key=True)
+    content_hash: str
+
+
+class HashProspectsVaga(SQLModel, table=True):
+    # Um hash por vaga, cobrindo a lista de prospects da vaga
+    __tablename__ = "sync_hash_prospects"
+    codigo_vaga: int = Field(primary_key=True)
+    content_hash: str
+
+
+# Versão do formato das tabelas carregadas a partir dos datasets: incrementar quando os modelos ou
+# a conversão do JSON mudarem, para que o próximo /update-tables recarregue mesmo sem mudança no arquivo
+VERSAO_ESQUEMA_DATASETS = 1
+
+
+class DatasetFingerprint(SQLModel, table=True):
+    # Identificação do último arquivo carregado com sucesso em cada conjunto de tabelas
+    __tablename__ = "dataset_fingerprints"
+    dataset: str = Field(primary_key=True)
+    etag: Optional[str] = None
+    content_hash: str
+    schema_version: int
+    carregado_em: datetime
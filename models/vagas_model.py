@@ -33,7 +33,7 @@ class VagaInfosBasicas(SQLModel, table=True):
 class VagaPerfil(SQLModel, table=True):
     __tablename__ = "vaga_perfil"
     id: Optional[int] = Field(default=None, primary_key=True)
-    codigo_vaga: int = Field(foreign_key="vaga_infos_basicas.codigo_vaga")
+    codigo_vaga: int = Field(foreign_key="vaga_infos_basicas.codigo_vaga", index=True)
     pais: Optional[str] = None
     estado: Optional[str] = None
     cidade: Optional[str] = None
@@ -61,7 +61,7 @@ class VagaPerfil(SQLModel, table=True):
 class VagaBeneficios(SQLModel, table=True):
     __tablename__ = "vaga_beneficios"
     id: Optional[int] = Field(default=None, primary_key=True)
-    codigo_vaga: int = Field(foreign_key="vaga_infos_basicas.codigo_vaga")
+    codigo_vaga: int = Field(foreign_key="vaga_infos_basicas.codigo_vaga", index=True)
     valor_venda: Optional[str] = None
     valor_compra_1: Optional[str] = None
     valor_compra_2: Optional[str] = None
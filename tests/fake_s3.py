@@ -0,0 +1,81 @@
+import hashlib
+import io
+import threading
+from datetime import datetime, timezone
+from botocore.exceptions import ClientError
+
+
+def erro_s3(codigo: str, status: int, operacao: str = "GetObject") -> ClientError:
+    return ClientError(
+        {"Error": {"Code": codigo, "Message": codigo}, "ResponseMetadata": {"HTTPStatusCode": status}},
+        operacao
+    )
+
+
+class FakeS3Client:
+    """
+    Cliente S3 em memória para testes offline, com o subconjunto de get_object/head_object/put_object
+    usado pela aplicação: requisições condicionais (IfNoneMatch/IfMatch) e por intervalo (Range).
+    Registra todas as chamadas em `chamadas`.
+    """
+
+    def __init__(self):
+        self.objetos = {}
+        self.chamadas = []
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **kwargs):
+        if isinstance(Body, str):
+            Body = Body.encode("utf-8")
+        etag = f'"{hashlib.md5(Body).hexdigest()}"'
+        with self._lock:
+            self.objetos[(Bucket, Key)] = {"corpo": bytes(Body), "etag": etag, "last_modified": datetime.now(timezone.utc)}
+        return {"ETag": etag}
+
+    def _objeto(self, Bucket: str, Key: str, operacao: str) -> dict:
+        objeto = self.objetos.get((Bucket, Key))
+        if objeto is None:
+            raise erro_s3("NoSuchKey", 404, operacao)
+        return objeto
+
+    def head_object(self, Bucket: str, Key: str):
+        with self._lock:
+            self.chamadas.append(("head_object", Key, {}))
+        objeto = self._objeto(Bucket, Key, "HeadObject")
+        return {"ETag": objeto["etag"], "LastModified": objeto["last_modified"], "ContentLength": len(objeto["corpo"])}
+
+    def get_object(self, Bucket: str, Key: str, IfNoneMatch: str = None, IfMatch: str = None, Range: str = None):
+        with self._lock:
+            self.chamadas.append(("get_object", Key, {"IfNoneMatch": IfNoneMatch, "IfMatch": IfMatch, "Range": Range}))
+        objeto = self._objeto(Bucket, Key, "GetObject")
+        corpo = objeto["corpo"]
+
+        if IfMatch is not None and IfMatch != objeto["etag"]:
+            raise erro_s3("PreconditionFailed", 412)
+        if IfNoneMatch is not None and IfNoneMatch == objeto["etag"]:
+            raise erro_s3("304", 304)
+
+        resposta = {"ETag": objeto["etag"], "LastModified": objeto["last_modified"]}
+        if Range is not None:
+            inicio, fim = (int(valor) for valor in Range.replace("bytes=", "").split("-"))
+            if inicio >= len(corpo):
+                raise erro_s3("InvalidRange", 416)
+            fim = min(fim, len(corpo) - 1)
+            parte = corpo[inicio:fim + 1]
+            resposta.update({
+                "Body": io.BytesIO(parte),
+                "ContentLength": len(parte),
+                "ContentRange": f"bytes {inicio}-{fim}/{len(corpo)}",
+            })
+        else:
+            resposta.update({"Body": io.BytesIO(corpo), "ContentLength": len(corpo)})
+        return resposta
+
+    def download_fileobj(self, Bucket: str, Key: str, Fileobj):
+        Fileobj.write(self.get_object(Bucket=Bucket, Key=Key)["Body"].read())
+
+    def contagem(self, operacao: str = None, key: str = None) -> int:
+        return sum(
+            1 for nome, chave, _ in self.chamadas
+            if (operacao is None or nome == operacao) and (key is None or chave == key)
+        )
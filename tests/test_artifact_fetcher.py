@@ -0,0 +1,147 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import pytest
+from fake_s3 import FakeS3Client
+from core.services.artifact_fetcher import ArtifactFetcher
+
+BUCKET = "bucket-teste"
+
+
+@pytest.fixture
+def s3():
+    return FakeS3Client()
+
+
+def caminhos(tmp_path, nome):
+    return str(tmp_path / nome), str(tmp_path / f"{nome}_metadata.txt")
+
+
+# Primeiro acesso baixa o arquivo; com o cache atualizado, uma única requisição condicional (304)
+def test_fetch_cache_atualizado_um_round_trip(s3, tmp_path):
+    s3.put_object(Bucket=BUCKET, Key="models/index.ann", Body=b"conteudo do indice")
+    fetcher = ArtifactFetcher(s3, BUCKET)
+    local, meta = caminhos(tmp_path, "index.ann")
+
+    assert fetcher.fetch("models/index.ann", local, meta) is True
+    with open(local, "rb") as f:
+        assert f.read() == b"conteudo do indice"
+    with open(meta) as f:
+        assert json.load(f)["key"] == "models/index.ann"
+
+    s3.chamadas.clear()
+    assert fetcher.fetch("models/index.ann", local, meta) is False
+    assert len(s3.chamadas) == 1
+    assert s3.chamadas[0][2]["IfNoneMatch"] is not None
+
+
+# Arquivo alterado no S3 é baixado novamente
+def test_fetch_arquivo_alterado(s3, tmp_path):
+    s3.put_object(Bucket=BUCKET, Key="dados.parquet", Body=b"versao 1")
+    fetcher = ArtifactFetcher(s3, BUCKET)
+    local, meta = caminhos(tmp_path, "dados.parquet")
+    fetcher.fetch("dados.parquet", local, meta)
+
+    s3.put_object(Bucket=BUCKET, Key="dados.parquet", Body=b"versao 2 maior")
+    assert fetcher.fetch("dados.parquet", local, meta) is True
+    with open(local, "rb") as f:
+        assert f.read() == b"versao 2 maior"
+
+
+# Arquivos grandes são baixados em partes (GETs por intervalo condicionados ao ETag)
+def test_fetch_multipart(s3, tmp_path):
+    corpo = os.urandom(10_000)
+    s3.put_object(Bucket=BUCKET, Key="embeddings.npy", Body=corpo)
+    fetcher = ArtifactFetcher(s3, BUCKET, tamanho_parte=1024, limite_multipart=2048)
+    local, meta = caminhos(tmp_path, "embeddings.npy")
+
+    assert fetcher.fetch("embeddings.npy", local, meta) is True
+    with open(local, "rb") as f:
+        assert f.read() == corpo
+    partes = [c for c in s3.chamadas if c[2]["IfMatch"] is not None]
+    assert len(partes) == 8
+    assert not os.path.exists(f"{local}.tmp")
+
+
+# Metadados no formato antigo (data ISO) forçam um novo download; objetos vazios são suportados
+def test_fetch_metadados_antigos_e_objeto_vazio(s3, tmp_path):
+    s3.put_object(Bucket=BUCKET, Key="vazio.txt", Body=b"")
+    fetcher = ArtifactFetcher(s3, BUCKET)
+    local, meta = caminhos(tmp_path, "vazio.txt")
+    with open(local, "wb") as f:
+        f.write(b"antigo")
+    with open(meta, "w") as f:
+        f.write("2024-01-01T00:00:00+00:00")
+
+    assert fetcher.fetch("vazio.txt", local, meta) is True
+    assert os.path.getsize(local) == 0
+    assert fetcher.fetch("vazio.txt", local, meta) is False
+
+
+# Vários artefatos independentes em uma chamada
+def test_fetch_many(s3, tmp_path):
+    itens = []
+    for nome in ("annoy_index.ann", "candidate_embeddings.npy", "job_embeddings.npy"):
+        s3.put_object(Bucket=BUCKET, Key=f"models/{nome}", Body=nome.encode() * 100)
+        itens.append((f"models/{nome}", *caminhos(tmp_path, nome)))
+    fetcher = ArtifactFetcher(s3, BUCKET, tamanho_parte=256, limite_multipart=512)
+
+    assert fetcher.fetch_many(itens) == [True, True, True]
+    for key, local, _ in itens:
+        with open(local, "rb") as f:
+            assert f.read() == s3.objetos[(BUCKET, key)]["corpo"]
+    assert fetcher.fetch_many(itens) == [False, False, False]
+
+
+# Chave inexistente propaga o erro do S3 sem deixar arquivos temporários
+def test_fetch_chave_inexistente(s3, tmp_path):
+    fetcher = ArtifactFetcher(s3, BUCKET)
+    local, meta = caminhos(tmp_path, "inexistente.bin")
+    with pytest.raises(Exception):
+        fetcher.fetch("inexistente.bin", local, meta)
+    assert os.listdir(tmp_path) == []
+
+
+# Dentro da janela de frescor o arquivo em cache é servido sem nenhuma chamada ao S3
+def test_fetch_dentro_da_janela_de_frescor(s3, tmp_path):
+    s3.put_object(Bucket=BUCKET, Key="latest.txt", Body=b"v1/model.pkl")
+    fetcher = ArtifactFetcher(s3, BUCKET, frescor_segundos=300)
+    local, meta = caminhos(tmp_path, "latest.txt")
+    assert fetcher.fetch("latest.txt", local, meta) is True
+
+    s3.put_object(Bucket=BUCKET, Key="latest.txt", Body=b"v2/model.pkl")
+    s3.chamadas.clear()
+    assert fetcher.fetch("latest.txt", local, meta) is False
+    assert s3.chamadas == []
+
+    # frescor_segundos=0 força a validação síncrona
+    assert fetcher.fetch("latest.txt", local, meta, frescor_segundos=0) is True
+    with open(local, "rb") as f:
+        assert f.read() == b"v2/model.pkl"
+
+
+# Após a janela de frescor, a cópia em cache é servida e revalidada em background
+def test_fetch_stale_while_revalidate(s3, tmp_path):
+    s3.put_object(Bucket=BUCKET, Key="pairs.parquet", Body=b"versao 1")
+    fetcher = ArtifactFetcher(s3, BUCKET, frescor_segundos=300)
+    local, meta = caminhos(tmp_path, "pairs.parquet")
+    fetcher.fetch("pairs.parquet", local, meta)
+
+    with open(meta) as f:
+        metadados = json.load(f)
+    metadados["validado_em"] -= 301
+    with open(meta, "w") as f:
+        json.dump(metadados, f)
+
+    s3.put_object(Bucket=BUCKET, Key="pairs.parquet", Body=b"versao 2")
+    assert fetcher.fetch("pairs.parquet", local, meta) is False
+    fetcher.aguarda_revalidacoes(timeout=5)
+    with open(local, "rb") as f:
+        assert f.read() == b"versao 2"
+
+    # Revalidado: volta a ser servido sem chamadas ao S3
+    s3.chamadas.clear()
+    assert fetcher.fetch("pairs.parquet", local, meta) is False
+    assert s3.chamadas == []
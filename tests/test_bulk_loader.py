@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import SQLModel, Session, create_engine, select, func
+from api.utils.functions.bulk_loader import CarregadorEmLote
+from api.utils.functions.table_swap import SUFIXO_STAGING, recarga_atomica
+from models.vagas_model import VagaInfosBasicas, VagaPerfil
+
+MODELOS = [VagaInfosBasicas, VagaPerfil]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'system.db'}")
+    SQLModel.metadata.create_all(engine, tables=[VagaInfosBasicas.__table__, VagaPerfil.__table__])
+    return engine
+
+
+def conta(engine, modelo) -> int:
+    with Session(engine) as db:
+        return db.exec(select(func.count()).select_from(modelo)).one()
+
+
+def carrega_vagas(carregador: CarregadorEmLote, codigos, titulo: str):
+    for codigo in codigos:
+        carregador.adiciona(VagaInfosBasicas, {"titulo_vaga": f"{titulo} {codigo}", "chave_extra": 1}, codigo_vaga=codigo)
+        carregador.adiciona(VagaPerfil, {"areas_atuacao": "TI"}, codigo_vaga=codigo)
+
+
+def tabelas_staging(engine) -> list:
+    with engine.connect() as conexao:
+        return [nome for (nome,) in conexao.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?", (f"%{SUFIXO_STAGING}",)
+        )]
+
+
+# Um lote pequeno é descarregado em vários commits e todas as linhas chegam às tabelas
+def test_carga_em_lote_insere_todas_as_linhas(engine):
+    with Session(engine) as db:
+        carregador = CarregadorEmLote(db, MODELOS, tamanho_lote=2)
+        carrega_vagas(carregador, range(1, 8), "Analista")
+        estatisticas = carregador.finaliza()
+
+    assert conta(engine, VagaInfosBasicas) == 7
+    assert conta(engine, VagaPerfil) == 7
+    assert estatisticas["vaga_infos_basicas"]["linhas"] == 7
+    assert estatisticas["vaga_perfil"]["linhas"] == 7
+    with Session(engine) as db:
+        assert db.get(VagaInfosBasicas, 3).titulo_vaga == "Analista 3"
+        # Chave primária autoincremental gerada pelo banco quando não informada
+        assert sorted(db.exec(select(VagaPerfil.id)).all()) == list(range(1, 8))
+
+
+# Uma falha no meio da carga descarta a staging (inclusive os lotes já commitados) e mantém as tabelas em uso
+def test_falha_na_carga_descarta_staging(engine):
+    with Session(engine) as db:
+        carregador = CarregadorEmLote(db, MODELOS, tamanho_lote=2)
+        carrega_vagas(carregador, range(1, 4), "Analista")
+        carregador.finaliza()
+
+    with Session(engine) as db:
+        with pytest.raises(IntegrityError):
+            with recarga_atomica(db, MODELOS) as destinos:
+                carregador = CarregadorEmLote(db, MODELOS, tamanho_lote=2, destinos=destinos)
+                carrega_vagas(carregador, range(10, 15), "Desenvolvedor")
+                # Código de vaga repetido: viola a chave primária na staging
+                carrega_vagas(carregador, [10], "Desenvolvedor")
+                carregador.finaliza()
+
+    assert conta(engine, VagaInfosBasicas) == 3
+    assert conta(engine, VagaPerfil) == 3
+    assert tabelas_staging(engine) == []
+    with Session(engine) as db:
+        assert db.get(VagaInfosBasicas, 1).titulo_vaga == "Analista 1"
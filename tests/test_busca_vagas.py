@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from annoy import AnnoyIndex
+from api.v1.endpoints import inferencias
+from api.v1.endpoints.inferencias import InputDataRecomendacaoModel, recomenda_vagas
+from core.services import recommendation_store as recommendation_store_module
+from core.services.delta_index import IndiceDeltaVagas
+from core.services.recommendation_store import RecommendationStore
+from core.services.vector_search import IndiceExato
+
+DIM = 16
+VAGAS = 200
+
+
+class EncoderFake:
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+
+class IndiceEspiao:
+    """Repassa as consultas ao índice real, registrando o tipo do índice e o search_k recebido."""
+
+    def __init__(self, indice, chamadas: list):
+        self._indice = indice
+        self._chamadas = chamadas
+
+    def get_n_items(self):
+        return self._indice.get_n_items()
+
+    def get_nns_by_vector(self, vetor, n, search_k=-1, include_distances=False):
+        self._chamadas.append((type(self._indice), search_k))
+        return self._indice.get_nns_by_vector(vetor, n, search_k=search_k, include_distances=include_distances)
+
+
+@pytest.fixture
+def artefatos(tmp_path, monkeypatch):
+    """Artefatos de recomendação locais (embeddings, índice Annoy e pares) no lugar dos baixados do S3."""
+    vetores = np.random.default_rng(0).normal(size=(VAGAS, DIM)).astype(np.float32)
+    files = {
+        "versao": "v1",
+        "job_embeddings_path": str(tmp_path / "job_embeddings.npy"),
+        "annoy_index_path": str(tmp_path / "annoy_index.ann"),
+    }
+    np.save(files["job_embeddings_path"], vetores)
+    annoy = AnnoyIndex(DIM, "angular")
+    annoy.set_seed(42)
+    for item, vetor in enumerate(vetores):
+        annoy.add_item(item, vetor)
+    annoy.build(10)
+    annoy.save(files["annoy_index_path"])
+    pairs_path = str(tmp_path / "recommendation_pairs.parquet")
+    pd.DataFrame({
+        "codigo_vaga": np.arange(VAGAS),
+        "titulo_vaga": [f"Vaga {codigo}" for codigo in range(VAGAS)],
+        "competencia_tecnicas_e_comportamentais": "",
+        "areas_atuacao_vaga": "",
+    }).to_parquet(pairs_path)
+
+    consulta = np.random.default_rng(1).normal(size=DIM).astype(np.float32)
+    store = RecommendationStore()
+    chamadas = []
+    get_indice_vagas = store.get_indice_vagas
+    monkeypatch.setattr(store, "get_indice_vagas", lambda *args: IndiceEspiao(get_indice_vagas(*args), chamadas))
+    monkeypatch.setattr(recommendation_store_module, "get_encoder", lambda: EncoderFake())
+    monkeypatch.setattr(inferencias, "recommendation_store", store)
+    monkeypatch.setattr(inferencias, "busca_modelo_recomendacao", lambda: files)
+    monkeypatch.setattr(inferencias, "busca_recommendation_pairs", lambda: pairs_path)
+    monkeypatch.setattr(inferencias, "encode_textos", lambda textos: np.stack([consulta] * len(textos)))
+    monkeypatch.setattr(inferencias, "delta_vagas", IndiceDeltaVagas(str(tmp_path)))
+    inferencias.recommendation_prediction_cache.clear()
+    return vetores, consulta, chamadas
+
+
+def payload() -> InputDataRecomendacaoModel:
+    campos = InputDataRecomendacaoModel.model_fields
+    return InputDataRecomendacaoModel(**{campo: "Analista de Dados" for campo in campos})
+
+
+def exatos(vetores: np.ndarray, consulta: np.ndarray, k: int) -> list:
+    similaridades = (vetores / np.linalg.norm(vetores, axis=1, keepdims=True)) @ (consulta / np.linalg.norm(consulta))
+    return np.argsort(-similaridades)[:k].tolist()
+
+
+# O backend informado seleciona o índice consultado, e o search_k chega ao índice
+@pytest.mark.parametrize("backend, tipo_indice", [("annoy", AnnoyIndex), ("exato", IndiceExato)])
+def test_backend_e_search_k_repassados_ao_indice(artefatos, backend, tipo_indice):
+    vetores, consulta, chamadas = artefatos
+    recomendacoes = recomenda_vagas(payload(), k=5, search_k=5000, backend=backend)
+
+    assert chamadas and all(chamada == (tipo_indice, 5000) for chamada in chamadas)
+    # Com 200 vagas, os dois backends retornam as 5 vagas mais próximas
+    assert [registro["codigo_vaga"] for registro in recomendacoes] == exatos(vetores, consulta, 5)
+
+
+# Um search_k pequeno limita os nós inspecionados pelo Annoy, mas a busca exata o ignora
+def test_search_k_limita_apenas_o_annoy(artefatos):
+    vetores, consulta, chamadas = artefatos
+    annoy = recomenda_vagas(payload(), k=20, search_k=1, backend="annoy")
+    exato = recomenda_vagas(payload(), k=20, search_k=1, backend="exato")
+
+    assert [tipo for tipo, _ in chamadas] == [AnnoyIndex] * (len(chamadas) - 1) + [IndiceExato]
+    assert [registro["codigo_vaga"] for registro in exato] == exatos(vetores, consulta, 20)
+    assert [registro["codigo_vaga"] for registro in annoy] != [registro["codigo_vaga"] for registro in exato]
@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from sqlmodel import SQLModel, Session, create_engine
+from api.utils.functions import dataset_fingerprint
+from api.utils.functions.dataset_fingerprint import (
+    DATASET_CANDIDATOS, verifica_dataset, invalida_fingerprint, registra_fingerprint
+)
+from models.sync_model import DatasetFingerprint
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'system.db'}")
+    SQLModel.metadata.create_all(engine, tables=[DatasetFingerprint.__table__])
+    with Session(engine) as sessao:
+        yield sessao
+
+
+def grava(tmp_path, conteudo: str) -> str:
+    caminho = tmp_path / "applicants.json"
+    caminho.write_text(conteudo, encoding="utf-8")
+    return str(caminho)
+
+
+def test_sem_fingerprint_carrega(db, tmp_path):
+    assert verifica_dataset(db, DATASET_CANDIDATOS, '"etag1"', grava(tmp_path, "{}")) == (False, None)
+
+
+# Mesmo ETag: inalterado sem ler o arquivo; outro ETag com o mesmo conteúdo: inalterado pelo hash
+def test_arquivo_inalterado_pelo_etag_ou_pelo_conteudo(db, tmp_path):
+    caminho = grava(tmp_path, '{"1": {}}')
+    registra_fingerprint(db, DATASET_CANDIDATOS, '"etag1"', caminho)
+
+    assert verifica_dataset(db, DATASET_CANDIDATOS, '"etag1"', caminho) == (True, None)
+
+    inalterado, content_hash = verifica_dataset(db, DATASET_CANDIDATOS, '"etag2"', caminho)
+    assert inalterado and content_hash is not None
+    # O novo ETag é guardado e dispensa o hash na próxima verificação
+    assert db.get(DatasetFingerprint, DATASET_CANDIDATOS).etag == '"etag2"'
+
+    inalterado, _ = verifica_dataset(db, DATASET_CANDIDATOS, '"etag3"', grava(tmp_path, '{"2": {}}'))
+    assert not inalterado
+
+
+def test_versao_do_esquema_e_invalidacao_forcam_recarga(db, tmp_path, monkeypatch):
+    caminho = grava(tmp_path, "{}")
+    registra_fingerprint(db, DATASET_CANDIDATOS, '"etag1"', caminho)
+
+    monkeypatch.setattr(dataset_fingerprint, "VERSAO_ESQUEMA_DATASETS", 2)
+    assert not verifica_dataset(db, DATASET_CANDIDATOS, '"etag1"', caminho)[0]
+    monkeypatch.undo()
+
+    invalida_fingerprint(db, DATASET_CANDIDATOS)
+    assert not verifica_dataset(db, DATASET_CANDIDATOS, '"etag1"', caminho)[0]
@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+import pytest
+from api.utils.functions.dataset_lock import recarga_dataset, escrita_dataset, RecargaEmAndamento
+
+
+# Durante a recarga, escritas no mesmo dataset são rejeitadas; em outros datasets, não
+def test_escrita_rejeitada_durante_recarga(tmp_path):
+    with escrita_dataset("vagas", diretorio=str(tmp_path)):
+        pass
+    with recarga_dataset("vagas", diretorio=str(tmp_path)):
+        with pytest.raises(RecargaEmAndamento):
+            with escrita_dataset("vagas", diretorio=str(tmp_path)):
+                pass
+        with escrita_dataset("candidatos", diretorio=str(tmp_path)):
+            pass
+    with escrita_dataset("vagas", diretorio=str(tmp_path)):
+        pass
+
+
+# Recargas simultâneas do mesmo dataset são executadas uma após a outra
+def test_recargas_serializadas(tmp_path):
+    eventos = []
+
+    def recarga(nome: str):
+        with recarga_dataset("vagas", diretorio=str(tmp_path)):
+            eventos.append(f"inicio {nome}")
+            time.sleep(0.05)
+            eventos.append(f"fim {nome}")
+
+    threads = [threading.Thread(target=recarga, args=(nome,)) for nome in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [evento.split()[0] for evento in eventos] == ["inicio", "fim", "inicio", "fim"]
+    assert eventos[0].split()[1] == eventos[1].split()[1]
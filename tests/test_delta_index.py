@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+from core.services.delta_index import IndiceDeltaVagas
+
+
+def encode_fake(textos):
+    # Vetor determinístico por texto, sem carregar o encoder
+    return np.stack([np.random.default_rng(sum(texto.encode())).normal(size=8) for texto in textos]).astype(np.float32)
+
+
+def novo_indice(tmp_path) -> IndiceDeltaVagas:
+    return IndiceDeltaVagas(str(tmp_path), encode=encode_fake)
+
+
+def vaga(codigo, titulo: str) -> dict:
+    return {"codigo_vaga": codigo, "titulo_vaga": titulo, "competencia_tecnicas_e_comportamentais": "", "areas_atuacao_vaga": ""}
+
+
+# Vagas incluídas por um worker são vistas pelos demais e após um reinício
+def test_delta_compartilhado_entre_workers(tmp_path):
+    worker_a, worker_b = novo_indice(tmp_path), novo_indice(tmp_path)
+    worker_a.sync_base("v1")
+    worker_b.sync_base("v1")
+
+    worker_a.upsert(vaga("10", "Analista"))
+    worker_b.sincroniza()
+    assert worker_b.total == 1
+    np.testing.assert_array_equal(worker_b.vetor(10), worker_a.vetor("10"))
+
+    worker_b.upsert(vaga(10, "Analista Sênior"))
+    worker_b.upsert(vaga(11, "Desenvolvedor"))
+    reiniciado = novo_indice(tmp_path)
+    reiniciado.sincroniza()
+    assert reiniciado.total == 2
+    np.testing.assert_array_equal(reiniciado.vetor(10), encode_fake(["Analista Sênior  "])[0])
+
+    # Uma nova versão base esvazia o delta em todos os workers
+    worker_a.sync_base("v2")
+    worker_b.sync_base("v2")
+    reiniciado.sincroniza()
+    assert (worker_a.total, worker_b.total, reiniciado.total) == (0, 0, 0)
+
+
+# Vagas do delta substituem as do índice base mesmo quando o código do base não é int
+def test_combina_normaliza_codigos(tmp_path):
+    indice = novo_indice(tmp_path)
+    indice.upsert(vaga(10, "Analista"))
+    base = [{"codigo_vaga": np.int64(10), "distancia": 0.1}, {"codigo_vaga": 20, "distancia": 0.2}]
+    combinadas = indice.combina(base, indice.vetor(10), k=5)
+    assert [int(registro["codigo_vaga"]) for registro in combinadas] == [10, 20]
+    assert combinadas[0]["titulo_vaga"] == "Analista"
+
+
+# Uma falha no encode não descarta as vagas do log: a sincronização seguinte as indexa
+def test_falha_no_encode_nao_descarta_vagas(tmp_path):
+    falhas = [RuntimeError("encoder indisponível")]
+
+    def encode_instavel(textos):
+        if falhas:
+            raise falhas.pop()
+        return encode_fake(textos)
+
+    IndiceDeltaVagas(str(tmp_path), encode=encode_fake).upsert(vaga(1, "Analista"))
+    indice = IndiceDeltaVagas(str(tmp_path), encode=encode_instavel)
+    with pytest.raises(RuntimeError):
+        indice.sincroniza()
+    assert indice.total == 0
+
+    indice.sincroniza()
+    assert indice.total == 1
+    np.testing.assert_array_equal(indice.vetor(1), encode_fake(["Analista  "])[0])
@@ -0,0 +1,89 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+from api.utils.functions.CRUD_SystemDB import atualizar_tabelas_candidatos
+from api.utils.functions.delta_sync import MODO_DELTA, hash_registro
+from models.candidato_model import (
+    CandidatoInfosBasicas, CandidatoInformacoesPessoais, CandidatoInformacoesProfissionais,
+    CandidatoFormacaoEIdiomas, CandidatoCurriculos
+)
+from models.sync_model import HashCandidato
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'system.db'}")
+    SQLModel.metadata.create_all(engine, tables=[
+        CandidatoInfosBasicas.__table__, CandidatoInformacoesPessoais.__table__,
+        CandidatoInformacoesProfissionais.__table__, CandidatoFormacaoEIdiomas.__table__,
+        CandidatoCurriculos.__table__, HashCandidato.__table__
+    ])
+    return engine
+
+
+def grava(tmp_path, candidatos: dict) -> str:
+    caminho = tmp_path / "applicants.json"
+    caminho.write_text(json.dumps(candidatos), encoding="utf-8")
+    return str(caminho)
+
+
+def candidato(nome: str, nivel: str = "Pleno") -> dict:
+    return {
+        "infos_basicas": {"nome": nome, "email": f"{nome.lower()}@email.com"},
+        "informacoes_pessoais": {"sexo": "Feminino"},
+        "informacoes_profissionais": {"nivel_profissional": nivel},
+        "cv_pt": f"Currículo de {nome}",
+    }
+
+
+def snapshot(engine) -> dict:
+    with Session(engine) as db:
+        return {
+            "nomes": {c.codigo_profissional: c.nome for c in db.exec(select(CandidatoInfosBasicas)).all()},
+            "niveis": sorted((p.codigo_profissional, p.nivel_profissional) for p in db.exec(select(CandidatoInformacoesProfissionais)).all()),
+            "curriculos": sorted((c.codigo_profissional, c.cv_pt) for c in db.exec(select(CandidatoCurriculos)).all()),
+        }
+
+
+def test_hash_registro_independe_da_ordem_das_chaves():
+    assert hash_registro({"a": 1, "b": [1, 2]}) == hash_registro({"b": [1, 2], "a": 1})
+    assert hash_registro({"a": 1}) != hash_registro({"a": 2})
+
+
+# A sincronização delta aplica apenas novos, alterados e removidos e chega ao mesmo estado da carga completa
+def test_sincronizacao_delta_equivale_a_carga_completa(engine, tmp_path):
+    original = {str(codigo): candidato(f"Candidato{codigo}") for codigo in range(1, 21)}
+    with Session(engine) as db:
+        atualizar_tabelas_candidatos(grava(tmp_path, original), db)
+
+    atualizado = dict(original)
+    atualizado["3"] = candidato("Candidato3", nivel="Sênior")
+    atualizado["21"] = candidato("Candidato21")
+    del atualizado["5"], atualizado["6"]
+    with Session(engine) as db:
+        resumo = atualizar_tabelas_candidatos(grava(tmp_path, atualizado), db, modo=MODO_DELTA)
+
+    assert (resumo["novos"], resumo["alterados"], resumo["removidos"], resumo["inalterados"]) == (1, 1, 2, 17)
+    assert resumo["tabelas"]["candidato_infos_basicas"]["linhas"] == 2
+    estado_delta = snapshot(engine)
+
+    with Session(engine) as db:
+        atualizar_tabelas_candidatos(grava(tmp_path, atualizado), db)
+    assert estado_delta == snapshot(engine)
+
+    # Sem alterações, nada é regravado
+    with Session(engine) as db:
+        resumo = atualizar_tabelas_candidatos(grava(tmp_path, atualizado), db, modo=MODO_DELTA)
+    assert (resumo["novos"], resumo["alterados"], resumo["removidos"]) == (0, 0, 0)
+
+
+# Sem hashes salvos, o modo delta executa a carga completa
+def test_sincronizacao_delta_sem_hashes(engine, tmp_path):
+    with Session(engine) as db:
+        estatisticas = atualizar_tabelas_candidatos(grava(tmp_path, {"1": candidato("Ana")}), db, modo=MODO_DELTA)
+    assert estatisticas["candidato_infos_basicas"]["linhas"] == 1
+    assert snapshot(engine)["nomes"] == {1: "Ana"}
@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from core.services.embedding_cache import EmbeddingCache
+
+
+def novo_cache(tmp_path) -> EmbeddingCache:
+    return EmbeddingCache("encoder-teste", diretorio=str(tmp_path), max_memoria=10)
+
+
+# Chaves cujo hash termina em bytes nulos devem ser encontradas no disco por outro processo
+def test_chave_terminada_em_zero_encontrada_no_disco(tmp_path):
+    chaves = ["ab" * 31 + "00", "00" * 32, "cd" * 32]
+    vetores = {chave: np.full(4, posicao, dtype=np.float32) for posicao, chave in enumerate(chaves)}
+    novo_cache(tmp_path).put_many(vetores)
+
+    cache = novo_cache(tmp_path)
+    encontrados = cache.get_many(chaves)
+    assert set(encontrados) == set(chaves)
+    for chave in chaves:
+        np.testing.assert_array_equal(encontrados[chave], vetores[chave])
+    metricas = cache.metrics()
+    assert (metricas["hits_disco"], metricas["misses"], metricas["itens_disco"]) == (3, 0, 3)
+
+
+# O namespace segue o encoder definido na carga: vetores de outro encoder não são reaproveitados
+def test_define_encoder_troca_namespace(tmp_path):
+    cache = EmbeddingCache(None, diretorio=str(tmp_path), max_memoria=10, sufixo="-vagas")
+    cache.define_encoder("encoder-teste")
+    chave = cache.chave("texto")
+    cache.put_many({chave: np.ones(4, dtype=np.float32)})
+    assert cache.metrics()["encoder"] == "encoder-teste-vagas"
+
+    cache.define_encoder("encoder-teste-int8")
+    assert cache.chave("texto") != chave
+    assert cache.get_many([chave]) == {}
+    cache.define_encoder("encoder-teste")
+    assert set(cache.get_many([chave])) == {chave}
+
+
+# Com o int8 rejeitado na carga, os vetores do encoder float não vão para o namespace "-int8"
+def test_namespace_do_encoder_float_quando_int8_rejeitado(monkeypatch):
+    from core.config import settings
+    from core.services import encoder
+
+    monkeypatch.setattr(settings, "ENCODER_QUANTIZATION", "int8")
+    monkeypatch.setattr(encoder, "carrega_encoder_float", lambda device=None: "float")
+    monkeypatch.setattr(encoder, "quantiza_encoder", lambda modelo: "int8")
+    monkeypatch.setattr(encoder, "compara_encoders", lambda a, b: {"cosseno_min": 0.5})
+    monkeypatch.setattr(encoder, "_encoder", None)
+
+    assert encoder.get_encoder() == "float"
+    assert encoder.embedding_cache.nome_encoder == settings.SENTENCE_MODEL_NAME
+    assert encoder.embedding_cache_vagas.nome_encoder == f"{settings.SENTENCE_MODEL_NAME}-vagas"
+
+
+# Antes da carga do encoder, as métricas respondem com o cache vazio
+def test_metrics_antes_de_definir_o_encoder(tmp_path):
+    cache = EmbeddingCache(None, diretorio=str(tmp_path), max_memoria=10)
+    assert cache.metrics() == {
+        "encoder": None, "itens_memoria": 0, "itens_disco": 0, "hits_memoria": 0, "hits_disco": 0, "misses": 0
+    }
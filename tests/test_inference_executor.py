@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from core.services.inference_executor import BoundedExecutor
+from core.services.micro_batcher import MicroBatcher
+
+
+def aguarda(evento: threading.Event, valor=None):
+    # Tarefa que ocupa um worker do pool até o evento ser liberado
+    evento.wait(timeout=5)
+    return valor
+
+
+# Com o pool e a fila cheios, a tarefa seguinte é rejeitada com 503 imediatamente, sem esperar vaga
+def test_executor_saturado_rejeita_com_503():
+    executor = BoundedExecutor("teste", max_workers=1, max_fila=1)
+    liberar = threading.Event()
+
+    async def cenario():
+        ocupadas = [asyncio.ensure_future(executor.run(aguarda, liberar, i)) for i in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as erro:
+            await asyncio.wait_for(executor.run(aguarda, liberar), timeout=1)
+        liberar.set()
+        return erro.value, await asyncio.wait_for(asyncio.gather(*ocupadas), timeout=5)
+
+    try:
+        erro, resultados = asyncio.run(cenario())
+    finally:
+        liberar.set()
+        executor.shutdown()
+    assert erro.status_code == 503
+    assert erro.headers["Retry-After"] == "1"
+    assert resultados == [0, 1]
+    metricas = executor.metrics()
+    assert (metricas["rejeitadas"], metricas["concluidas"], metricas["pendentes"]) == (1, 2, 0)
+
+
+# O micro-batcher sobre um executor saturado devolve o 503 a todas as requisições do lote
+def test_micro_batcher_com_executor_saturado():
+    executor = BoundedExecutor("teste", max_workers=1, max_fila=0)
+    liberar = threading.Event()
+
+    async def cenario():
+        ocupada = asyncio.ensure_future(executor.run(aguarda, liberar))
+        await asyncio.sleep(0.05)
+        batcher = MicroBatcher(lambda registros: [1.0] * len(registros), max_batch_size=10, janela_ms=20, executor=executor)
+        falhas = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit({"id": i}) for i in range(3)), return_exceptions=True), timeout=2
+        )
+        liberar.set()
+        await ocupada
+        return falhas
+
+    try:
+        falhas = asyncio.run(cenario())
+    finally:
+        liberar.set()
+        executor.shutdown()
+    assert len(falhas) == 3
+    assert all(isinstance(falha, HTTPException) and falha.status_code == 503 for falha in falhas)
@@ -2,9 +2,13 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import random
 import pytest
 from fastapi.testclient import TestClient
 from main import app
+from api.v1.endpoints import inferencias
+from core.config import settings
+from core.services.prediction_cache import recommendation_prediction_cache
 
 client = TestClient(app)
 BASE_URL = "/api/v1/inferencias"
@@ -48,6 +52,214 @@ def test_match_model_predict_success():
     assert isinstance(data["match_probability"], (int, float))
 
 
+# Teste do cache de predições: o mesmo payload enviado duas vezes deve gerar um hit
+def test_match_model_predict_cache_hit():
+    payload = {
+        "sexo": "Masculino",
+        "estado_civil": "Casado",
+        "pcd": "Não",
+        "vaga_especifica_para_pcd": "Não",
+        "pais_vaga": "Brasil",
+        "nivel_academico": "Superior Completo",
+        "tipo_contratacao": "PJ",
+        "cidade": "Campinas",
+        "cidade_vaga": "São Paulo",
+        "nivel_profissional": "Sênior",
+        "nivel_profissional_vaga": "Sênior",
+        "ingles": "Fluente",
+        "espanhol": "Nenhum",
+        "outros_idiomas": "Nenhum",
+        "nivel_ingles_vaga": "Avançado",
+        "nivel_espanhol_vaga": "Nenhum",
+        "titulo_profissional": "Engenheiro de Software",
+        "titulo_vaga": "Desenvolvedor Java",
+        "conhecimentos_tecnicos": "Java, Spring",
+        "certificacoes": "Nenhuma",
+        "outras_certificacoes": "Nenhuma",
+        "area_atuacao": "Tecnologia",
+        "areas_atuacao_vaga": "Tecnologia",
+        "competencia_tecnicas_e_comportamentais": "Java, microsserviços",
+        "cv_candidato": "Descrição resumida"
+    }
+    primeira = client.post(f"{BASE_URL}/matchModel/predict", json=payload)
+    assert primeira.status_code == 200, primeira.text
+    hits_antes = client.get(f"{BASE_URL}/metrics").json()["cache"]["match"]["hits"]
+    
+    segunda = client.post(f"{BASE_URL}/matchModel/predict", json=payload)
+    assert segunda.status_code == 200, segunda.text
+    assert segunda.json() == primeira.json()
+    hits_depois = client.get(f"{BASE_URL}/metrics").json()["cache"]["match"]["hits"]
+    assert hits_depois == hits_antes + 1
+
+
+# Teste para o endpoint de predição em lote do modelo de match (/matchModel/predict-batch)
+def test_match_model_predict_batch_success():
+    payload = {
+        "sexo": "Feminino",
+        "estado_civil": "Solteira",
+        "pcd": "Não",
+        "vaga_especifica_para_pcd": "Não",
+        "pais_vaga": "Brasil",
+        "nivel_academico": "Superior Completo",
+        "tipo_contratacao": "CLT",
+        "cidade": "São Paulo",
+        "cidade_vaga": "São Paulo",
+        "nivel_profissional": "Pleno",
+        "nivel_profissional_vaga": "Pleno",
+        "ingles": "Avançado",
+        "espanhol": "Básico",
+        "outros_idiomas": "Nenhum",
+        "nivel_ingles_vaga": "Avançado",
+        "nivel_espanhol_vaga": "Intermediário",
+        "titulo_profissional": "Analista de Dados",
+        "titulo_vaga": "Analista de Dados",
+        "conhecimentos_tecnicos": "Python, SQL",
+        "certificacoes": "Certificação X",
+        "outras_certificacoes": "Nenhuma",
+        "area_atuacao": "Tecnologia",
+        "areas_atuacao_vaga": "Tecnologia",
+        "competencia_tecnicas_e_comportamentais": "Boa comunicação, trabalho em equipe",
+        "cv_candidato": "Link para CV ou descrição resumida"
+    }
+    outro_payload = dict(payload, titulo_vaga="Engenheiro de Dados", nivel_profissional_vaga="Sênior")
+    response = client.post(f"{BASE_URL}/matchModel/predict-batch", json=[payload, outro_payload])
+    assert response.status_code == 200, response.text
+    data = response.json()
+    # Uma probabilidade por payload, na mesma ordem do envio
+    assert data["total"] == 2
+    assert len(data["data"]) == 2
+    for item in data["data"]:
+        assert isinstance(item["match_probability"], (int, float))
+
+
+def test_match_model_predict_batch_empty():
+    response = client.post(f"{BASE_URL}/matchModel/predict-batch", json=[])
+    assert response.status_code == 400
+    assert "detail" in response.json()
+
+
+def test_match_model_predict_batch_too_large(monkeypatch):
+    monkeypatch.setattr(settings, "MATCH_BATCH_MAX_SIZE", 2)
+    payload = {
+        "sexo": "Feminino",
+        "estado_civil": "Solteira",
+        "pcd": "Não",
+        "vaga_especifica_para_pcd": "Não",
+        "pais_vaga": "Brasil",
+        "nivel_academico": "Superior Completo",
+        "tipo_contratacao": "CLT",
+        "cidade": "São Paulo",
+        "cidade_vaga": "São Paulo",
+        "nivel_profissional": "Pleno",
+        "nivel_profissional_vaga": "Pleno",
+        "ingles": "Avançado",
+        "espanhol": "Básico",
+        "outros_idiomas": "Nenhum",
+        "nivel_ingles_vaga": "Avançado",
+        "nivel_espanhol_vaga": "Intermediário",
+        "titulo_profissional": "Analista de Dados",
+        "titulo_vaga": "Analista de Dados",
+        "conhecimentos_tecnicos": "Python, SQL",
+        "certificacoes": "Certificação X",
+        "outras_certificacoes": "Nenhuma",
+        "area_atuacao": "Tecnologia",
+        "areas_atuacao_vaga": "Tecnologia",
+        "competencia_tecnicas_e_comportamentais": "Boa comunicação, trabalho em equipe",
+        "cv_candidato": "Link para CV ou descrição resumida"
+    }
+    # Lotes acima do limite configurado são rejeitados antes de qualquer inferência
+    response = client.post(f"{BASE_URL}/matchModel/predict-batch", json=[payload] * 3)
+    assert response.status_code == 413
+    assert "detail" in response.json()
+
+
+@pytest.fixture
+def vaga_com_prospects():
+    """Cria uma vaga e três prospects associados a ela; retorna (codigo_vaga, códigos dos candidatos)."""
+    vaga = client.post("/api/v1/vagas/create", json={
+        "infos_basicas": {"titulo_vaga": "Analista de Dados", "tipo_contratacao": "CLT"},
+        "perfil_vaga": {
+            "competencia_tecnicas_e_comportamentais": "Python, SQL, Power BI",
+            "areas_atuacao": "Tecnologia"
+        }
+    })
+    assert vaga.status_code in (200, 201), vaga.text
+    codigo_vaga = vaga.json()["codigo_vaga"]
+    
+    codigos_candidatos = random.sample(range(100000, 999999), 3)
+    for codigo_candidato in codigos_candidatos:
+        prospect = client.post("/api/v1/prospects/add-candidate", json={
+            "codigo_vaga": codigo_vaga,
+            "titulo_vaga": "Analista de Dados",
+            "nome": f"Candidato {codigo_candidato}",
+            "codigo_candidato": codigo_candidato,
+            "situacao_candidato": "Novo",
+            "data_candidatura": "2025-07-13",
+            "comentario": "Nenhum",
+            "recrutador": "Recrutador Teste"
+        })
+        assert prospect.status_code in (200, 201), prospect.text
+    return codigo_vaga, codigos_candidatos
+
+
+# Teste para o ranking de candidatos de uma vaga (/matchModel/rank/{codigo_vaga})
+def test_match_model_rank_vaga(vaga_com_prospects):
+    codigo_vaga, codigos_candidatos = vaga_com_prospects
+    response = client.get(f"{BASE_URL}/matchModel/rank/{codigo_vaga}")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["codigo_vaga"] == codigo_vaga
+    assert data["total"] == 3
+    assert sorted(item["codigo_candidato"] for item in data["data"]) == sorted(codigos_candidatos)
+    # Os candidatos devem vir ordenados pela probabilidade de match
+    probabilidades = [item["match_probability"] for item in data["data"]]
+    assert probabilidades == sorted(probabilidades, reverse=True)
+    
+    # limit corta o ranking sem alterar a ordem nem o total
+    limitado = client.get(f"{BASE_URL}/matchModel/rank/{codigo_vaga}?limit=2")
+    assert limitado.status_code == 200, limitado.text
+    assert limitado.json()["total"] == 3
+    assert limitado.json()["data"] == data["data"][:2]
+    
+    for limit in (0, -1):
+        response = client.get(f"{BASE_URL}/matchModel/rank/{codigo_vaga}?limit={limit}")
+        assert response.status_code == 422
+
+
+def test_match_model_rank_vaga_not_found():
+    response = client.get(f"{BASE_URL}/matchModel/rank/999999999")
+    assert response.status_code == 404
+    assert "detail" in response.json()
+
+
+# Erros de valor no modelo (ex.: features incompatíveis) não são confundidos com vaga inexistente
+def test_match_model_rank_vaga_model_error(vaga_com_prospects, monkeypatch):
+    def prediz_com_erro(registros, model=None):
+        raise ValueError("Feature shape mismatch")
+    
+    monkeypatch.setattr(inferencias, "prediz_probabilidades_match", prediz_com_erro)
+    codigo_vaga, _ = vaga_com_prospects
+    response = client.get(f"{BASE_URL}/matchModel/rank/{codigo_vaga}")
+    assert response.status_code == 500
+    assert "Feature shape mismatch" in response.json()["detail"]
+
+
+# Teste para o endpoint de métricas internas (/metrics)
+def test_metrics():
+    response = client.get(f"{BASE_URL}/metrics")
+    assert response.status_code == 200
+    data = response.json()
+    assert "micro_batching" in data
+    assert "distribuicao_tamanho_lote" in data["micro_batching"]
+    assert "espera_fila_ms" in data["micro_batching"]
+    # Estado dos pools de inferência
+    assert "pendentes" in data["executores"]["match"]
+    assert "rejeitadas" in data["executores"]["recomendacao"]
+    # Contadores do cache de predições
+    assert "hits" in data["cache"]["match"]
+    assert "misses" in data["cache"]["recomendacao"]
+
+
 # Teste para o endpoint de predição do modelo de recomendação (/recommendationModel/predict)
 def test_recommendation_model_predict_success():
     payload = {
@@ -71,6 +283,134 @@ def test_recommendation_model_predict_success():
     assert isinstance(data["data"], list)
 
 
+# Teste dos parâmetros k e search_k da recomendação: k vagas distintas, com distância
+def test_recommendation_model_predict_k():
+    payload = {
+        "titulo_profissional": "Analista de Dados",
+        "conhecimentos_tecnicos": "Python, SQL",
+        "certificacoes": "Certificação X",
+        "outras_certificacoes": "Nenhuma",
+        "cidade": "São Paulo",
+        "ingles": "Avançado",
+        "espanhol": "Básico",
+        "outros_idiomas": "Nenhum",
+        "pcd": "Não",
+        "cv_candidato": "Link para CV ou descrição resumida"
+    }
+    response = client.post(f"{BASE_URL}/recommendationModel/predict?k=10&search_k=5000", json=payload)
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    assert len(data) == 10
+    codigos = [item["codigo_vaga"] for item in data]
+    assert len(set(codigos)) == len(codigos)
+    distancias = [item["distancia"] for item in data]
+    assert distancias == sorted(distancias)
+    
+    response = client.post(f"{BASE_URL}/recommendationModel/predict?k=0", json=payload)
+    assert response.status_code == 400
+    
+    # Busca exata sobre os embeddings de vagas
+    exato = client.post(f"{BASE_URL}/recommendationModel/predict?k=5&backend=exato", json=payload)
+    assert exato.status_code == 200, exato.text
+    assert len(exato.json()["data"]) == 5
+    
+    response = client.post(f"{BASE_URL}/recommendationModel/predict?backend=invalido", json=payload)
+    assert response.status_code == 400
+
+
+# Teste para o endpoint de recomendação em lote (/recommendationModel/predict-batch)
+def test_recommendation_model_predict_batch_success():
+    payload = {
+        "titulo_profissional": "Analista de Dados",
+        "conhecimentos_tecnicos": "Python, SQL",
+        "certificacoes": "Certificação X",
+        "outras_certificacoes": "Nenhuma",
+        "cidade": "São Paulo",
+        "ingles": "Avançado",
+        "espanhol": "Básico",
+        "outros_idiomas": "Nenhum",
+        "pcd": "Não",
+        "cv_candidato": "Link para CV ou descrição resumida"
+    }
+    outro_payload = dict(payload, titulo_profissional="Desenvolvedor Java", conhecimentos_tecnicos="Java, Spring")
+    response = client.post(f"{BASE_URL}/recommendationModel/predict-batch", json=[payload, outro_payload])
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["total"] == 2
+    assert len(data["data"]) == 2
+    for item in data["data"]:
+        assert isinstance(item["recomendacoes"], list)
+    
+    # O resultado em lote deve ser igual ao da predição individual, calculada sem o cache preenchido pelo lote
+    recommendation_prediction_cache.clear()
+    individual = client.post(f"{BASE_URL}/recommendationModel/predict", json=payload)
+    assert individual.status_code == 200, individual.text
+    assert individual.json()["data"] == data["data"][0]["recomendacoes"]
+
+
+def test_recommendation_model_predict_batch_empty():
+    response = client.post(f"{BASE_URL}/recommendationModel/predict-batch", json=[])
+    assert response.status_code == 400
+
+
+def test_recommendation_model_predict_batch_too_large(monkeypatch):
+    monkeypatch.setattr(settings, "RECOMMENDATION_BATCH_MAX_SIZE", 2)
+    payload = {
+        "titulo_profissional": "Analista de Dados",
+        "conhecimentos_tecnicos": "Python, SQL",
+        "certificacoes": "Certificação X",
+        "outras_certificacoes": "Nenhuma",
+        "cidade": "São Paulo",
+        "ingles": "Avançado",
+        "espanhol": "Básico",
+        "outros_idiomas": "Nenhum",
+        "pcd": "Não",
+        "cv_candidato": "Link para CV ou descrição resumida"
+    }
+    # Lotes acima do limite configurado são rejeitados antes de qualquer inferência
+    response = client.post(f"{BASE_URL}/recommendationModel/predict-batch", json=[payload] * 3)
+    assert response.status_code == 413
+    assert "detail" in response.json()
+
+
+# Teste para o endpoint de candidatos mais próximos de uma vaga (/recommendationModel/candidates/{codigo_vaga})
+def test_recommendation_model_candidates(vaga_com_prospects):
+    codigo_vaga, _ = vaga_com_prospects
+    response = client.get(f"{BASE_URL}/recommendationModel/candidates/{codigo_vaga}?k=5")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["codigo_vaga"] == codigo_vaga
+    # A vaga recém-criada não está no índice: o embedding vem do índice delta ou do banco
+    assert data["origem_embedding"] in ("delta", "banco")
+    assert len(data["data"]) == 5
+    codigos = [item["codigo_candidato"] for item in data["data"]]
+    assert len(set(codigos)) == len(codigos)
+    distancias = [item["distancia"] for item in data["data"]]
+    assert distancias == sorted(distancias)
+    
+    response = client.get(f"{BASE_URL}/recommendationModel/candidates/{codigo_vaga}?k=0")
+    assert response.status_code == 400
+
+
+def test_recommendation_model_candidates_not_found():
+    response = client.get(f"{BASE_URL}/recommendationModel/candidates/999999999?k=5")
+    assert response.status_code == 404
+    assert "detail" in response.json()
+
+
+# Erros de valor na busca (ex.: dimensão incompatível) não são confundidos com vaga inexistente
+def test_recommendation_model_candidates_search_error(vaga_com_prospects, monkeypatch):
+    class IndiceComErro:
+        def busca(self, vetor, k):
+            raise ValueError("Dimensão do embedding incompatível")
+    
+    monkeypatch.setattr(inferencias.recommendation_store, "get_indice_candidatos", lambda *args: IndiceComErro())
+    codigo_vaga, _ = vaga_com_prospects
+    response = client.get(f"{BASE_URL}/recommendationModel/candidates/{codigo_vaga}?k=5")
+    assert response.status_code == 500
+    assert "incompatível" in response.json()["detail"]
+
+
 # Teste para o endpoint de drift report (/driftReport)
 def test_drift_report():
     response = client.get(f"{BASE_URL}/driftReport")
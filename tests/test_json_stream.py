@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import pytest
+from api.utils.functions.json_stream import itera_objeto_json
+
+
+def grava(tmp_path, conteudo: str) -> str:
+    caminho = tmp_path / "dados.json"
+    caminho.write_text(conteudo, encoding="utf-8")
+    return str(caminho)
+
+
+DADOS = {
+    "31000": {
+        "infos_basicas": {"nome": "Maria José", "objetivo_profissional": "Analista de Dados \"Sênior\" {SQL}"},
+        "informacoes_pessoais": {"pcd": "Não", "idade": 31, "salario": 7500.5},
+        "cv_pt": "Experiência com Python, Power BI e AWS.\nCertificações: ç, ã, é, 😀",
+    },
+    "31001": {"infos_basicas": {"nome": "João"}, "tags": [1, 2, [3, {"a": None}]], "ativo": True},
+    "31002": 12345,
+    "31003": [],
+}
+
+
+# Resultado igual ao json.load, inclusive com blocos menores que os registros
+@pytest.mark.parametrize("tamanho_bloco", [1, 3, 7, 64, 1024 * 1024])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_itera_objeto_json_equivale_ao_json_load(tmp_path, tamanho_bloco, indent):
+    caminho = grava(tmp_path, json.dumps(DADOS, ensure_ascii=False, indent=indent))
+    resultado = list(itera_objeto_json(caminho, tamanho_bloco=tamanho_bloco))
+    assert resultado == list(DADOS.items())
+
+
+def test_itera_objeto_json_vazio(tmp_path):
+    assert list(itera_objeto_json(grava(tmp_path, " { \n } "), tamanho_bloco=2)) == []
+
+
+@pytest.mark.parametrize("conteudo", [
+    '[{"a": 1}]',
+    '{"a": 1,}',
+    '{"a": {"b": 1}',
+    '{"a" 1}',
+    '{"a": 1 "b": 2}',
+    "",
+])
+def test_itera_objeto_json_invalido(tmp_path, conteudo):
+    with pytest.raises(ValueError):
+        list(itera_objeto_json(grava(tmp_path, conteudo), tamanho_bloco=3))
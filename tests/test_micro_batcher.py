@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+from core.services.micro_batcher import MicroBatcher
+
+
+class PreditorFake:
+    """Preditor que registra os lotes recebidos e falha enquanto `falhar` for verdadeiro."""
+
+    def __init__(self):
+        self.lotes = []
+        self.falhar = False
+
+    def __call__(self, registros):
+        self.lotes.append([registro["id"] for registro in registros])
+        if self.falhar:
+            raise RuntimeError("Falha no modelo")
+        return [registro["id"] * 10 for registro in registros]
+
+
+# Requisições concorrentes formam um único lote, e cada uma recebe o seu resultado
+def test_requisicoes_concorrentes_agrupadas():
+    preditor = PreditorFake()
+
+    async def cenario():
+        batcher = MicroBatcher(preditor, max_batch_size=10, janela_ms=50)
+        return await asyncio.gather(*(batcher.submit({"id": i}) for i in range(5))), batcher.metrics()
+
+    resultados, metricas = asyncio.run(cenario())
+    assert resultados == [0, 10, 20, 30, 40]
+    assert preditor.lotes == [[0, 1, 2, 3, 4]]
+    assert metricas["distribuicao_tamanho_lote"] == {5: 1}
+
+
+# A falha de um lote chega a todas as requisições do lote, e os lotes seguintes são atendidos
+def test_falha_do_lote_propagada_a_todas_as_requisicoes():
+    preditor = PreditorFake()
+    preditor.falhar = True
+
+    async def cenario():
+        batcher = MicroBatcher(preditor, max_batch_size=10, janela_ms=50)
+        falhas = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit({"id": i}) for i in range(3)), return_exceptions=True), timeout=2
+        )
+        preditor.falhar = False
+        return falhas, await asyncio.wait_for(batcher.submit({"id": 7}), timeout=2)
+
+    falhas, resultado = asyncio.run(cenario())
+    assert len(falhas) == 3
+    assert all(isinstance(falha, RuntimeError) and str(falha) == "Falha no modelo" for falha in falhas)
+    assert preditor.lotes == [[0, 1, 2], [7]]
+    assert resultado == 70
+
+
+# O lote é fechado ao atingir max_batch_size, sem esperar o fim da janela
+def test_lote_limitado_por_max_batch_size():
+    preditor = PreditorFake()
+
+    async def cenario():
+        batcher = MicroBatcher(preditor, max_batch_size=2, janela_ms=1000)
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit({"id": i}) for i in range(4))), timeout=0.5)
+
+    assert asyncio.run(cenario()) == [0, 10, 20, 30]
+    assert preditor.lotes == [[0, 1], [2, 3]]
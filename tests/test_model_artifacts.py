@@ -0,0 +1,25 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.services.model_artifacts import usa_versao, remove_versoes_antigas
+
+
+def cria_versoes(diretorio, *versoes):
+    for versao in versoes:
+        os.makedirs(os.path.join(diretorio, versao))
+        with open(os.path.join(diretorio, versao, "booster.ubj"), "wb") as f:
+            f.write(b"booster")
+
+
+# Versões em uso por outro worker (download/carga) não são removidas; a atual nunca é
+def test_remove_versoes_antigas_respeita_versoes_em_uso(tmp_path):
+    cache, locks = str(tmp_path / "modelos"), str(tmp_path / "locks")
+    cria_versoes(cache, "v10", "v11", "v12")
+
+    with usa_versao(locks, "v11"):
+        assert remove_versoes_antigas(cache, "v12", locks) == ["v10"]
+        assert sorted(os.listdir(cache)) == ["v11", "v12"]
+
+    assert remove_versoes_antigas(cache, "v12", locks) == ["v11"]
+    assert os.listdir(cache) == ["v12"]
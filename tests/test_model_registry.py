@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import pytest
+from core.services import model_registry
+from core.services.model_registry import ModelRegistry
+
+
+class CarregadorFake:
+    """Substitui o download do S3: cada carga devolve um modelo que conhece a própria versão."""
+
+    def __init__(self):
+        self.latest = "v1/model.pkl"
+        self.cargas = []
+        self.liberar = threading.Event()
+        self.liberar.set()
+        self.carregando = threading.Event()
+
+    def latest_key(self, model: str, frescor_segundos: int = None) -> str:
+        return self.latest
+
+    def carrega(self, latest_model: str):
+        self.cargas.append(latest_model)
+        self.carregando.set()
+        self.liberar.wait(timeout=5)
+        if latest_model == "quebrado":
+            raise RuntimeError("Artefato inválido")
+        return {"versao": latest_model}
+
+
+@pytest.fixture
+def carregador(monkeypatch):
+    fake = CarregadorFake()
+    monkeypatch.setattr(model_registry, "get_latest_model_key", fake.latest_key)
+    monkeypatch.setattr(model_registry, "busca_modelo_classificacao", fake.carrega)
+    return fake
+
+
+# Recarregar com a mesma chave não carrega o modelo de novo nem notifica os listeners
+def test_mesma_chave_nao_recarrega(carregador):
+    registry = ModelRegistry(intervalo_polling=60)
+    versoes = []
+    registry.on_version_change(versoes.append)
+
+    primeiro = registry.get()
+    assert registry.load() is primeiro
+    assert registry.load("v1/model.pkl") is primeiro
+    assert registry.get() is primeiro
+    assert carregador.cargas == ["v1/model.pkl"]
+    assert versoes == ["v1/model.pkl"]
+
+
+# Uma nova chave troca versão e modelo juntos: durante a carga, os leitores seguem com o par anterior
+def test_nova_chave_troca_atomicamente(carregador):
+    registry = ModelRegistry(intervalo_polling=60)
+    versoes = []
+    registry.on_version_change(versoes.append)
+    registry.load()
+
+    carregador.latest = "v2/model.pkl"
+    carregador.liberar.clear()
+    carregador.carregando.clear()
+    carga = threading.Thread(target=registry.load)
+    carga.start()
+    assert carregador.carregando.wait(timeout=5)
+    versao, modelo = registry.get()
+    assert (versao, modelo["versao"]) == ("v1/model.pkl", "v1/model.pkl")
+
+    carregador.liberar.set()
+    carga.join(timeout=5)
+    versao, modelo = registry.get()
+    assert (versao, modelo["versao"]) == ("v2/model.pkl", "v2/model.pkl")
+    assert registry.versao == "v2/model.pkl"
+    assert versoes == ["v1/model.pkl", "v2/model.pkl"]
+
+
+# Uma falha na carga da nova versão mantém o modelo anterior ativo
+def test_falha_na_carga_mantem_versao_anterior(carregador):
+    registry = ModelRegistry(intervalo_polling=60)
+    anterior = registry.load()
+    with pytest.raises(RuntimeError):
+        registry.load("quebrado")
+    assert registry.get() is anterior
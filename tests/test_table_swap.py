@@ -0,0 +1,114 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select, func
+from api.utils.functions.CRUD_SystemDB import atualizar_tabelas_vagas
+from api.utils.functions.table_swap import garante_indices
+from models.vagas_model import VagaInfosBasicas, VagaPerfil, VagaBeneficios
+from models.prospect_model import Prospect
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'system.db'}")
+    SQLModel.metadata.create_all(engine, tables=[
+        VagaInfosBasicas.__table__, VagaPerfil.__table__, VagaBeneficios.__table__, Prospect.__table__
+    ])
+    return engine
+
+
+def grava_vagas(tmp_path, vagas: dict) -> str:
+    caminho = tmp_path / "vagas.json"
+    caminho.write_text(json.dumps(vagas), encoding="utf-8")
+    return str(caminho)
+
+
+def vagas_exemplo(total: int, titulo: str) -> dict:
+    return {
+        str(codigo): {
+            "informacoes_basicas": {"titulo_vaga": f"{titulo} {codigo}"},
+            "perfil_vaga": {"areas_atuacao": "TI"},
+            "beneficios": {"valor_venda": "100"},
+        }
+        for codigo in range(1, total + 1)
+    }
+
+
+def indices(engine, tabela: str) -> list:
+    with engine.connect() as conexao:
+        return [nome for (nome,) in conexao.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (tabela,)
+        )]
+
+
+def remove_indices(engine):
+    # Simula um banco criado antes de os índices serem declarados nos modelos
+    with engine.begin() as conexao:
+        for (nome,) in conexao.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").all():
+            conexao.exec_driver_sql(f'DROP INDEX "{nome}"')
+
+
+def conta(engine, modelo) -> int:
+    with Session(engine) as db:
+        return db.exec(select(func.count()).select_from(modelo)).one()
+
+
+# Recargas sucessivas substituem os dados e mantêm índices e chaves estrangeiras
+def test_recarga_atomica_substitui_tabelas(engine, tmp_path):
+    for total, titulo in ((30, "Analista"), (12, "Desenvolvedor"), (20, "Engenheiro")):
+        with Session(engine) as db:
+            estatisticas = atualizar_tabelas_vagas(grava_vagas(tmp_path, vagas_exemplo(total, titulo)), db)
+        assert estatisticas["vaga_infos_basicas"]["linhas"] == total
+        assert conta(engine, VagaInfosBasicas) == total
+        assert conta(engine, VagaPerfil) == total
+        with Session(engine) as db:
+            assert db.get(VagaInfosBasicas, 1).titulo_vaga == f"{titulo} 1"
+
+    with engine.connect() as conexao:
+        objetos = conexao.exec_driver_sql("SELECT type, name, sql FROM sqlite_master").all()
+    nomes = [nome for _, nome, _ in objetos]
+    assert not [nome for nome in nomes if "__staging" in nome or "__antiga" in nome]
+    assert any(tipo == "index" and nome.startswith("ix_vaga_infos_basicas_codigo_vaga") for tipo, nome, _ in objetos)
+    ddl_prospects = next(sql for _, nome, sql in objetos if nome == "prospects")
+    assert "REFERENCES vaga_infos_basicas" in ddl_prospects
+
+
+# Uma falha durante a carga descarta a staging e mantém os dados em uso
+def test_recarga_atomica_falha_preserva_dados(engine, tmp_path):
+    with Session(engine) as db:
+        atualizar_tabelas_vagas(grava_vagas(tmp_path, vagas_exemplo(10, "Analista")), db)
+
+    invalido = vagas_exemplo(5, "Nova")
+    invalido["6"] = {"perfil_vaga": {}}
+    with Session(engine) as db:
+        with pytest.raises(KeyError):
+            atualizar_tabelas_vagas(grava_vagas(tmp_path, invalido), db)
+
+    assert conta(engine, VagaInfosBasicas) == 10
+    with Session(engine) as db:
+        assert db.get(VagaInfosBasicas, 1).titulo_vaga == "Analista 1"
+
+
+# Em um banco sem os índices declarados nos modelos, a recarga e o startup os criam
+def test_indices_declarados_criados_em_banco_existente(engine, tmp_path):
+    remove_indices(engine)
+    assert indices(engine, "vaga_perfil") == []
+
+    with Session(engine) as db:
+        atualizar_tabelas_vagas(grava_vagas(tmp_path, vagas_exemplo(5, "Analista")), db)
+    assert indices(engine, "vaga_perfil") == ["ix_vaga_perfil_codigo_vaga__a"]
+    assert indices(engine, "prospects") == []
+
+    # O startup cria os que faltam, sem duplicar os já existentes (com ou sem sufixo)
+    with Session(engine) as db:
+        garante_indices(db, [VagaInfosBasicas, VagaPerfil, VagaBeneficios, Prospect])
+    assert indices(engine, "vaga_perfil") == ["ix_vaga_perfil_codigo_vaga__a"]
+    assert indices(engine, "prospects") == ["ix_prospects_codigo_vaga"]
+
+    remove_indices(engine)
+    with Session(engine) as db:
+        garante_indices(db, [VagaInfosBasicas, VagaPerfil, VagaBeneficios, Prospect])
+    assert indices(engine, "vaga_beneficios") == ["ix_vaga_beneficios_codigo_vaga"]
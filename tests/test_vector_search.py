@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+from core.services.vector_search import IndiceExato, QUANTIZACOES, distancia_angular
+
+
+def embeddings(tmp_path, itens: int = 3000, dim: int = 64) -> np.ndarray:
+    # Arquivo .npy lido com memory-map, como os embeddings do índice de recomendação
+    path = os.path.join(str(tmp_path), "embeddings.npy")
+    np.save(path, np.random.default_rng(0).normal(size=(itens, dim)).astype(np.float32))
+    return np.load(path, mmap_mode="r")
+
+
+def top_k_float32(vetores: np.ndarray, consulta: np.ndarray, k: int):
+    # Referência: similaridade de cosseno calculada em float64 sobre todos os vetores
+    normalizados = vetores / np.linalg.norm(vetores, axis=1, keepdims=True)
+    similaridades = normalizados @ (consulta / np.linalg.norm(consulta))
+    melhores = np.argsort(-similaridades)[:k]
+    return melhores.tolist(), distancia_angular(similaridades[melhores])
+
+
+# Com a quantização e o reranqueamento em float32, o top-k é o mesmo da busca exata em float32
+@pytest.mark.parametrize("quantizacao", QUANTIZACOES)
+def test_top_k_igual_a_busca_float32(tmp_path, quantizacao):
+    vetores = embeddings(tmp_path)
+    indice = IndiceExato(vetores, quantizacao=quantizacao, fator_reranqueamento=4)
+    for consulta in np.random.default_rng(1).normal(size=(20, vetores.shape[1])).astype(np.float32):
+        esperados, distancias_esperadas = top_k_float32(np.asarray(vetores, dtype=np.float64), consulta, 10)
+        encontrados, distancias = indice.get_nns_by_vector(consulta, 10, include_distances=True)
+        assert encontrados == esperados
+        np.testing.assert_allclose(distancias, distancias_esperadas, atol=1e-5)
+
+
+# Cada quantização reduz a memória da matriz mantida pelo índice
+def test_memoria_reduzida_pela_quantizacao(tmp_path):
+    vetores = embeddings(tmp_path)
+    memoria = {quantizacao: IndiceExato(vetores, quantizacao=quantizacao).bytes_memoria for quantizacao in QUANTIZACOES}
+    assert memoria["none"] > memoria["float16"] > memoria["int8"]
+    assert memoria["none"] >= vetores.nbytes
+
+
+# Um subconjunto de linhas do arquivo forma o índice, com posições relativas ao subconjunto
+def test_indice_sobre_subconjunto_de_linhas(tmp_path):
+    vetores = embeddings(tmp_path)
+    linhas = np.arange(0, vetores.shape[0], 3)
+    indice = IndiceExato(vetores, linhas=linhas, quantizacao="int8")
+    assert indice.get_n_items() == len(linhas)
+    assert indice.get_nns_by_vector(vetores[linhas[7]], 1) == [7]